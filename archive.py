@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Téléchargement de l'historique des bougies dans l'archive memmap
+"""
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from main import setup_rate_limiter
+from src import plugins
+from src.backfill import backfill
+from src.candle_archive import CandleArchive
+from src.config_loader import ConfigLoader
+
+
+def setup_fetcher(config: dict, source: str):
+    """Fetcher REST de la source, limité comme la surveillance (sans cache SQLite)"""
+    rate_limiter = setup_rate_limiter(config, source)
+    if source == 'twelvedata':
+        api_key = config.get('twelvedata', {}).get('api_key')
+        return plugins.load('fetcher', 'twelvedata')(api_key or None, rate_limiter=rate_limiter)
+    binance_config = config.get('binance', {})
+    return plugins.load('fetcher', 'binance')(
+        binance_config.get('api_key'),
+        binance_config.get('api_secret'),
+        rate_limiter=rate_limiter
+    )
+
+
+def to_milliseconds(date: str) -> int:
+    """Date (2020-01-01, 2020-01-01 12:00...) en ms UTC"""
+    return int(pd.Timestamp(date).value // 1_000_000)
+
+
+def list_series(archive: CandleArchive):
+    series = archive.series()
+    if not series:
+        print(f"📭 Archive vide ({archive.root})")
+    for index in series:
+        first = pd.Timestamp(index['first_open_time'], unit='ms')
+        last = pd.Timestamp(index['last_open_time'], unit='ms')
+        print(f"📦 {index['source']:>10} {index['symbol']:>12} {index['interval']:>4} | "
+              f"{index['count']:>10} bougies | {first} → {last}")
+
+
+def print_report(symbol: str, interval: str, report: dict):
+    for first, last, error in report['failed']:
+        print(f"❌ {symbol}: page {pd.Timestamp(first, unit='ms')} → "
+              f"{pd.Timestamp(last, unit='ms')} en erreur ({error})")
+    gaps = report['gaps']
+    if not gaps:
+        print(f"✅ {symbol} {interval}: série continue")
+        return
+    print(f"⚠️ {symbol} {interval}: {len(gaps)} trou(s)")
+    for first, last in gaps[:10]:
+        print(f"   {pd.Timestamp(first, unit='ms')} → {pd.Timestamp(last, unit='ms')}")
+    if len(gaps) > 10:
+        print(f"   ... et {len(gaps) - 10} autres")
+
+
+def parse_args(config: dict) -> argparse.Namespace:
+    trading_config = config.get('trading', {})
+    archive_config = config.get('archive') or {}
+
+    parser = argparse.ArgumentParser(description="Archive historique des bougies (colonnes memmap)")
+    parser.add_argument('--symbols', nargs='+', default=[trading_config.get('symbol')])
+    parser.add_argument('--interval', default=trading_config.get('interval', '1h'))
+    parser.add_argument('--source', default=trading_config.get('data_source', 'binance'))
+    parser.add_argument('--start', help="Première bougie (ex: 2017-08-17)")
+    parser.add_argument('--end', help="Dernière bougie (défaut: dernière bougie clôturée)")
+    parser.add_argument('--workers', type=int, default=archive_config.get('workers', 4),
+                        help="Pages téléchargées en parallèle")
+    parser.add_argument('--list', action='store_true', help="Affiche les séries archivées")
+    return parser.parse_args()
+
+
+def main():
+    """Fonction principale"""
+    try:
+        config = ConfigLoader().load()
+    except FileNotFoundError:
+        config = {}
+    args = parse_args(config)
+    archive = CandleArchive((config.get('archive') or {}).get('path', 'data/archive'))
+
+    if args.list:
+        list_series(archive)
+        return
+    if not args.start:
+        print("❌ --start est requis pour télécharger")
+        sys.exit(1)
+
+    fetcher = setup_fetcher(config, args.source.lower())
+    start = to_milliseconds(args.start)
+    end = to_milliseconds(args.end) if args.end else None
+
+    errors = 0
+    for symbol in args.symbols:
+        began = time.perf_counter()
+
+        def progress(done: int, total: int):
+            print(f"\r⏬ {symbol} {args.interval}: page {done}/{total}", end='', flush=True)
+
+        try:
+            report = backfill(fetcher, archive, symbol, args.interval, start, end,
+                              workers=args.workers, progress=progress)
+        except Exception as e:
+            print(f"\n❌ {symbol}: {e}")
+            errors += 1
+            continue
+        print(f"\n📥 {symbol} {args.interval}: {report['received']} bougies reçues en "
+              f"{report['pages']} pages, {time.perf_counter() - began:.1f}s "
+              f"({archive.count(fetcher.SOURCE, symbol, args.interval)} archivées)")
+        print_report(symbol, args.interval, report)
+        errors += len(report['failed'])
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Backtest de la stratégie d'alerte Bollinger Bands sur données historiques
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.alert_manager import DEFAULT_COOLDOWN_SECONDS
+from src.backtest import run_backtest
+from src.config_loader import ConfigLoader
+from src.intervals import timestamps_to_milliseconds
+
+
+def load_candles(args, config: dict):
+    """
+    Charge les bougies depuis un CSV, l'archive memmap ou le cache local
+
+    Returns:
+        Tuple (open_times en ms, close)
+    """
+    if args.csv:
+        df = pd.read_csv(args.csv)
+        if 'open_time' in df:
+            open_times = df['open_time'].to_numpy(dtype=np.int64)
+        else:
+            open_times = np.array(timestamps_to_milliseconds(pd.to_datetime(df['timestamp'])),
+                                  dtype=np.int64)
+        return open_times, df['close'].to_numpy(dtype=np.float64)
+
+    if args.archive:
+        from src.candle_archive import CandleArchive
+        archive = CandleArchive((config.get('archive') or {}).get('path', 'data/archive'))
+        arrays = archive.open(args.source, args.symbol, args.interval, fields=('open_time', 'close'))
+        return arrays['open_time'], arrays['close']
+
+    from src.candle_cache import CandleCache
+    cache_config = config.get('cache') or {}
+    cache = CandleCache(cache_config.get('path', 'data/candles.db'))
+    try:
+        arrays = cache.load_arrays(args.source, args.symbol, args.interval)
+    finally:
+        cache.close()
+    return arrays['open_time'], arrays['close']
+
+
+def parse_args(config: dict) -> argparse.Namespace:
+    bb_config = config.get('bollinger_bands', {})
+    trading_config = config.get('trading', {})
+
+    parser = argparse.ArgumentParser(description="Backtest des alertes Bollinger Bands")
+    parser.add_argument('--symbol', default=trading_config.get('symbol'))
+    parser.add_argument('--interval', default=trading_config.get('interval', '1h'))
+    parser.add_argument('--source', default=trading_config.get('data_source', 'binance'))
+    parser.add_argument('--csv', help="Fichier CSV (colonnes open_time ou timestamp, close)")
+    parser.add_argument('--archive', action='store_true', help="Lit les bougies dans l'archive (archive.py)")
+    parser.add_argument('--period', type=int, default=bb_config.get('period', 20))
+    parser.add_argument('--multiplier', type=float, default=bb_config.get('multiplier', 2.0))
+    parser.add_argument('--proximity', type=float, default=bb_config.get('proximity_percent', 0.5))
+    parser.add_argument('--cooldown', type=float, default=DEFAULT_COOLDOWN_SECONDS,
+                        help="Secondes minimum entre deux alertes du même type")
+    parser.add_argument('--horizons', type=int, nargs='+', default=[1, 5, 20],
+                        help="Horizons des rendements après alerte (en bougies)")
+    parser.add_argument('--output', help="Export CSV des alertes")
+    return parser.parse_args()
+
+
+def main():
+    """Fonction principale"""
+    try:
+        config = ConfigLoader().load()
+    except FileNotFoundError:
+        config = {}
+    args = parse_args(config)
+
+    open_times, close = load_candles(args, config)
+    if len(close) == 0:
+        print(f"❌ Aucune bougie pour {args.symbol} {args.interval} ({args.source})")
+        sys.exit(1)
+
+    print(f"📊 {args.symbol} {args.interval}: {len(close)} bougies")
+    print(f"📏 Période {args.period} | Multiplicateur {args.multiplier} | "
+          f"Proximité {args.proximity}% | Cooldown {args.cooldown:.0f}s")
+
+    start = time.perf_counter()
+    result = run_backtest(
+        open_times, close,
+        period=args.period,
+        multiplier=args.multiplier,
+        proximity_percent=args.proximity,
+        cooldown_seconds=args.cooldown,
+        horizons=args.horizons
+    )
+    elapsed = time.perf_counter() - start
+
+    alerts = result['alerts']
+    print(f"⏱️  Backtest en {elapsed * 1000:.1f} ms")
+    print(f"🚨 {len(alerts)} alertes "
+          f"({(alerts['type'] == 'upper').sum()} hautes, {(alerts['type'] == 'lower').sum()} basses)\n")
+    print(result['stats'].to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    if args.output:
+        alerts.to_csv(args.output, index=False)
+        print(f"\n💾 Alertes exportées dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark : ouverture d'une longue série 1m depuis l'archive memmap (CandleArchive)
+contre la lecture des mêmes bougies depuis le cache SQLite (CandleCache.load_arrays)
+
+Usage : python benchmarks/bench_archive.py [--years 10] [--no-cache]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.candle_archive import CandleArchive  # noqa: E402
+from src.candle_cache import CandleCache  # noqa: E402
+
+MINUTE_MS = 60_000
+START_MS = 1_500_000_000_000 - 1_500_000_000_000 % MINUTE_MS
+PAGE = 1000
+
+
+def best_of(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def synthetic_pages(count: int):
+    """Pages de bougies 1m (marche aléatoire reproductible), comme le téléchargeur"""
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, count)))
+    open_time = START_MS + MINUTE_MS * np.arange(count, dtype=np.int64)
+    for first in range(0, count, PAGE):
+        page = slice(first, first + PAGE)
+        yield {'open_time': open_time[page], 'open': close[page], 'high': close[page] * 1.001,
+               'low': close[page] * 0.999, 'close': close[page], 'volume': np.ones(len(close[page]))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-cache', action='store_true', help="Ne pas comparer au cache SQLite")
+    args = parser.parse_args()
+
+    count = int(args.years * 365 * 24 * 60)
+    print(f"📊 BTCUSDT 1m, {args.years:g} ans = {count} bougies")
+
+    with tempfile.TemporaryDirectory(prefix="bench-archive-") as directory:
+        archive = CandleArchive(os.path.join(directory, 'archive'))
+        start = time.perf_counter()
+        for page in synthetic_pages(count):
+            archive.append('binance', 'BTCUSDT', '1m', page)
+        elapsed = time.perf_counter() - start
+        print(f"💾 Écriture par pages de {PAGE}   : {elapsed:8.2f} s  ({count / elapsed:,.0f} bougies/s)")
+
+        month_start = START_MS + (count - 30 * 24 * 60) * MINUTE_MS
+
+        def open_full():
+            CandleArchive(archive.root).open('binance', 'BTCUSDT', '1m')
+
+        def month_bands():
+            CandleArchive(archive.root).bands('binance', 'BTCUSDT', '1m', start=month_start)
+
+        def full_bands():
+            CandleArchive(archive.root).bands('binance', 'BTCUSDT', '1m')
+
+        print(f"🚀 Ouverture de la série       : {best_of(open_full, args.repeat) * 1000:8.2f} ms")
+        print(f"🚀 Bandes des 30 derniers jours : {best_of(month_bands, args.repeat) * 1000:8.2f} ms")
+        print(f"📈 Bandes de toute la série    : {best_of(full_bands, args.repeat) * 1000:8.2f} ms")
+
+        if not args.no_cache:
+            cache = CandleCache(os.path.join(directory, 'candles.db'))
+            for page in synthetic_pages(count):
+                cache.upsert('binance', 'BTCUSDT', '1m', zip(*(page[f].tolist() for f in page)))
+            load = best_of(lambda: cache.load_arrays('binance', 'BTCUSDT', '1m'), 1)
+            print(f"🐢 CandleCache.load_arrays()   : {load * 1000:8.2f} ms")
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
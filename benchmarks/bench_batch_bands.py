@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark : calcul des bandes d'une watchlist en une passe 2D (bollinger_batch)
+contre une boucle de `BollingerBands.calculate` par symbole et par réglage
+
+Usage : python benchmarks/bench_batch_bands.py [--symbols 200] [--candles 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bollinger_bands import BollingerBands, bollinger_batch  # noqa: E402
+
+
+def best_of(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--candles', type=int, default=1000)
+    parser.add_argument('--periods', type=int, nargs='+', default=[10, 20, 50])
+    parser.add_argument('--multipliers', type=float, nargs='+', default=[2.0, 2.5])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrix = 100 + np.cumsum(rng.normal(0, 0.2, (args.symbols, args.candles)), axis=1)
+
+    def loop():
+        for prices in matrix:
+            series = pd.Series(prices)
+            for period in args.periods:
+                for multiplier in args.multipliers:
+                    BollingerBands(period, multiplier).calculate(series)
+
+    def batch():
+        bollinger_batch(matrix, args.periods, args.multipliers)
+
+    combinations = args.symbols * len(args.periods) * len(args.multipliers)
+    print(f"📊 {args.symbols} symboles × {args.candles} bougies, {combinations} calculs de bandes")
+
+    loop_time = best_of(loop, args.repeat)
+    batch_time = best_of(batch, args.repeat)
+    print(f"🐢 Boucle calculate() : {loop_time * 1000:8.1f} ms")
+    print(f"🚀 bollinger_batch()  : {batch_time * 1000:8.1f} ms  (x{loop_time / batch_time:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark : conversion des bougies Binance brutes en DataFrame (klines_to_dataframe)
+contre le chemin léger NumPy (klines_to_arrays, seuls open_time et close)
+
+Usage : python benchmarks/bench_kline_parsing.py [--symbols 300] [--candles 70]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_fetcher import klines_to_arrays, klines_to_dataframe  # noqa: E402
+
+
+def fake_klines(count: int, start_ms: int = 1_700_000_000_000) -> list:
+    """Bougies au format brut de /api/v3/klines (prix en chaînes)"""
+    klines = []
+    for i in range(count):
+        open_time = start_ms + i * 60_000
+        price = f"{60000 + i % 97:.2f}"
+        klines.append([open_time, price, price, price, price, "12.5", open_time + 59_999,
+                       "750000.0", 42, "6.1", "366000.0", "0"])
+    return klines
+
+
+def best_of(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--candles', type=int, default=70)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    responses = [fake_klines(args.candles) for _ in range(args.symbols)]
+
+    def with_pandas():
+        for klines in responses:
+            df = klines_to_dataframe(klines)
+            df['timestamp'].tolist(), df['close'].tolist()
+
+    def with_arrays():
+        for klines in responses:
+            arrays = klines_to_arrays(klines)
+            arrays['open_time'].tolist(), arrays['close'].tolist()
+
+    print(f"📊 {args.symbols} réponses × {args.candles} bougies (un tick de watchlist)")
+    pandas_time = best_of(with_pandas, args.repeat)
+    arrays_time = best_of(with_arrays, args.repeat)
+    print(f"🐢 klines_to_dataframe : {pandas_time * 1000:8.1f} ms")
+    print(f"🚀 klines_to_arrays    : {arrays_time * 1000:8.1f} ms  (x{pandas_time / arrays_time:.1f})")
+
+
+if __name__ == "__main__":
+    main()
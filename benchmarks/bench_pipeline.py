@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Benchmark de bout en bout : récupération → calcul des bandes → alertes → notifications
+
+Les fetchers et notifiers sont remplacés par des doublures hors ligne : les
+prix viennent de marches aléatoires reproductibles (ou de fichiers CSV
+enregistrés), les notifications sont comptées sans être envoyées. Chaque
+tick passe par `WatchlistScheduler.run_once` puis `NotificationManager`,
+comme dans `main.py`.
+
+Mesures par nombre de symboles : débit (ticks symbole / s), latence d'un
+cycle (p50 / p95 / p99) et pic mémoire. Les résultats sont ajoutés à
+`benchmarks/results/pipeline.jsonl` avec le commit git courant et comparés
+à la dernière exécution enregistrée avec les mêmes paramètres.
+
+Usage : python benchmarks/bench_pipeline.py [--symbols 1 10 100 1000] [--ticks 200]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.notifiers import NotificationManager  # noqa: E402
+from src.watchlist import Subscription, WatchlistScheduler  # noqa: E402
+
+RESULTS_PATH = os.path.join(ROOT, 'benchmarks', 'results', 'pipeline.jsonl')
+HOUR_MS = 3_600_000
+START_MS = 1_700_000_000_000
+
+
+class OfflineFetcher:
+    """Doublure de DataFetcher : bougies et prix rejoués depuis des séries en mémoire"""
+
+    def __init__(self, paths: np.ndarray, symbols, ticks_per_candle: int, history: int):
+        """
+        Args:
+            paths: Prix tick par tick, une ligne par symbole
+            symbols: Noms des symboles (même ordre que `paths`)
+            ticks_per_candle: Nombre de ticks par bougie
+            history: Nombre de bougies clôturées avant le premier tick
+        """
+        self.paths = paths
+        self.index = {symbol: row for row, symbol in enumerate(symbols)}
+        self.ticks_per_candle = ticks_per_candle
+        # Clôtures des bougies complètes (dernier tick de chaque bougie)
+        self.closes = paths[:, ticks_per_candle - 1::ticks_per_candle]
+        self.tick = history * ticks_per_candle
+
+    def advance(self):
+        self.tick += 1
+
+    def get_current_prices(self, symbols):
+        return {symbol: float(self.paths[self.index[symbol], self.tick]) for symbol in symbols}
+
+    def get_kline_arrays(self, symbol, interval, limit=100, fields=('open_time', 'close')):
+        row = self.index[symbol]
+        candle = self.tick // self.ticks_per_candle
+        first = max(0, candle - limit + 1)
+        closes = np.append(self.closes[row, first:candle], self.paths[row, self.tick])
+        open_times = START_MS + np.arange(first, candle + 1, dtype=np.int64) * HOUR_MS
+        arrays = {'open_time': open_times, 'close': closes}
+        for field in ('open', 'high', 'low'):
+            arrays[field] = closes
+        return {field: arrays[field] for field in fields}
+
+
+class CountingNotifier:
+    """Doublure de notifier : compte les alertes sans rien envoyer"""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, alert):
+        self.sent += 1
+
+    def send_batch(self, alerts):
+        self.sent += len(alerts)
+
+
+def synthetic_paths(symbols: int, length: int, seed: int) -> np.ndarray:
+    """Marches aléatoires reproductibles (rendements gaussiens, prix > 0)"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.002, (symbols, length))
+    start = rng.uniform(10, 1000, (symbols, 1))
+    return start * np.exp(np.cumsum(returns, axis=1))
+
+
+def recorded_paths(files, symbols: int, length: int) -> np.ndarray:
+    """Prix de clôture enregistrés (CSV avec une colonne close), répétés pour chaque symbole"""
+    series = [pd.read_csv(path)['close'].to_numpy(dtype=np.float64) for path in files]
+    rows = []
+    for row in range(symbols):
+        values = series[row % len(series)]
+        # Répétition par réflexion si la série est trop courte (pas de saut de prix)
+        while len(values) < length:
+            values = np.concatenate([values, values[::-1]])
+        offset = (row * 7919) % (len(values) - length + 1)
+        rows.append(values[offset:offset + length])
+    return np.vstack(rows)
+
+
+def run_scenario(paths: np.ndarray, args, measure_memory: bool = False) -> dict:
+    """Exécute `args.ticks` cycles de surveillance sur toutes les lignes de `paths`"""
+    symbols = [f"SYM{i:04d}" for i in range(len(paths))]
+    fetcher = OfflineFetcher(paths, symbols, args.ticks_per_candle, args.history)
+    subscriptions = [Subscription(symbol, '1h', args.period, 2.0, args.proximity) for symbol in symbols]
+    for subscription in subscriptions:
+        subscription.alert_manager.cooldown_seconds = args.cooldown
+
+    notifier = CountingNotifier()
+    manager = NotificationManager(background=True, batch_window=0.0)
+    manager.add_notifier(notifier)
+    scheduler = WatchlistScheduler(fetcher, subscriptions, 'binance', args.workers)
+
+    latencies = []
+    alerts = 0
+    if measure_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        for _ in range(args.ticks):
+            cycle_start = time.perf_counter()
+            for result in scheduler.run_once():
+                if result['error'] is not None:
+                    raise result['error']
+                for alert in result['alerts']:
+                    manager.send_alert(alert)
+                    alerts += 1
+            latencies.append(time.perf_counter() - cycle_start)
+            fetcher.advance()
+        manager.flush()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if measure_memory else None
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+        scheduler.close()
+        manager.close()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'symbols': len(symbols),
+        'ticks': args.ticks,
+        'throughput': round(len(symbols) * args.ticks / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        'alerts': alerts,
+        'notified': notifier.sent,
+        'peak_mb': round(peak / 1e6, 2) if peak is not None else None,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def previous_results(params: dict, path: str = RESULTS_PATH, key: str = 'symbols') -> dict:
+    """Dernière exécution enregistrée avec les mêmes paramètres : {r[key]: résultat}"""
+    if not os.path.exists(path):
+        return {}
+    previous = {}
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record['params'] == params:
+                previous = {r[key]: r for r in record['results']}
+    return previous
+
+
+def save_results(params: dict, results: list, path: str = RESULTS_PATH):
+    """Ajoute une exécution (commit git, machine, paramètres, résultats) au fichier JSONL"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    revision = git_revision()
+    with open(path, 'a') as f:
+        f.write(json.dumps({
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'revision': revision,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'params': params,
+            'results': [{**r, 'revision': revision} for r in results],
+        }) + "\n")
+    print(f"\n💾 Résultats ajoutés à {os.path.relpath(path, ROOT)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--ticks', type=int, default=200, help="Cycles mesurés par scénario")
+    parser.add_argument('--ticks-per-candle', type=int, default=10)
+    parser.add_argument('--history', type=int, default=100, help="Bougies avant le premier tick")
+    parser.add_argument('--period', type=int, default=20)
+    parser.add_argument('--proximity', type=float, default=0.5)
+    parser.add_argument('--cooldown', type=float, default=0, help="Cooldown des alertes en secondes")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--csv', nargs='+', help="Prix enregistrés au lieu des marches aléatoires")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="Écart de débit en %% signalé comme régression")
+    parser.add_argument('--no-save', action='store_true', help="Ne pas enregistrer les résultats")
+    args = parser.parse_args()
+
+    params = {key: value for key, value in vars(args).items()
+              if key not in ('symbols', 'threshold', 'no_save')}
+    previous = previous_results(params)
+    length = (args.history + 1) * args.ticks_per_candle + args.ticks
+
+    results = []
+    for count in args.symbols:
+        if args.csv:
+            paths = recorded_paths(args.csv, count, length)
+        else:
+            paths = synthetic_paths(count, length, args.seed)
+        result = run_scenario(paths, args)
+        # Pic mémoire mesuré sur une exécution courte séparée (tracemalloc ralentit tout)
+        short = argparse.Namespace(**{**vars(args), 'ticks': min(args.ticks, 20)})
+        result['peak_mb'] = run_scenario(paths, short, measure_memory=True)['peak_mb']
+        results.append(result)
+
+        line = (f"{count:>5} symboles | {result['throughput']:>10.0f} ticks/s | "
+                f"p50 {result['p50_ms']:.2f}ms p95 {result['p95_ms']:.2f}ms "
+                f"p99 {result['p99_ms']:.2f}ms | {result['peak_mb']:.1f} Mo | "
+                f"{result['alerts']} alertes")
+        before = previous.get(count)
+        if before:
+            change = (result['throughput'] / before['throughput'] - 1) * 100
+            marker = '🐢' if change < -args.threshold else '🚀' if change > args.threshold else '='
+            line += f" | {marker} {change:+.1f}% vs {before.get('revision', '?')}"
+        print(line)
+
+    if not args.no_save:
+        save_results(params, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark du démarrage à froid de main.py
+
+Chaque mesure lance un interpréteur neuf (comme un worker autoscalé ou une
+tâche cron `main.py --once`) qui importe `main` puis charge les plugins d'une
+configuration type. Sont mesurés : la durée des imports dans le processus et
+la durée totale du processus (démarrage de Python compris), en médiane sur
+`--runs` lancements.
+
+Les résultats sont ajoutés à `benchmarks/results/startup.jsonl` et comparés à
+la dernière exécution enregistrée avec les mêmes paramètres.
+
+Usage : python benchmarks/bench_startup.py [--runs 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bench_pipeline import ROOT, previous_results, save_results
+
+RESULTS_PATH = os.path.join(ROOT, 'benchmarks', 'results', 'startup.jsonl')
+
+# Scénario -> (fetcher, notifiers) chargés après `import main`
+SCENARIOS = {
+    'import': (None, ()),
+    'binance_console': ('binance', ('console',)),
+    'twelvedata_telegram': ('twelvedata', ('console', 'telegram')),
+    'binance_async_email': ('binance_async', ('email',)),
+}
+
+CHILD = """
+import time
+start = time.perf_counter()
+import main
+from src import plugins
+fetcher, notifiers = {fetcher!r}, {notifiers!r}
+if fetcher:
+    plugins.load('fetcher', fetcher)
+for name in notifiers:
+    plugins.load('notifier', name)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure(fetcher, notifiers, runs: int):
+    """Médianes (imports ms, processus ms) sur `runs` interpréteurs neufs"""
+    code = CHILD.format(fetcher=fetcher, notifiers=tuple(notifiers))
+    imports, totals = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT)
+        totals.append((time.perf_counter() - start) * 1000)
+        imports.append(float(output.decode().strip().splitlines()[-1]))
+    return statistics.median(imports), statistics.median(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help="Lancements par scénario")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="Écart en %% signalé comme régression")
+    parser.add_argument('--no-save', action='store_true', help="Ne pas enregistrer les résultats")
+    args = parser.parse_args()
+
+    params = {'runs': args.runs}
+    previous = previous_results(params, RESULTS_PATH, key='scenario')
+
+    results = []
+    for scenario, (fetcher, notifiers) in SCENARIOS.items():
+        import_ms, total_ms = measure(fetcher, notifiers, args.runs)
+        result = {'scenario': scenario, 'import_ms': round(import_ms, 1),
+                  'process_ms': round(total_ms, 1)}
+        results.append(result)
+
+        line = f"{scenario:>22} | imports {import_ms:7.1f}ms | processus {total_ms:7.1f}ms"
+        before = previous.get(scenario)
+        if before:
+            change = (import_ms / before['import_ms'] - 1) * 100
+            marker = '🐢' if change > args.threshold else '🚀' if change < -args.threshold else '='
+            line += f" | {marker} {change:+.1f}% vs {before.get('revision', '?')}"
+        print(line)
+
+    if not args.no_save:
+        save_results(params, results, RESULTS_PATH)
+
+
+if __name__ == "__main__":
+    main()
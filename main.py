@@ -1,26 +1,42 @@
 #!/usr/bin/env python3
 """
 Script principal pour surveiller les Bandes de Bollinger et envoyer des alertes
+
+Les fetchers et notifiers sont chargés via `src.plugins` : seuls ceux que la
+configuration sélectionne sont importés. `--once` fait une seule passe
+récupération / calcul / alertes puis quitte (tâches cron).
 """
+import argparse
+import asyncio
 import time
 import sys
 from datetime import datetime
+from typing import Optional, Tuple
+from src import plugins
+from src.alert_journal import AlertJournal
+from src.alert_manager import DEFAULT_COOLDOWN_SECONDS
 from src.config_loader import ConfigLoader
-from src.data_fetcher import DataFetcher
-from src.twelve_data_fetcher import TwelveDataFetcher
-from src.bollinger_bands import BollingerBands
-from src.alert_manager import AlertManager
-from src.notifiers import (
-    NotificationManager,
-    ConsoleNotifier,
-    TelegramNotifier,
-    EmailNotifier
+from src.metrics import NULL_METRICS, Metrics, MetricsServer
+from src.rate_limiter import RateLimiter
+from src.replay import MarketRecorder, ReplaySession, record_fetcher
+from src.sharding import DEFAULT_REPLICAS, ShardSupervisor
+from src.watchlist import (
+    WatchlistScheduler,
+    load_subscriptions,
+    merge_alert_history,
+    save_alert_history
 )
+from src.notifiers import NotificationManager
 
 
 def setup_notifiers(config: dict) -> NotificationManager:
     """Configure les notifiers selon la configuration"""
-    notification_manager = NotificationManager()
+    alerts_config = config['alerts']
+    notification_manager = NotificationManager(
+        background=alerts_config.get('background', True),
+        queue_size=alerts_config.get('queue_size', 1000),
+        batch_window=alerts_config.get('batch_window', 0.5)
+    )
 
     if not config['alerts']['enabled']:
         return notification_manager
@@ -29,14 +45,14 @@ def setup_notifiers(config: dict) -> NotificationManager:
 
     # Console
     if 'console' in methods:
-        notification_manager.add_notifier(ConsoleNotifier())
+        notification_manager.add_notifier(plugins.load('notifier', 'console')())
 
     # Telegram
     if 'telegram' in methods:
         telegram_config = config.get('telegram', {})
         if telegram_config.get('bot_token') and telegram_config.get('chat_id'):
             notification_manager.add_notifier(
-                TelegramNotifier(
+                plugins.load('notifier', 'telegram')(
                     telegram_config['bot_token'],
                     telegram_config['chat_id']
                 )
@@ -54,7 +70,7 @@ def setup_notifiers(config: dict) -> NotificationManager:
             email_config.get('receiver_email')
         ]):
             notification_manager.add_notifier(
-                EmailNotifier(
+                plugins.load('notifier', 'email')(
                     email_config['smtp_server'],
                     email_config['smtp_port'],
                     email_config['sender_email'],
@@ -68,8 +84,339 @@ def setup_notifiers(config: dict) -> NotificationManager:
     return notification_manager
 
 
+def setup_cache(config: dict):
+    """Ouvre le cache local des bougies (CandleCache) si activé dans la configuration"""
+    cache_config = config.get('cache') or {}
+    if not cache_config.get('enabled', False):
+        return None
+
+    from src.candle_cache import CandleCache
+
+    cache = CandleCache(
+        cache_config.get('path', 'data/candles.db'),
+        cache_config.get('open_candle_ttl', 0)
+    )
+    print(f"💾 Cache des bougies: {cache.path}")
+    return cache
+
+
+def setup_journal(config: dict) -> Optional[AlertJournal]:
+    """Ouvre le journal persistant des alertes si activé dans la configuration"""
+    history_config = config.get('history') or {}
+    if not history_config.get('enabled', False):
+        return None
+
+    journal = AlertJournal(
+        history_config.get('path', 'data/alerts.db'),
+        batch_size=history_config.get('batch_size', 100),
+        flush_interval=history_config.get('flush_interval', 1.0)
+    )
+    print(f"📒 Journal des alertes: {journal.path} ({journal.count()} alertes)")
+    return journal
+
+
+def setup_cooldown_store(config: dict):
+    """Ouvre l'état des cooldowns partagé entre processus si `cooldown.store` est défini"""
+    path = (config.get('cooldown') or {}).get('store')
+    if not path:
+        return None
+
+    from src.cooldown_store import SQLiteCooldownStore
+    store = SQLiteCooldownStore(path)
+    print(f"⏳ Cooldowns partagés: {store.path}")
+    return store
+
+
+def setup_rate_limiter(config: dict, data_source: str, shards: int = 1) -> Optional[RateLimiter]:
+    """
+    Crée le limiteur de débit partagé par toutes les requêtes de la source
+
+    En mode multi-processus, chaque worker reçoit 1/`shards` de la limite
+    pour que l'ensemble reste sous la limite de l'API.
+    """
+    rate_config = config.get('rate_limit') or {}
+    if not rate_config.get('enabled', False):
+        return None
+
+    if data_source.lower() == 'twelvedata':
+        capacity = rate_config.get('twelvedata_credits_per_minute', 8) / shards
+        print(f"🚦 Limite Twelve Data: {capacity:g} crédits/min")
+    else:
+        capacity = rate_config.get('binance_weight_per_minute', 6000) / shards
+        print(f"🚦 Limite Binance: poids {capacity:g}/min")
+    return RateLimiter(capacity, period=60.0)
+
+
+def setup_metrics(config: dict) -> Tuple[object, Optional[MetricsServer]]:
+    """Crée le registre de métriques et démarre l'endpoint /metrics si activés"""
+    metrics_config = config.get('metrics') or {}
+    if not metrics_config.get('enabled', False):
+        return NULL_METRICS, None
+
+    metrics = Metrics()
+    metrics.describe('stage_seconds', "Durée de chaque étape de la boucle (par symbole)")
+    metrics.describe('fetch_errors_total', "Erreurs de récupération des prix et bougies")
+    metrics.describe('loop_lag_seconds', "Retard de la boucle par rapport à l'attente programmée")
+    metrics.describe('stream_message_errors_total', "Messages du flux ignorés (invalides ou en erreur)")
+
+    server = None
+    port = metrics_config.get('port', 9108)
+    if port:
+        server = MetricsServer(metrics, metrics_config.get('host', '127.0.0.1'), port)
+        print(f"📈 Métriques: {server.url}")
+    return metrics, server
+
+
+def register_component_metrics(metrics, notification_manager: NotificationManager,
+                               rate_limiter: Optional[RateLimiter]):
+    """Expose les compteurs des files de notification et du limiteur de débit"""
+    def notifier_values(field: str):
+        return lambda: {(('notifier', name),): stats[field]
+                        for name, stats in notification_manager.stats().items()}
+
+    metrics.register_callback('notifier_queue_depth', 'gauge', notifier_values('queued'))
+    metrics.register_callback('notifications_dropped_total', 'counter', notifier_values('dropped'))
+    metrics.register_callback('notification_errors_total', 'counter', notifier_values('errors'))
+
+    if rate_limiter is not None:
+        metrics.register_callback('rate_limit_retries_total', 'counter',
+                                  lambda: {(): rate_limiter.throttled})
+        metrics.register_callback('rate_limit_wait_seconds_total', 'counter',
+                                  lambda: {(): rate_limiter.wait_time})
+        metrics.register_callback('rate_limit_coalesced_total', 'counter',
+                                  lambda: {(): rate_limiter.coalesced})
+
+
+def setup_fetcher(config: dict, data_source: str, rate_limiter: Optional[RateLimiter]):
+    """Crée le fetcher REST de la source (synchrone ou asyncio selon `trading.async_fetch`)"""
+    if config['trading'].get('async_fetch', False):
+        if data_source.lower() == 'twelvedata':
+            data_fetcher = plugins.load('fetcher', 'twelvedata_async')(
+                config.get('twelvedata', {}).get('api_key'),
+                rate_limiter=rate_limiter
+            )
+        else:
+            data_fetcher = plugins.load('fetcher', 'binance_async')(rate_limiter=rate_limiter)
+        print(f"✅ Utilisation de {data_source} (asyncio, connexions keep-alive)")
+    elif data_source.lower() == 'twelvedata':
+        api_key = config.get('twelvedata', {}).get('api_key')
+        data_fetcher = plugins.load('fetcher', 'twelvedata')(
+            api_key if api_key else None,
+            cache=setup_cache(config),
+            rate_limiter=rate_limiter
+        )
+        print("✅ Utilisation de Twelve Data API")
+    else:
+        data_fetcher = plugins.load('fetcher', 'binance')(
+            config['binance']['api_key'],
+            config['binance']['api_secret'],
+            cache=setup_cache(config),
+            rate_limiter=rate_limiter
+        )
+        print("✅ Utilisation de Binance API")
+    return data_fetcher
+
+
+def create_scheduler(config: dict, data_fetcher, subscriptions: list,
+                     metrics=NULL_METRICS) -> WatchlistScheduler:
+    """Planificateur de la watchlist configuré depuis `trading` et `watchlist`"""
+    trading_config = config['trading']
+    watchlist_config = config.get('watchlist') or {}
+    return WatchlistScheduler(
+        data_fetcher,
+        subscriptions,
+        trading_config.get('data_source', 'binance'),
+        watchlist_config.get('max_concurrent_fetches', 4),
+        resample=watchlist_config.get('resample', False),
+        metrics=metrics,
+        event_driven=trading_config.get('event_driven', False),
+        candle_grace=trading_config.get('candle_grace', 1.0)
+    )
+
+
+def setup_replay(config: dict) -> Tuple[Optional[ReplaySession], Optional[MarketRecorder]]:
+    """Ouvre le journal de marché à rejouer, ou celui où enregistrer les réponses"""
+    replay_config = config.get('replay') or {}
+    if replay_config.get('play'):
+        session = ReplaySession(replay_config['play'], replay_config.get('speed', 1))
+        speed = session.clock.speed
+        print(f"⏯️  Rejeu de {session.path}: {session.total} réponses "
+              f"({'vitesse max' if not speed else f'{speed:g}x'})")
+        return session, None
+    if replay_config.get('record'):
+        recorder = MarketRecorder(replay_config['record'])
+        print(f"⏺️  Enregistrement des réponses dans {recorder.path}")
+        return None, recorder
+    return None, None
+
+
+def run_polling(scheduler: WatchlistScheduler, notification_manager: NotificationManager,
+                check_interval: int, metrics=NULL_METRICS, summary_interval: float = 0,
+                replay: Optional[ReplaySession] = None, min_check_interval: float = 1.0,
+                once: bool = False) -> Optional[int]:
+    """
+    Boucle de surveillance par interrogation périodique de l'API REST
+
+    En mode événementiel, l'attente entre deux cycles est calculée par le
+    scheduler (plus courte près des bandes, alignée sur les clôtures de
+    bougies) et seules les surveillances dont le prix a changé sont affichées.
+
+    Avec `once`, un seul cycle est exécuté et le nombre d'erreurs est renvoyé.
+    """
+    previous_start = None
+    # Attente réellement programmée après le cycle précédent (référence du retard)
+    delay = check_interval
+    last_summary = time.monotonic()
+    sleep = replay.clock.sleep if replay is not None else time.sleep
+    while True:
+        start = time.monotonic()
+        if previous_start is not None:
+            lag = start - previous_start - delay
+            metrics.observe('loop_lag_seconds', max(lag, 0.0))
+            metrics.set_gauge('loop_lag_last_seconds', lag)
+        previous_start = start
+
+        if summary_interval and start - last_summary >= summary_interval:
+            print(metrics.summary())
+            last_summary = start
+
+        try:
+            with metrics.timer('stage_seconds', stage='cycle'):
+                results = scheduler.run_once()
+            now = (replay.clock.now() if replay is not None else datetime.now()).strftime("%H:%M:%S")
+
+            errors = 0
+            for result in results:
+                subscription = result['subscription']
+                if not result['changed']:
+                    continue
+                if result['error'] is not None:
+                    errors += 1
+                    print(f"❌ Erreur {subscription.symbol} ({subscription.interval}): "
+                          f"{result['error']}")
+                    continue
+
+                # Affichage des infos
+                proximity_data = result['proximity']
+                if proximity_data is not None:
+                    print(f"[{now}] {subscription.symbol} {subscription.interval} | "
+                          f"Prix: {proximity_data['current_price']} | "
+                          f"Haute: {proximity_data['upper_band']} ({proximity_data['distance_upper_pct']}%) | "
+                          f"Basse: {proximity_data['lower_band']} ({proximity_data['distance_lower_pct']}%)")
+                else:
+                    # Prix écarté loin des bandes : bandes déjà calculées, sans les distances
+                    upper, _, lower = subscription.bands.current_bands()
+                    print(f"[{now}] {subscription.symbol} {subscription.interval} | "
+                          f"Prix: {result['price']} | "
+                          f"Haute: {round(upper, 2)} | Basse: {round(lower, 2)}")
+
+                # Envoi des alertes
+                for alert in result['alerts']:
+                    with metrics.timer('stage_seconds', stage='notify', symbol=subscription.symbol):
+                        notification_manager.send_alert(alert)
+
+            if once:
+                return errors
+            if replay is not None and replay.finished:
+                print(f"⏹️  Fin du rejeu ({replay.replayed}/{replay.total} réponses)")
+                return
+
+            # Attente avant la prochaine vérification
+            if scheduler.event_driven:
+                delay = scheduler.next_delay(check_interval, min_check_interval)
+            else:
+                delay = check_interval
+            sleep(delay)
+
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            print(f"❌ Erreur: {e}")
+            if once:
+                return 1
+            delay = check_interval
+            sleep(delay)
+
+
+def run_worker(symbols: list, sender, config: dict, shards: int):
+    """
+    Worker du mode multi-processus : surveille son shard de symboles
+
+    Les alertes partent vers le superviseur par `sender` (ShardAlertSender) ;
+    le journal et les notifications sont tenus par le superviseur.
+    """
+    shard = set(symbols)
+    cooldown_store = setup_cooldown_store(config)
+    subscriptions = [s for s in load_subscriptions(config, cooldown_store=cooldown_store)
+                     if s.symbol in shard]
+    data_source = config['trading'].get('data_source', 'binance')
+    rate_limiter = setup_rate_limiter(config, data_source, shards)
+    scheduler = create_scheduler(config, setup_fetcher(config, data_source, rate_limiter),
+                                 subscriptions)
+    try:
+        run_polling(scheduler, sender, config['trading']['check_interval'],
+                    min_check_interval=config['trading'].get('min_check_interval', 1.0))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.close()
+        if cooldown_store is not None:
+            cooldown_store.close()
+
+
+def run_sharded(config: dict, subscriptions: list, notification_manager: NotificationManager,
+                journal: Optional[AlertJournal], workers: int):
+    """Mode multi-processus : symboles répartis par hachage cohérent entre `workers` processus"""
+    sharding_config = config.get('sharding') or {}
+    cooldown_config = config.get('cooldown') or {}
+    # Dédoublonnage sur le plus court des cooldowns configurés (la clé n'inclut pas la règle)
+    cooldown_seconds = min([cooldown_config.get('seconds', DEFAULT_COOLDOWN_SECONDS),
+                            *(cooldown_config.get('rules') or {}).values()])
+    symbols = list(dict.fromkeys(s.symbol for s in subscriptions))
+    supervisor = ShardSupervisor(
+        symbols, workers, run_worker, (config, workers),
+        notification_manager=notification_manager,
+        journal=journal,
+        replicas=sharding_config.get('replicas', DEFAULT_REPLICAS),
+        cooldown_seconds=cooldown_seconds
+    )
+    for shard, shard_symbols in supervisor.assignments.items():
+        print(f"🧩 Worker {shard}: {len(shard_symbols)} symboles")
+    try:
+        supervisor.run(sharding_config.get('check_interval', 5.0))
+    finally:
+        print(f"📨 {supervisor.dispatcher.dispatched} alertes transmises, "
+              f"{supervisor.dispatcher.duplicates} doublons écartés, "
+              f"{supervisor.restarts} redémarrages")
+
+
+def run_streaming(subscriptions: list, notification_manager: NotificationManager,
+                  rate_limiter: Optional[RateLimiter] = None, metrics=NULL_METRICS):
+    """Surveillance temps réel via le flux WebSocket Binance"""
+    from src.binance_stream import BinanceStreamSource
+    AsyncBinanceFetcher = plugins.load('fetcher', 'binance_async')
+
+    def on_event(subscription, proximity_data, alerts):
+        for alert in alerts:
+            with metrics.timer('stage_seconds', stage='notify', symbol=subscription.symbol):
+                notification_manager.send_alert(alert)
+
+    async def stream():
+        async with AsyncBinanceFetcher(rate_limiter=rate_limiter) as rest_fetcher:
+            source = BinanceStreamSource(subscriptions, rest_fetcher, on_event, metrics=metrics)
+            print(f"📡 Flux temps réel: {len(source.streams)} flux souscrits")
+            await source.run()
+
+    asyncio.run(stream())
+
+
 def main():
     """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Alertes de proximité des Bandes de Bollinger")
+    parser.add_argument('--once', action='store_true',
+                        help="Une seule vérification puis arrêt (code 1 en cas d'erreur)")
+    args = parser.parse_args()
+
     print("🚀 Démarrage du système d'alerte Bollinger Bands")
     print("=" * 60)
 
@@ -85,100 +432,121 @@ def main():
     # Paramètres
     bb_config = config['bollinger_bands']
     trading_config = config['trading']
-    symbol = trading_config['symbol']
-    interval = trading_config['interval']
     check_interval = trading_config['check_interval']
     data_source = trading_config.get('data_source', 'binance')
+    journal = setup_journal(config)
+    replay, recorder = setup_replay(config)
+    # Au rejeu, cooldowns en mémoire : l'heure rejouée ne doit pas toucher l'état partagé
+    cooldown_store = setup_cooldown_store(config) if replay is None else None
+    subscriptions = load_subscriptions(config, journal, cooldown_store)
 
-    print(f"📊 Symbole: {symbol}")
+    if len(subscriptions) == 1:
+        print(f"📊 Symbole: {subscriptions[0].symbol}")
+        print(f"⏱️  Intervalle: {subscriptions[0].interval}")
+    else:
+        print(f"📊 Watchlist: {len(subscriptions)} surveillances")
     print(f"📡 Source: {data_source.upper()}")
-    print(f"⏱️  Intervalle: {interval}")
     print(f"🔄 Vérification toutes les {check_interval}s")
     print(f"📏 Proximité: {bb_config['proximity_percent']}%")
     print("=" * 60 + "\n")
 
     # Initialisation des composants selon la source de données
-    if data_source.lower() == 'twelvedata':
-        api_key = config.get('twelvedata', {}).get('api_key')
-        data_fetcher = TwelveDataFetcher(api_key if api_key else None)
-        print("✅ Utilisation de Twelve Data API")
+    streaming = (trading_config.get('streaming', False) and data_source.lower() == 'binance'
+                 and not args.once)
+    workers = (config.get('sharding') or {}).get('workers', 0)
+    sharded = (workers > 1 and not streaming and replay is None and recorder is None
+               and not args.once)
+    # En multi-processus, chaque worker a son propre limiteur (part de la limite)
+    rate_limiter = setup_rate_limiter(config, data_source) if replay is None and not sharded else None
+    if replay is not None:
+        # Rejeu : pas de flux temps réel, et un cache vide en mémoire si le cache
+        # est activé pour retrouver la même suite de requêtes qu'à l'enregistrement
+        streaming = False
+        cache = None
+        if (config.get('cache') or {}).get('enabled'):
+            from src.candle_cache import CandleCache
+            cache = CandleCache(':memory:')
+        name = 'twelvedata' if data_source.lower() == 'twelvedata' else 'binance'
+        data_fetcher = plugins.load('fetcher', name)(cache=cache, client=replay.client())
+        for subscription in subscriptions:
+            subscription.alert_manager.clock = replay.clock.now
+    elif streaming:
+        data_fetcher = None
+        print("✅ Utilisation du flux WebSocket Binance")
+    elif sharded:
+        data_fetcher = None
+        print(f"✅ {workers} workers (un processus par shard de symboles)")
     else:
-        data_fetcher = DataFetcher(
-            config['binance']['api_key'],
-            config['binance']['api_secret']
-        )
-        print("✅ Utilisation de Binance API")
+        data_fetcher = setup_fetcher(config, data_source, rate_limiter)
+
+    if recorder is not None:
+        if hasattr(data_fetcher, 'client'):
+            record_fetcher(data_fetcher, recorder)
+        else:
+            print("⚠️ Enregistrement disponible uniquement avec les fetchers synchrones")
 
-    bb = BollingerBands(bb_config['period'], bb_config['multiplier'])
-    alert_manager = AlertManager()
     notification_manager = setup_notifiers(config)
+    metrics, metrics_server = setup_metrics(config)
+    if metrics.enabled:
+        register_component_metrics(metrics, notification_manager, rate_limiter)
 
     print("✅ Système initialisé et en fonctionnement\n")
 
-    # Boucle principale
+    errors = None
     try:
-        while True:
+        if streaming:
+            run_streaming(subscriptions, notification_manager, rate_limiter, metrics)
+        elif sharded:
+            run_sharded(config, subscriptions, notification_manager, journal, workers)
+        else:
+            scheduler = create_scheduler(config, data_fetcher, subscriptions, metrics)
+            if replay is not None:
+                scheduler.clock = replay.clock.time
             try:
-                # Récupération des données
-                outputsize = bb_config['period'] + 50
-                if data_source.lower() == 'twelvedata':
-                    prices = data_fetcher.get_latest_close_prices(
-                        symbol,
-                        interval,
-                        outputsize=outputsize
-                    )
-                else:
-                    prices = data_fetcher.get_latest_close_prices(
-                        symbol,
-                        interval,
-                        limit=outputsize
-                    )
-
-                # Calcul des bandes
-                upper, basis, lower = bb.calculate(prices)
-
-                # Prix actuel
-                current_price = data_fetcher.get_current_price(symbol)
-
-                # Vérification de la proximité
-                proximity_data = bb.check_proximity(
-                    current_price,
-                    upper.iloc[-1],
-                    lower.iloc[-1],
-                    bb_config['proximity_percent']
+                errors = run_polling(
+                    scheduler,
+                    notification_manager,
+                    check_interval,
+                    metrics,
+                    (config.get('metrics') or {}).get('summary_interval', 0),
+                    replay,
+                    trading_config.get('min_check_interval', 1.0),
+                    once=args.once
                 )
+            finally:
+                scheduler.close()
 
-                # Affichage des infos
-                now = datetime.now().strftime("%H:%M:%S")
-                print(f"[{now}] Prix: {current_price} | "
-                      f"Haute: {proximity_data['upper_band']} ({proximity_data['distance_upper_pct']}%) | "
-                      f"Basse: {proximity_data['lower_band']} ({proximity_data['distance_lower_pct']}%)")
-
-                # Vérification et envoi des alertes
-                alerts = alert_manager.check_and_alert(proximity_data)
-
-                for alert in alerts:
-                    notification_manager.send_alert(alert)
+    except KeyboardInterrupt:
+        print("\n\n🛑 Arrêt du système")
 
-                # Attente avant la prochaine vérification
-                time.sleep(check_interval)
+        if journal is not None:
+            # Les alertes sont déjà sur disque au fil de l'eau
+            print(f"📊 Nombre total d'alertes: {journal.count()}")
+        else:
+            print(f"📊 Nombre total d'alertes: {len(merge_alert_history(subscriptions))}")
 
-            except KeyboardInterrupt:
-                raise
+            # Sauvegarde de l'historique
+            try:
+                save_alert_history(subscriptions, 'alert_history.json')
+                print("💾 Historique sauvegardé dans alert_history.json")
             except Exception as e:
-                print(f"❌ Erreur: {e}")
-                time.sleep(check_interval)
+                print(f"⚠️ Erreur lors de la sauvegarde: {e}")
 
-    except KeyboardInterrupt:
-        print("\n\n🛑 Arrêt du système")
-        print(f"📊 Nombre total d'alertes: {len(alert_manager.alert_history)}")
+    finally:
+        # Envoi des alertes encore en file et fermeture des connexions
+        notification_manager.close()
+        if journal is not None:
+            journal.close()
+        if cooldown_store is not None:
+            cooldown_store.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        if recorder is not None:
+            recorder.close()
+            print(f"💾 {recorder.records} réponses enregistrées dans {recorder.path}")
 
-        # Sauvegarde de l'historique
-        try:
-            alert_manager.save_history('alert_history.json')
-            print("💾 Historique sauvegardé dans alert_history.json")
-        except Exception as e:
-            print(f"⚠️ Erreur lors de la sauvegarde: {e}")
+    if args.once:
+        sys.exit(1 if errors else 0)
 
 
 if __name__ == "__main__":
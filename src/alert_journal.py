@@ -0,0 +1,196 @@
+"""
+Module de journal des alertes (SQLite, en ajout seul)
+
+Chaque alerte est écrite sur disque dès son déclenchement. Les commits sont
+regroupés : au plus tard après `batch_size` alertes ou `flush_interval`
+secondes. En WAL avec synchronous=FULL, chaque commit fait un fsync du
+journal : une rafale ne coûte qu'un fsync par lot, et un crash (coupure de
+courant comprise) ne perd au plus que la dernière fraction de seconde.
+Les index (symbole, intervalle, date), (symbole, date) et (date) gardent les
+requêtes rapides sur des millions d'alertes, filtrées ou non par intervalle,
+sans jamais tout charger en mémoire.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Union
+
+# Colonnes stockées pour chaque alerte (en plus de `details`, sérialisé en JSON)
+ALERT_FIELDS = ('timestamp', 'symbol', 'interval', 'type', 'message',
+                'price', 'band_value', 'distance_pct')
+
+TimeBound = Union[None, float, str, datetime]
+
+
+def _to_epoch(value: TimeBound) -> Optional[float]:
+    """Convertit une borne de temps (epoch, ISO 8601 ou datetime) en secondes"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+class AlertJournal:
+    """Journal persistant des alertes avec commits groupés et requêtes indexées"""
+
+    def __init__(self, path: str = "data/alerts.db", batch_size: int = 100,
+                 flush_interval: float = 1.0):
+        """
+        Ouvre (ou crée) le journal
+
+        Args:
+            path: Chemin du fichier SQLite
+            batch_size: Nombre d'alertes en attente qui déclenche un commit
+            flush_interval: Délai maximum en secondes avant le commit d'une alerte
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL ne ferait le fsync du WAL qu'aux checkpoints : FULL à chaque commit (groupé)
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY,
+                ts REAL NOT NULL,
+                timestamp TEXT NOT NULL,
+                symbol TEXT,
+                interval TEXT,
+                type TEXT NOT NULL,
+                message TEXT,
+                price REAL,
+                band_value REAL,
+                distance_pct REAL,
+                details TEXT
+            );
+            CREATE INDEX IF NOT EXISTS alerts_symbol_ts ON alerts (symbol, interval, ts);
+            CREATE INDEX IF NOT EXISTS alerts_symbol_only_ts ON alerts (symbol, ts);
+            CREATE INDEX IF NOT EXISTS alerts_ts ON alerts (ts);
+        """)
+
+    def append(self, alert: Dict):
+        """
+        Ajoute une alerte au journal (commit groupé)
+
+        Args:
+            alert: Alerte renvoyée par `AlertManager.trigger_alert`
+        """
+        details = alert.get('details')
+        row = (
+            _to_epoch(alert['timestamp']),
+            *(alert.get(field) for field in ALERT_FIELDS),
+            json.dumps(details) if details is not None else None,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO alerts (ts, timestamp, symbol, interval, type, message, "
+                "price, band_value, distance_pct, details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._commit()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _commit(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            self._conn.commit()
+            self._pending = 0
+
+    def flush(self):
+        """Écrit immédiatement les alertes en attente sur disque"""
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        """Écrit les alertes en attente et ferme le journal"""
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+    @staticmethod
+    def _where(symbol: Optional[str], interval: Optional[str], alert_type: Optional[str],
+               start: TimeBound, end: TimeBound):
+        clauses, params = [], []
+        for column, value in (('symbol', symbol), ('interval', interval), ('type', alert_type)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_to_epoch(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(_to_epoch(end))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, symbol: Optional[str] = None, interval: Optional[str] = None,
+              alert_type: Optional[str] = None, start: TimeBound = None, end: TimeBound = None,
+              limit: Optional[int] = None, newest_first: bool = False,
+              with_details: bool = False) -> Iterator[Dict]:
+        """
+        Parcourt les alertes correspondant aux filtres, sans tout charger en mémoire
+
+        Args:
+            symbol: Symbole
+            interval: Intervalle
+            alert_type: 'upper' ou 'lower'
+            start: Date minimum incluse (epoch, ISO 8601 ou datetime)
+            end: Date maximum exclue
+            limit: Nombre maximum d'alertes
+            newest_first: Ordre antichronologique
+            with_details: Inclure les données de proximité complètes
+
+        Returns:
+            Itérateur d'alertes (même format que `AlertManager.trigger_alert`)
+        """
+        self.flush()
+        where, params = self._where(symbol, interval, alert_type, start, end)
+        sql = (f"SELECT {', '.join(ALERT_FIELDS)}, details FROM alerts{where} "
+               f"ORDER BY ts {'DESC' if newest_first else 'ASC'}, id {'DESC' if newest_first else 'ASC'}")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        # Connexion de lecture dédiée (WAL) : l'écriture n'est pas bloquée pendant le parcours
+        conn = sqlite3.connect(self.path)
+        try:
+            for row in conn.execute(sql, params):
+                alert = dict(zip(ALERT_FIELDS, row))
+                if with_details and row[-1] is not None:
+                    alert['details'] = json.loads(row[-1])
+                yield alert
+        finally:
+            conn.close()
+
+    def tail(self, limit: int = 10, **filters) -> List[Dict]:
+        """Les `limit` alertes les plus récentes, de la plus ancienne à la plus récente"""
+        alerts = list(self.query(limit=limit, newest_first=True, **filters))
+        alerts.reverse()
+        return alerts
+
+    def count(self, symbol: Optional[str] = None, interval: Optional[str] = None,
+              alert_type: Optional[str] = None, start: TimeBound = None,
+              end: TimeBound = None) -> int:
+        """Nombre d'alertes correspondant aux filtres"""
+        where, params = self._where(symbol, interval, alert_type, start, end)
+        with self._lock:
+            self._commit()
+            return self._conn.execute(f"SELECT COUNT(*) FROM alerts{where}", params).fetchone()[0]
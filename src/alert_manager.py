@@ -1,19 +1,95 @@
 """
 Module de gestion des alertes
 """
+from collections import deque
 from datetime import datetime
-from typing import Dict, List
+from itertools import islice
+from typing import Callable, Dict, List, Optional
 import json
 
+from src.alert_journal import AlertJournal
+from src.cooldown_store import CooldownKey, MemoryCooldownStore
+
+# Délai minimum entre deux alertes du même type
+DEFAULT_COOLDOWN_SECONDS = 300
+
+# Nombre d'alertes gardées en mémoire (l'historique complet est dans le journal)
+DEFAULT_HISTORY_SIZE = 1000
+
+# Règle de détection par défaut (proximité d'une bande)
+DEFAULT_RULE = 'proximity'
+
+BANDS = ('upper', 'lower')
+
 
 class AlertManager:
     """Gère la détection et l'historique des alertes"""
 
-    def __init__(self):
-        self.last_alert_upper = None
-        self.last_alert_lower = None
-        self.cooldown_seconds = 300  # 5 minutes entre alertes similaires
-        self.alert_history = []
+    def __init__(self, symbol: Optional[str] = None, interval: Optional[str] = None,
+                 journal: Optional[AlertJournal] = None, history_size: int = DEFAULT_HISTORY_SIZE,
+                 store=None, rule: str = DEFAULT_RULE, cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
+                 rearm_distance: Optional[float] = None):
+        """
+        Initialise le gestionnaire d'alertes
+
+        Args:
+            symbol: Symbole surveillé (ajouté aux alertes)
+            interval: Intervalle des bougies (ajouté aux alertes)
+            journal: Journal persistant où chaque alerte est écrite dès son déclenchement
+            history_size: Nombre d'alertes récentes gardées en mémoire
+            store: État des cooldowns (MemoryCooldownStore par défaut,
+                SQLiteCooldownStore pour le partager entre processus)
+            rule: Nom de la règle de détection (dernier élément de la clé de cooldown)
+            cooldown_seconds: Délai minimum entre deux alertes de la même bande
+            rearm_distance: Hystérésis : après une alerte, la bande n'est
+                réarmée qu'une fois le prix à plus de `rearm_distance` % d'elle
+                (None = cooldown seul)
+        """
+        self.symbol = symbol
+        self.interval = interval
+        self.journal = journal
+        self.store = store if store is not None else MemoryCooldownStore()
+        self.rule = rule
+        self.cooldown_seconds = cooldown_seconds
+        self.rearm_distance = rearm_distance
+        self.alert_history = deque(maxlen=history_size)
+        # Source de l'heure courante (remplacée par l'horloge virtuelle au rejeu)
+        self.clock = datetime.now
+        # Bandes connues comme armées (évite d'écrire dans le store à chaque tick)
+        self._armed: Dict[str, bool] = {}
+
+    def key(self, alert_type: str) -> CooldownKey:
+        """Clé de cooldown (symbole, intervalle, bande, règle)"""
+        return (self.symbol or '', self.interval or '', alert_type, self.rule)
+
+    def _last_alert(self, alert_type: str) -> Optional[datetime]:
+        timestamp = self.store.last_alert(self.key(alert_type))
+        return datetime.fromtimestamp(timestamp) if timestamp is not None else None
+
+    def _set_last_alert(self, alert_type: str, value: Optional[datetime]):
+        if value is None:
+            self.store.clear(self.key(alert_type))
+        else:
+            self.store.record(self.key(alert_type), value.timestamp())
+        self._armed.pop(alert_type, None)
+
+    @property
+    def last_alert_upper(self) -> Optional[datetime]:
+        """Heure de la dernière alerte bande haute (None = cooldown remis à zéro)"""
+        return self._last_alert('upper')
+
+    @last_alert_upper.setter
+    def last_alert_upper(self, value: Optional[datetime]):
+        self._set_last_alert('upper', value)
+
+    @property
+    def last_alert_lower(self) -> Optional[datetime]:
+        """Heure de la dernière alerte bande basse"""
+        return self._last_alert('lower')
+
+    @last_alert_lower.setter
+    def last_alert_lower(self, value: Optional[datetime]):
+        self._set_last_alert('lower', value)
 
     def should_alert(self, alert_type: str) -> bool:
         """
@@ -25,14 +101,41 @@ class AlertManager:
         Returns:
             True si on peut alerter
         """
-        now = datetime.now()
-        last_alert = self.last_alert_upper if alert_type == 'upper' else self.last_alert_lower
-
+        key = self.key(alert_type)
+        last_alert = self.store.last_alert(key)
         if last_alert is None:
             return True
+        if self.rearm_distance is not None and not self.store.is_armed(key):
+            return False
+        return self.clock().timestamp() - last_alert >= self.cooldown_seconds
+
+    def _acquire(self, alert_type: str, now: datetime) -> bool:
+        """Réserve l'alerte dans le store (atomique si le store est partagé)"""
+        acquired = self.store.acquire(self.key(alert_type), now.timestamp(),
+                                      self.cooldown_seconds, self.rearm_distance is not None)
+        if acquired:
+            self._armed[alert_type] = False
+        return acquired
+
+    def rearm(self, alert_type: str):
+        """Réarme une bande dont le prix est sorti de la zone d'hystérésis"""
+        if self._armed.get(alert_type) is not True:
+            self.store.rearm(self.key(alert_type))
+            self._armed[alert_type] = True
 
-        time_since_last = (now - last_alert).total_seconds()
-        return time_since_last >= self.cooldown_seconds
+    def update_hysteresis(self, proximity_data: Optional[Dict]):
+        """
+        Réarme les bandes dont le prix s'est éloigné de plus de `rearm_distance` %
+
+        Args:
+            proximity_data: Données de proximité, ou None si le prix a été
+                écarté par le filtre rapide (loin des deux bandes)
+        """
+        if self.rearm_distance is None:
+            return
+        for band in BANDS:
+            if proximity_data is None or proximity_data[f'distance_{band}_pct'] > self.rearm_distance:
+                self.rearm(band)
 
     def trigger_alert(self, alert_type: str, proximity_data: Dict) -> Dict:
         """
@@ -45,21 +148,33 @@ class AlertManager:
         Returns:
             Dict avec les informations de l'alerte
         """
-        now = datetime.now()
+        now = self.clock()
+        self.store.record(self.key(alert_type), now.timestamp())
+        self._armed[alert_type] = False
+        return self._build_alert(alert_type, proximity_data, now)
 
+    def _build_alert(self, alert_type: str, proximity_data: Dict, now: datetime) -> Dict:
         if alert_type == 'upper':
-            self.last_alert_upper = now
             message = f"⚠️ ALERTE BANDE HAUTE"
             band_value = proximity_data['upper_band']
             distance = proximity_data['distance_upper_pct']
         else:
-            self.last_alert_lower = now
             message = f"⚠️ ALERTE BANDE BASSE"
             band_value = proximity_data['lower_band']
             distance = proximity_data['distance_lower_pct']
 
+        if self.symbol:
+            message += f" - {self.symbol}"
+            if self.interval:
+                message += f" ({self.interval})"
+        if proximity_data.get(f'touched_{alert_type}'):
+            # Zone atteinte par le plus haut / plus bas entre deux vérifications
+            message += " - mèche"
+
         alert = {
             'timestamp': now.isoformat(),
+            'symbol': self.symbol,
+            'interval': self.interval,
             'type': alert_type,
             'message': message,
             'price': proximity_data['current_price'],
@@ -69,29 +184,38 @@ class AlertManager:
         }
 
         self.alert_history.append(alert)
+        if self.journal is not None:
+            self.journal.append(alert)
         return alert
 
-    def check_and_alert(self, proximity_data: Dict) -> List[Dict]:
+    def check_and_alert(self, proximity_data: Dict,
+                        filters: Optional[Dict[str, Callable[[], bool]]] = None) -> List[Dict]:
         """
         Vérifie les conditions et déclenche les alertes si nécessaire
 
         Args:
             proximity_data: Données de proximité des bandes
+            filters: Conditions supplémentaires par type d'alerte ('upper' /
+                'lower'), ex: RSI > 70 pour la bande haute
 
         Returns:
             Liste des alertes déclenchées
         """
         alerts = []
+        filters = filters or {}
+        self.update_hysteresis(proximity_data)
 
-        # Alerte bande haute
-        if proximity_data['near_upper'] and self.should_alert('upper'):
-            alert = self.trigger_alert('upper', proximity_data)
-            alerts.append(alert)
+        def confirmed(alert_type: str) -> bool:
+            condition = filters.get(alert_type)
+            return condition is None or condition()
 
-        # Alerte bande basse
-        if proximity_data['near_lower'] and self.should_alert('lower'):
-            alert = self.trigger_alert('lower', proximity_data)
-            alerts.append(alert)
+        for alert_type in BANDS:
+            if not proximity_data[f'near_{alert_type}'] or not confirmed(alert_type):
+                continue
+            # Vérification et enregistrement du cooldown en une seule opération
+            now = self.clock()
+            if self._acquire(alert_type, now):
+                alerts.append(self._build_alert(alert_type, proximity_data, now))
 
         return alerts
 
@@ -105,17 +229,43 @@ class AlertManager:
         Returns:
             Liste des dernières alertes
         """
-        return self.alert_history[-limit:]
+        if limit >= len(self.alert_history):
+            return list(self.alert_history)
+        return list(islice(self.alert_history, len(self.alert_history) - limit, None))
 
     def save_history(self, filepath: str):
-        """Sauvegarde l'historique dans un fichier"""
+        """Sauvegarde l'historique récent dans un fichier"""
         with open(filepath, 'w') as f:
-            json.dump(self.alert_history, f, indent=2)
+            json.dump(list(self.alert_history), f, indent=2)
+
+    def load_history(self, filepath: Optional[str] = None):
+        """
+        Recharge les dernières alertes en mémoire
+
+        Sans fichier, les alertes viennent du journal (requête indexée sur
+        symbole/intervalle). Un fichier JSONL est lu en flux ; seul un ancien
+        fichier JSON (liste complète) est chargé d'un bloc.
+
+        Args:
+            filepath: Fichier JSON ou JSONL (None = journal)
+        """
+        history = deque(maxlen=self.alert_history.maxlen)
+        if filepath is None:
+            if self.journal is not None:
+                history.extend(self.journal.tail(
+                    history.maxlen, symbol=self.symbol, interval=self.interval
+                ))
+            self.alert_history = history
+            return
 
-    def load_history(self, filepath: str):
-        """Charge l'historique depuis un fichier"""
         try:
             with open(filepath, 'r') as f:
-                self.alert_history = json.load(f)
+                if f.read(1) == '[':
+                    f.seek(0)
+                    history.extend(json.load(f))
+                else:
+                    f.seek(0)
+                    history.extend(json.loads(line) for line in f if line.strip())
         except FileNotFoundError:
-            self.alert_history = []
+            pass
+        self.alert_history = history
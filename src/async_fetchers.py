@@ -0,0 +1,357 @@
+"""
+Module de récupération asynchrone des données (Binance / Twelve Data)
+
+Les requêtes passent par une session aiohttp partagée (connexions keep-alive
+réutilisées), ce qui permet de lancer en parallèle la récupération des
+bougies et du prix d'un symbole, ainsi que celles de nombreux symboles.
+"""
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from src.data_fetcher import klines_to_arrays, klines_to_dataframe
+from src.rate_limiter import (
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    RateLimiter,
+    binance_retry_after,
+    twelvedata_retry_after
+)
+from src.twelve_data_fetcher import INTERVAL_MAP, values_to_dataframe
+
+
+class AsyncFetcherError(Exception):
+    """Erreur renvoyée par l'API de données"""
+
+    def __init__(self, message: str, status: Optional[int] = None, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class _AsyncFetcher(ABC):
+    """Base commune : session HTTP poolée et requêtes concurrentes"""
+
+    BASE_URL = ""
+
+    # En-tête de poids consommé renvoyé par l'API (None = aucun)
+    USED_WEIGHT_HEADER: Optional[str] = None
+
+    def __init__(self, base_url: Optional[str] = None, max_connections: int = 20,
+                 timeout: float = 10.0, rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initialise le fetcher
+
+        Args:
+            base_url: URL de l'API (surchargée pour les tests)
+            max_connections: Taille du pool de connexions keep-alive
+            timeout: Timeout total d'une requête en secondes
+            rate_limiter: Limiteur de débit partagé (None = pas de limitation)
+        """
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Crée la session à la première utilisation (dans la boucle courante)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def close(self):
+        """Ferme la session et ses connexions"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get(self, path: str, params: Optional[Dict] = None, weight: int = 1,
+                   priority: int = PRIORITY_NORMAL):
+        """
+        Exécute une requête GET et renvoie le JSON décodé
+
+        Avec un limiteur de débit, les requêtes identiques en cours sont
+        fusionnées et les réponses 429/418 sont rejouées après backoff.
+        """
+        if self.rate_limiter is None:
+            return await self._send(path, params)
+
+        key = (path,) + tuple(sorted((params or {}).items()))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._limited_get(path, params, weight, priority))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.rate_limiter.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _limited_get(self, path: str, params: Optional[Dict], weight: int, priority: int):
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire_async(weight, priority)
+            try:
+                with self.rate_limiter.sending(weight):
+                    return await self._send(path, params, weight)
+            except AsyncFetcherError as e:
+                hint = self._retry_after(e)
+                if hint is None or attempt >= self.rate_limiter.max_retries:
+                    raise
+                self.rate_limiter.throttled += 1
+                self.rate_limiter.backoff(self.rate_limiter.retry_delay(hint, attempt))
+                attempt += 1
+
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        """Délai avant nouvelle tentative (None si l'erreur n'est pas une limite de débit)"""
+        return binance_retry_after(error)
+
+    async def _send(self, path: str, params: Optional[Dict] = None, weight: int = 0):
+        session = self._get_session()
+        async with session.get(f"{self.base_url}{path}", params=params) as response:
+            if self.rate_limiter is not None and self.USED_WEIGHT_HEADER:
+                self.rate_limiter.update_from_headers(response.headers, self.USED_WEIGHT_HEADER,
+                                                      weight)
+            data = await response.json(content_type=None)
+            if response.status >= 400:
+                raise AsyncFetcherError(f"HTTP {response.status}: {data}", response.status,
+                                        response.headers)
+            return data
+
+    @abstractmethod
+    async def get_candles(self, symbol: str, interval: str, size: int) -> pd.DataFrame:
+        """Récupère les `size` dernières bougies (interface commune aux sources)"""
+
+    @abstractmethod
+    async def get_current_price(self, symbol: str) -> float:
+        """Prix actuel d'un symbole"""
+
+    @abstractmethod
+    async def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Prix actuels de plusieurs symboles"""
+
+    async def get_snapshot(self, symbol: str, interval: str,
+                           size: int) -> Tuple[pd.DataFrame, float]:
+        """
+        Récupère en parallèle les bougies et le prix actuel d'un symbole
+
+        Args:
+            symbol: Symbole
+            interval: Intervalle des bougies
+            size: Nombre de bougies
+
+        Returns:
+            Tuple (DataFrame des bougies, prix actuel)
+        """
+        candles, price = await asyncio.gather(
+            self.get_candles(symbol, interval, size),
+            self.get_current_price(symbol)
+        )
+        return candles, price
+
+    async def get_snapshots(self, requests: Sequence[Tuple[str, str, int]],
+                            max_concurrent: int = 10) -> List:
+        """
+        Récupère les snapshots de nombreux symboles en parallèle
+
+        Args:
+            requests: Liste de (symbole, intervalle, nombre de bougies)
+            max_concurrent: Nombre maximum de symboles traités simultanément
+
+        Returns:
+            Liste de (DataFrame, prix) ou d'exceptions, dans l'ordre des requêtes
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def fetch(symbol: str, interval: str, size: int):
+            async with semaphore:
+                return await self.get_snapshot(symbol, interval, size)
+
+        return await asyncio.gather(
+            *(fetch(*request) for request in requests),
+            return_exceptions=True
+        )
+
+
+class AsyncBinanceFetcher(_AsyncFetcher):
+    """Récupère les données de prix depuis l'API REST Binance (asyncio)"""
+
+    BASE_URL = "https://api.binance.com"
+    USED_WEIGHT_HEADER = 'x-mbx-used-weight-1m'
+
+    async def get_historical_klines(self, symbol: str, interval: str,
+                                    limit: int = 100) -> pd.DataFrame:
+        """
+        Récupère les chandeliers historiques
+
+        Args:
+            symbol: Symbole de trading (ex: BTCUSDT)
+            interval: Intervalle de temps (1m, 5m, 15m, 1h, 4h, 1d)
+            limit: Nombre de chandeliers à récupérer
+
+        Returns:
+            DataFrame avec les données OHLCV
+        """
+        klines = await self._get('/api/v3/klines', {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': limit
+        }, weight=2)
+        return klines_to_dataframe(klines)
+
+    async def get_kline_arrays(self, symbol: str, interval: str, limit: int = 100,
+                               fields: Sequence[str] = ('open_time', 'close')) -> Dict[str, np.ndarray]:
+        """Récupère les chandeliers sous forme de tableaux NumPy (voir `klines_to_arrays`)"""
+        klines = await self._get('/api/v3/klines', {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': limit
+        }, weight=2)
+        return klines_to_arrays(klines, fields)
+
+    async def get_candles(self, symbol: str, interval: str, size: int) -> pd.DataFrame:
+        return await self.get_historical_klines(symbol, interval, limit=size)
+
+    async def get_current_price(self, symbol: str) -> float:
+        """Récupère le prix actuel"""
+        ticker = await self._get('/api/v3/ticker/price', {'symbol': symbol},
+                                 weight=2, priority=PRIORITY_HIGH)
+        return float(ticker['price'])
+
+    async def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Récupère le prix actuel de plusieurs symboles en une seule requête"""
+        if len(symbols) == 1:
+            return {symbols[0]: await self.get_current_price(symbols[0])}
+
+        wanted = set(symbols)
+        tickers = await self._get('/api/v3/ticker/price', weight=4, priority=PRIORITY_HIGH)
+        return {
+            ticker['symbol']: float(ticker['price'])
+            for ticker in tickers
+            if ticker['symbol'] in wanted
+        }
+
+    async def get_latest_close_prices(self, symbol: str, interval: str,
+                                      limit: int = 100) -> pd.Series:
+        """Récupère uniquement les prix de clôture"""
+        arrays = await self.get_kline_arrays(symbol, interval, limit, fields=('close',))
+        return pd.Series(arrays['close'], name='close')
+
+
+class AsyncTwelveDataFetcher(_AsyncFetcher):
+    """Récupère les données Forex/Gold depuis l'API REST Twelve Data (asyncio)"""
+
+    BASE_URL = "https://api.twelvedata.com"
+
+    def __init__(self, api_key: Optional[str] = None, **kwargs):
+        """
+        Initialise le fetcher
+
+        Args:
+            api_key: Clé API Twelve Data ("demo" si absente)
+            **kwargs: Options de `_AsyncFetcher` (base_url, max_connections, timeout, rate_limiter)
+        """
+        super().__init__(**kwargs)
+        self.api_key = api_key or "demo"
+
+    async def _send(self, path: str, params: Optional[Dict] = None, weight: int = 0):
+        params = dict(params or {}, apikey=self.api_key)
+        data = await super()._send(path, params, weight)
+        # Twelve Data renvoie les erreurs avec un statut HTTP 200
+        if isinstance(data, dict) and data.get('status') == 'error':
+            raise AsyncFetcherError(f"Twelve Data {data.get('code')}: {data.get('message')}",
+                                    data.get('code'))
+        return data
+
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        return twelvedata_retry_after(error)
+
+    async def get_historical_data(self, symbol: str, interval: str,
+                                  outputsize: int = 100) -> pd.DataFrame:
+        """
+        Récupère les données historiques
+
+        Args:
+            symbol: Symbole (ex: XAU/USD, EUR/USD, BTC/USD)
+            interval: Intervalle (format Binance ou Twelve Data)
+            outputsize: Nombre de chandeliers à récupérer
+
+        Returns:
+            DataFrame avec les données OHLCV
+        """
+        data = await self._get('/time_series', {
+            'symbol': symbol,
+            'interval': INTERVAL_MAP.get(interval, interval),
+            'outputsize': outputsize
+        })
+        return values_to_dataframe(data['values'])
+
+    async def get_candles(self, symbol: str, interval: str, size: int) -> pd.DataFrame:
+        return await self.get_historical_data(symbol, interval, outputsize=size)
+
+    async def get_current_price(self, symbol: str) -> float:
+        """Récupère le prix actuel"""
+        data = await self._get('/quote', {'symbol': symbol}, priority=PRIORITY_HIGH)
+        return float(data['close'])
+
+    async def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Récupère le prix actuel de plusieurs symboles en une seule requête batch"""
+        if len(symbols) == 1:
+            return {symbols[0]: await self.get_current_price(symbols[0])}
+
+        data = await self._get('/quote', {'symbol': ",".join(symbols)},
+                               weight=len(symbols), priority=PRIORITY_HIGH)
+        return {
+            symbol: float(quote['close'])
+            for symbol, quote in data.items()
+            if isinstance(quote, dict) and 'close' in quote
+        }
+
+    async def get_latest_close_prices(self, symbol: str, interval: str,
+                                      outputsize: int = 100) -> pd.Series:
+        """Récupère uniquement les prix de clôture"""
+        df = await self.get_historical_data(symbol, interval, outputsize)
+        return df['close']
+
+
+class BackgroundLoop:
+    """Boucle asyncio dans un thread dédié, pour appeler du code async depuis du code synchrone"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever,
+            name="async-fetch-loop",
+            daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coroutine, timeout: Optional[float] = None):
+        """Exécute une coroutine dans la boucle et attend son résultat"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def close(self):
+        """Arrête la boucle et son thread"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        if not self._thread.is_alive():
+            self.loop.close()
@@ -0,0 +1,128 @@
+"""
+Module de rattrapage de l'historique par pages téléchargées en parallèle
+
+`backfill` découpe une plage [start, end] en pages de `PAGE_SIZE` bougies du
+fetcher, limitées aux trous de l'archive, et les télécharge avec un pool de
+threads. Le limiteur de débit du fetcher, partagé par les threads, garde
+l'ensemble sous la limite de l'API.
+
+Les pages sont écrites dans l'ordre dès que les précédentes sont arrivées ;
+le nombre de pages en vol est borné, donc seules quelques pages sont en
+mémoire à la fois. Les pages qui tombent avant la fin de la série archivée
+vont dans une série temporaire, fusionnée en une seule réécriture à la fin.
+Le rapport liste les pages en erreur et les trous qui restent dans la plage.
+"""
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.candle_archive import CandleArchive
+from src.intervals import interval_start, interval_to_milliseconds
+
+
+def split_range(start: int, end: int, step: int, page_size: int) -> List[Tuple[int, int]]:
+    """
+    Découpe [start, end] en pages d'au plus `page_size` bougies
+
+    Args:
+        start: Première heure d'ouverture en ms
+        end: Dernière heure d'ouverture en ms (incluse)
+        step: Durée d'une bougie en ms
+        page_size: Bougies par page
+
+    Returns:
+        Liste de (début, fin) en ms, bornes incluses
+    """
+    span = page_size * step
+    return [(page_start, min(page_start + span - 1, end)) for page_start in range(start, end + 1, span)]
+
+
+def _clip(arrays: Dict[str, np.ndarray], start: int, end: int) -> Dict[str, np.ndarray]:
+    """Garde les bougies de la page (certaines API débordent des bornes demandées)"""
+    times = arrays['open_time']
+    inside = (times >= start) & (times <= end)
+    if inside.all():
+        return arrays
+    return {field: values[inside] for field, values in arrays.items()}
+
+
+def backfill(fetcher, archive: CandleArchive, symbol: str, interval: str, start: int,
+             end: Optional[int] = None, workers: int = 4, page_size: Optional[int] = None,
+             retries: int = 2, progress: Optional[Callable[[int, int], None]] = None) -> dict:
+    """
+    Complète l'archive sur [start, end] en téléchargeant les pages manquantes en parallèle
+
+    Args:
+        fetcher: Fetcher avec `SOURCE`, `PAGE_SIZE` et `get_kline_range`
+        archive: Archive de destination
+        symbol: Symbole
+        interval: Intervalle au format Binance
+        start: Première heure d'ouverture voulue en ms
+        end: Dernière heure d'ouverture voulue en ms (None = dernière bougie clôturée)
+        workers: Pages téléchargées simultanément
+        page_size: Bougies par requête (défaut: `fetcher.PAGE_SIZE`)
+        retries: Nouvelles tentatives d'une page après une erreur (hors 429, gérés par le limiteur)
+        progress: Appelée après chaque page écrite avec (pages traitées, pages au total)
+
+    Returns:
+        Dict avec pages (demandées), received (bougies reçues), failed (liste de
+        (début, fin, erreur)) et gaps (trous restants, voir `CandleArchive.gaps`)
+    """
+    source = fetcher.SOURCE
+    step = interval_to_milliseconds(interval)
+    last_closed = interval_start(int(time.time() * 1000), interval) - step
+    start = interval_start(start + step - 1, interval)
+    end = last_closed if end is None else min(end, last_closed)
+
+    pages = [page for first, last in archive.gaps(source, symbol, interval, start, end)
+             for page in split_range(first, last, step, page_size or fetcher.PAGE_SIZE)]
+    report = {'pages': len(pages), 'received': 0, 'failed': [], 'gaps': []}
+
+    def fetch(page: Tuple[int, int]) -> Dict[str, np.ndarray]:
+        for attempt in range(retries + 1):
+            try:
+                return fetcher.get_kline_range(symbol, interval, *page)
+            except Exception:
+                if attempt == retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+    # Pages après la dernière bougie archivée : ajoutées directement à la série
+    last = archive.last_open_time(source, symbol, interval)
+    staged = bool(pages) and last is not None and pages[0][0] < last
+    target = archive
+    if staged:
+        os.makedirs(archive.root, exist_ok=True)
+        target = CandleArchive(tempfile.mkdtemp(prefix='.backfill-', dir=archive.root))
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            submitted = 0
+            for position, page in enumerate(pages):
+                # Fenêtre de pages en vol : mémoire bornée même si une page traîne
+                while submitted < len(pages) and submitted < position + 2 * workers:
+                    futures[submitted] = executor.submit(fetch, pages[submitted])
+                    submitted += 1
+                try:
+                    arrays = _clip(futures.pop(position).result(), *page)
+                except Exception as e:
+                    report['failed'].append((page[0], page[1], str(e)))
+                else:
+                    if len(arrays['open_time']):
+                        target.append(source, symbol, interval, arrays)
+                        report['received'] += len(arrays['open_time'])
+                if progress is not None:
+                    progress(position + 1, len(pages))
+    finally:
+        if staged:
+            archive.merge(target, source, symbol, interval)
+            shutil.rmtree(target.root, ignore_errors=True)
+
+    report['gaps'] = archive.gaps(source, symbol, interval, start, end)
+    return report
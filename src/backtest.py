@@ -0,0 +1,169 @@
+"""
+Module de backtest vectorisé de la stratégie d'alerte de proximité
+
+Rejoue un historique de bougies avec la même logique que la surveillance
+en direct (`BollingerBands.check_proximity` et le cooldown d'`AlertManager`),
+entièrement avec NumPy : bandes, masques de proximité et cooldown sont
+calculés sur les tableaux complets, sans boucle par bougie.
+"""
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.alert_manager import DEFAULT_COOLDOWN_SECONDS
+from src.bollinger_bands import bollinger_arrays
+
+
+def proximity_masks(close: np.ndarray, upper: np.ndarray, lower: np.ndarray,
+                    proximity_percent: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcule les distances et masques de proximité (même formule que `check_proximity`)
+
+    Args:
+        close: Prix testés
+        upper: Bande supérieure
+        lower: Bande inférieure
+        proximity_percent: Seuil de proximité en %
+
+    Returns:
+        Tuple (near_upper, near_lower, distance_upper_pct, distance_lower_pct)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        distance_upper = np.abs(upper - close) / upper * 100
+        distance_lower = np.abs(close - lower) / lower * 100
+        near_upper = distance_upper <= proximity_percent
+        near_lower = distance_lower <= proximity_percent
+    return near_upper, near_lower, distance_upper, distance_lower
+
+
+def apply_cooldown(times: np.ndarray, mask: np.ndarray, cooldown: float) -> np.ndarray:
+    """
+    Sélectionne les alertes qui passent le cooldown (sémantique d'`AlertManager`)
+
+    Une alerte est émise si au moins `cooldown` s'est écoulé depuis la
+    dernière alerte émise du même type. Le prochain candidat autorisé après
+    chaque candidat est calculé d'un seul `searchsorted` vectorisé ; il ne
+    reste qu'à suivre ces sauts, dont le nombre est celui des alertes émises.
+
+    Args:
+        times: Horodatages croissants (même unité que `cooldown`)
+        mask: Bougies candidates
+        cooldown: Délai minimum entre deux alertes
+
+    Returns:
+        Indices des bougies qui déclenchent une alerte
+    """
+    candidates = np.flatnonzero(mask)
+    if cooldown <= 0 or len(candidates) == 0:
+        return candidates
+
+    candidate_times = times[candidates]
+    next_allowed = np.searchsorted(candidate_times, candidate_times + cooldown, side='left').tolist()
+
+    selected = []
+    position = 0
+    count = len(next_allowed)
+    while position < count:
+        selected.append(position)
+        position = next_allowed[position]
+    return candidates[selected]
+
+
+def forward_returns(close: np.ndarray, indices: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Rendement entre la bougie d'alerte et `horizon` bougies plus tard (NaN si hors série)
+
+    Args:
+        close: Prix de clôture
+        indices: Bougies d'alerte
+        horizon: Nombre de bougies
+
+    Returns:
+        Rendements en %
+    """
+    result = np.full(len(indices), np.nan)
+    target = indices + horizon
+    valid = target < len(close)
+    result[valid] = (close[target[valid]] / close[indices[valid]] - 1) * 100
+    return result
+
+
+def run_backtest(open_times: np.ndarray, close: np.ndarray, period: int = 20,
+                 multiplier: float = 2.0, proximity_percent: float = 0.5,
+                 cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
+                 horizons: Sequence[int] = (1, 5, 20)) -> Dict[str, pd.DataFrame]:
+    """
+    Rejoue un historique de bougies et mesure la performance des alertes
+
+    Chaque bougie est traitée comme un tick de la surveillance en direct :
+    son prix de clôture est comparé aux bandes calculées jusqu'à elle.
+
+    Args:
+        open_times: Heures d'ouverture en millisecondes
+        close: Prix de clôture
+        period: Période des Bandes de Bollinger
+        multiplier: Multiplicateur de l'écart-type
+        proximity_percent: Seuil de proximité en %
+        cooldown_seconds: Délai minimum entre deux alertes du même type
+        horizons: Horizons (en bougies) des rendements après alerte
+
+    Returns:
+        Dict {'alerts': DataFrame des alertes, 'stats': statistiques par type et horizon}
+    """
+    open_times = np.asarray(open_times, dtype=np.int64)
+    close = np.asarray(close, dtype=np.float64)
+
+    upper, _, lower = bollinger_arrays(close, period, multiplier)
+    near_upper, near_lower, distance_upper, distance_lower = proximity_masks(
+        close, upper, lower, proximity_percent
+    )
+
+    frames = []
+    cooldown_ms = cooldown_seconds * 1000
+    for alert_type, mask, band, distance in (
+        ('upper', near_upper, upper, distance_upper),
+        ('lower', near_lower, lower, distance_lower),
+    ):
+        indices = apply_cooldown(open_times, mask, cooldown_ms)
+        frame = {
+            'timestamp': pd.to_datetime(open_times[indices], unit='ms'),
+            'type': alert_type,
+            'price': close[indices],
+            'band_value': band[indices],
+            'distance_pct': distance[indices],
+        }
+        for horizon in horizons:
+            frame[f'return_{horizon}'] = forward_returns(close, indices, horizon)
+        frames.append(pd.DataFrame(frame))
+
+    alerts = pd.concat(frames).sort_values('timestamp', kind='stable').reset_index(drop=True)
+    return {'alerts': alerts, 'stats': summarize(alerts, horizons)}
+
+
+def summarize(alerts: pd.DataFrame, horizons: Sequence[int]) -> pd.DataFrame:
+    """
+    Statistiques des rendements après alerte, par type de bande et horizon
+
+    Args:
+        alerts: DataFrame renvoyé par `run_backtest`
+        horizons: Horizons en bougies
+
+    Returns:
+        DataFrame (type, horizon, count, mean, median, std, positive_pct)
+    """
+    rows = []
+    for alert_type in ('upper', 'lower'):
+        subset = alerts[alerts['type'] == alert_type]
+        for horizon in horizons:
+            returns = subset[f'return_{horizon}'].dropna().to_numpy()
+            rows.append({
+                'type': alert_type,
+                'horizon': horizon,
+                'count': len(returns),
+                'mean': returns.mean() if len(returns) else np.nan,
+                'median': np.median(returns) if len(returns) else np.nan,
+                'std': returns.std(ddof=1) if len(returns) > 1 else np.nan,
+                'positive_pct': (returns > 0).mean() * 100 if len(returns) else np.nan,
+            })
+    return pd.DataFrame(rows)
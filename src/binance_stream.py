@@ -0,0 +1,209 @@
+"""
+Module de flux temps réel Binance (WebSocket kline + bookTicker)
+
+L'historique est chargé une seule fois en REST, puis chaque message du flux
+combiné met à jour les bandes de façon incrémentale et déclenche la
+vérification de proximité. En cas de déconnexion, la source se reconnecte
+avec un délai exponentiel et rattrape les bougies manquantes en REST ; un
+chargement REST en échec (429, erreur réseau) est réessayé avec le même délai.
+"""
+import asyncio
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+from src.async_fetchers import AsyncFetcherError
+from src.intervals import timestamps_to_milliseconds
+from src.metrics import NULL_METRICS
+from src.watchlist import Subscription
+
+# Erreurs qui coupent le flux ou le rattrapage REST : reconnexion avec délai exponentiel
+STREAM_ERRORS = (ConnectionClosed, OSError, asyncio.TimeoutError,
+                 aiohttp.ClientError, AsyncFetcherError)
+
+
+class BinanceStreamSource:
+    """Source de données temps réel pilotée par le flux WebSocket combiné de Binance"""
+
+    WS_URL = "wss://stream.binance.com:9443"
+
+    def __init__(self, subscriptions: List[Subscription], rest_fetcher,
+                 on_event: Optional[Callable] = None, ws_url: Optional[str] = None,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0,
+                 book_ticker: bool = True, metrics=NULL_METRICS):
+        """
+        Initialise la source
+
+        Args:
+            subscriptions: Surveillances alimentées par le flux
+            rest_fetcher: Fetcher asyncio (AsyncBinanceFetcher) pour l'historique et le rattrapage
+            on_event: Callback(subscription, proximity_data, alerts) appelé à chaque prix reçu
+                (proximity_data vaut None quand le prix est loin des deux bandes)
+            ws_url: URL WebSocket (surchargée pour les tests)
+            reconnect_delay: Délai initial avant reconnexion en secondes
+            max_reconnect_delay: Délai maximum entre deux tentatives
+            book_ticker: Vérifier aussi la proximité sur chaque meilleur bid/ask
+            metrics: Registre de métriques (durées par étape, coupures du flux)
+        """
+        self.subscriptions = subscriptions
+        self.rest_fetcher = rest_fetcher
+        self.on_event = on_event
+        self.ws_url = (ws_url or self.WS_URL).rstrip('/')
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.book_ticker = book_ticker
+        self.metrics = metrics
+
+        self._groups: Dict[Tuple[str, str], List[Subscription]] = {}
+        self._by_symbol: Dict[str, List[Subscription]] = {}
+        for subscription in subscriptions:
+            symbol = subscription.symbol.upper()
+            self._groups.setdefault((symbol, subscription.interval), []).append(subscription)
+            self._by_symbol.setdefault(symbol, []).append(subscription)
+
+        self.last_prices: Dict[str, float] = {}
+        self.events = 0
+        self.reconnects = 0
+        self.backfills = 0
+        self.message_errors = 0
+        self._ws = None
+        self._stopped = False
+
+    @property
+    def streams(self) -> List[str]:
+        """Noms des flux à souscrire"""
+        names = [f"{symbol.lower()}@kline_{interval}" for symbol, interval in self._groups]
+        if self.book_ticker:
+            names += [f"{symbol.lower()}@bookTicker" for symbol in self._by_symbol]
+        return names
+
+    @property
+    def url(self) -> str:
+        """URL du flux combiné"""
+        return f"{self.ws_url}/stream?streams={'/'.join(self.streams)}"
+
+    async def backfill(self, keys: Optional[List[Tuple[str, str]]] = None):
+        """
+        Charge (ou rattrape) l'historique REST des paires indiquées
+
+        Args:
+            keys: Paires (symbole, intervalle) à rattraper, toutes par défaut
+        """
+        keys = list(self._groups) if keys is None else keys
+        await asyncio.gather(*(self._backfill_group(key) for key in keys))
+
+    async def _backfill_group(self, key: Tuple[str, str]):
+        group = self._groups[key]
+        size = max(s.history_size for s in group)
+        if hasattr(self.rest_fetcher, 'get_kline_arrays'):
+            arrays = await self.rest_fetcher.get_kline_arrays(
+                key[0], key[1], limit=size, fields=('open_time', 'high', 'low', 'close')
+            )
+            candles = {field: arrays[field].tolist() for field in arrays}
+        else:
+            df = await self.rest_fetcher.get_candles(key[0], key[1], size)
+            candles = {field: df[field].tolist() for field in ('high', 'low', 'close') if field in df}
+            candles['open_time'] = timestamps_to_milliseconds(df['timestamp'])
+        for subscription in group:
+            # Plus hauts / plus bas : indicateurs (ATR, Keltner) et détection intrabar
+            subscription.ingest_candles(candles['open_time'], candles['close'],
+                                        candles.get('high'), candles.get('low'))
+        self.backfills += 1
+
+    async def run(self):
+        """Écoute le flux jusqu'à l'appel de `stop`, avec reconnexion automatique"""
+        self._stopped = False
+        delay = self.reconnect_delay
+        # Historique initial chargé / à rattraper à la prochaine connexion
+        loaded = resync = False
+
+        while not self._stopped:
+            try:
+                if not loaded:
+                    await self.backfill()
+                    loaded = True
+                async with websockets.connect(self.url, max_queue=None) as ws:
+                    self._ws = ws
+                    if resync:
+                        # Les messages reçus pendant le rattrapage restent en file
+                        await self.backfill()
+                        resync = False
+                    delay = self.reconnect_delay
+                    async for message in ws:
+                        await self._handle_raw(message)
+            except STREAM_ERRORS as e:
+                # Coupure du flux ou échec du rattrapage REST (429...) : même délai exponentiel
+                if not self._stopped:
+                    self.metrics.inc('fetch_errors_total', stage='stream')
+                    print(f"⚠️ Flux Binance interrompu ({e}), reconnexion dans {delay:.0f}s")
+            finally:
+                self._ws = None
+
+            if self._stopped:
+                break
+            resync = loaded
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _handle_raw(self, message: str):
+        """Traite un message brut ; un message invalide (ou un notifier en erreur) est ignoré"""
+        try:
+            await self.handle_message(json.loads(message))
+        except STREAM_ERRORS:
+            raise
+        except Exception as e:
+            self.message_errors += 1
+            self.metrics.inc('stream_message_errors_total')
+            print(f"❌ Message du flux ignoré ({type(e).__name__}: {e})")
+
+    async def stop(self):
+        """Arrête l'écoute du flux"""
+        self._stopped = True
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def handle_message(self, message: Dict):
+        """
+        Traite un message du flux combiné ({"stream": ..., "data": ...})
+
+        Args:
+            message: Message décodé
+        """
+        data = message.get('data', message)
+
+        if data.get('e') == 'kline':
+            kline = data['k']
+            key = (kline['s'], kline['i'])
+            open_time = int(kline['t'])
+            close, high, low = float(kline['c']), float(kline['h']), float(kline['l'])
+
+            group = self._groups.get(key, [])
+            with self.metrics.timer('stage_seconds', stage='calculate', symbol=key[0], interval=key[1]):
+                missing = [s for s in group if s.apply_candle(open_time, close, high, low) is None]
+            if missing:
+                await self._backfill_group(key)
+                for subscription in missing:
+                    subscription.apply_candle(open_time, close, high, low)
+
+            for subscription in group:
+                self._emit(subscription, close)
+
+        elif 'b' in data and 'a' in data:
+            # bookTicker : prix médian entre meilleur bid et meilleur ask
+            price = (float(data['b']) + float(data['a'])) / 2
+            for subscription in self._by_symbol.get(data['s'], []):
+                if subscription.bands.is_ready:
+                    self._emit(subscription, price)
+
+    def _emit(self, subscription: Subscription, price: float):
+        self.events += 1
+        self.last_prices[subscription.symbol] = price
+        with self.metrics.timer('stage_seconds', stage='check_proximity',
+                                symbol=subscription.symbol, interval=subscription.interval):
+            proximity_data, alerts = subscription.evaluate(price, screen=True)
+        if self.on_event is not None:
+            self.on_event(subscription, proximity_data, alerts)
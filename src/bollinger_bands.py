@@ -1,26 +1,327 @@
 """
 Module de calcul des Bandes de Bollinger
 """
-import pandas as pd
+import math
 import numpy as np
-from typing import Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    # pandas n'est importé que par les appelants qui lui passent des Series
+    import pandas as pd
+
+# Marge relative des prix de déclenchement : un prix filtré par `may_be_near`
+# ne peut jamais être à moins du seuil malgré les arrondis de `check_proximity`
+TRIGGER_MARGIN = 1e-9
+
+
+def rolling_mean_std(values: np.ndarray, period: int,
+                     chunk_size: int = 8192) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Moyenne et écart-type glissants (ddof=1) vectorisés avec NumPy
+
+    Les sommes cumulées sont calculées par blocs, centrés sur leur moyenne,
+    pour limiter les erreurs d'arrondi sur les longues séries.
+
+    Args:
+        values: Série de prix (float64)
+        period: Taille de la fenêtre
+        chunk_size: Nombre de points calculés par bloc
+
+    Returns:
+        Tuple (mean, std), NaN pour les `period - 1` premiers points
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mean, std = rolling_mean_std_2d(values[np.newaxis, :], (period,), chunk_size)[period]
+    return mean[0], std[0]
+
+
+def rolling_mean_std_2d(values: np.ndarray, periods: Sequence[int],
+                        chunk_size: int = 8192) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Moyennes et écarts-types glissants (ddof=1) d'une matrice, ligne par ligne
+
+    Une seule somme cumulée par bloc de colonnes sert à toutes les périodes.
+
+    Args:
+        values: Matrice (symboles × bougies) float64
+        periods: Tailles de fenêtre
+        chunk_size: Nombre de colonnes calculées par bloc
+
+    Returns:
+        Dict {period: (mean, std)} de matrices de même forme que `values`
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows, n = values.shape
+    periods = sorted(set(int(p) for p in periods))
+    if periods and periods[0] < 1:
+        raise ValueError("La période doit être >= 1")
+
+    result = {p: (np.full((rows, n), np.nan), np.full((rows, n), np.nan)) for p in periods}
+    valid = [p for p in periods if p <= n]
+    if not valid or rows == 0:
+        return result
+
+    longest = valid[-1]
+    for start in range(valid[0] - 1, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        offset = max(0, start - longest + 1)
+        window = values[:, offset:stop]
+        reference = window.mean(axis=1, keepdims=True)
+        centered = window - reference
+
+        zeros = np.zeros((rows, 1))
+        cumsum = np.concatenate((zeros, np.cumsum(centered, axis=1)), axis=1)
+        cumsum_sq = np.concatenate((zeros, np.cumsum(centered * centered, axis=1)), axis=1)
+
+        for period in valid:
+            first = max(start, period - 1)
+            if first >= stop:
+                continue
+            # Colonne absolue c -> somme de [c - period + 1, c]
+            high = slice(first + 1 - offset, stop + 1 - offset)
+            low = slice(first + 1 - period - offset, stop + 1 - period - offset)
+            sums = cumsum[:, high] - cumsum[:, low]
+            sums_sq = cumsum_sq[:, high] - cumsum_sq[:, low]
+
+            chunk_mean = sums / period
+            mean, std = result[period]
+            mean[:, first:stop] = chunk_mean + reference
+            if period > 1:
+                variance = (sums_sq - sums * chunk_mean) / (period - 1)
+                std[:, first:stop] = np.sqrt(np.maximum(variance, 0.0))
+
+    return result
+
+
+def stack_ragged(arrays: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Empile des séries de longueurs différentes, alignées sur leur fin
+
+    Le début des séries courtes est complété avec leur première valeur pour
+    que les sommes cumulées restent finies ; `bollinger_batch` remet ensuite
+    à NaN les fenêtres qui touchent ce remplissage.
+
+    Args:
+        arrays: Séries de prix, de la plus ancienne à la plus récente
+
+    Returns:
+        Tuple (matrice symboles × longueur max, longueurs réelles)
+    """
+    lengths = np.array([len(a) for a in arrays], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+    matrix = np.empty((len(arrays), width))
+    for row, (array, length) in enumerate(zip(arrays, lengths)):
+        padding = width - length
+        if length:
+            matrix[row, padding:] = array
+            matrix[row, :padding] = array[0]
+        else:
+            matrix[row] = 0.0
+    return matrix, lengths
+
+
+def bollinger_batch(values, periods: Sequence[int] = (20,),
+                    multipliers: Sequence[float] = (2.0,),
+                    chunk_size: int = 8192) -> Dict[Tuple[int, float], Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Calcule les Bandes de Bollinger de plusieurs symboles et réglages en une passe
+
+    Args:
+        values: Matrice (symboles × bougies) ou liste de séries de longueurs
+            différentes (alignées sur leur dernière bougie, voir `stack_ragged`)
+        periods: Périodes pour la moyenne mobile
+        multipliers: Multiplicateurs pour l'écart-type
+        chunk_size: Nombre de colonnes calculées par bloc
+
+    Returns:
+        Dict {(period, multiplier): (upper_band, basis, lower_band)}, chaque
+        bande étant une matrice (symboles × bougies)
+    """
+    lengths = None
+    if isinstance(values, np.ndarray) and values.ndim == 2:
+        matrix = values.astype(np.float64, copy=False)
+    else:
+        matrix, lengths = stack_ragged([np.asarray(v, dtype=np.float64) for v in values])
+
+    stats = rolling_mean_std_2d(matrix, periods, chunk_size)
+    if lengths is not None:
+        # Première colonne où la fenêtre ne contient que de vraies bougies
+        columns = np.arange(matrix.shape[1])
+        first_real = (matrix.shape[1] - lengths)[:, np.newaxis]
+        for period, (mean, std) in stats.items():
+            padded = columns < first_real + period - 1
+            mean[padded] = np.nan
+            std[padded] = np.nan
+
+    bands = {}
+    for period in periods:
+        basis, std = stats[int(period)]
+        for multiplier in multipliers:
+            width = multiplier * std
+            bands[(period, multiplier)] = (basis + width, basis, basis - width)
+    return bands
+
+
+def bollinger_arrays(close: np.ndarray, period: int = 20,
+                     multiplier: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcule les Bandes de Bollinger sur un tableau NumPy (sans pandas)
+
+    Args:
+        close: Prix de clôture
+        period: Période pour la moyenne mobile
+        multiplier: Multiplicateur pour l'écart-type
+
+    Returns:
+        Tuple (upper_band, basis, lower_band)
+    """
+    basis, std = rolling_mean_std(close, period)
+    return basis + multiplier * std, basis, basis - multiplier * std
+
+
+class RollingWindow:
+    """Fenêtre glissante de taille fixe (buffer circulaire) avec moyenne et variance en O(1)"""
+
+    # Recalcul exact périodique pour éliminer la dérive des arrondis
+    RESYNC_EVERY = 1024
+
+    def __init__(self, size: int):
+        """
+        Initialise la fenêtre
+
+        Args:
+            size: Nombre de valeurs conservées
+        """
+        if size < 1:
+            raise ValueError("La taille de la fenêtre doit être >= 1")
+        self.size = size
+        self._buffer = [0.0] * size
+        self._head = 0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._mutations = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def is_full(self) -> bool:
+        """True si la fenêtre contient `size` valeurs"""
+        return self._count == self.size
+
+    @property
+    def mean(self) -> float:
+        """Moyenne des valeurs de la fenêtre"""
+        return self._mean if self._count else math.nan
+
+    @property
+    def variance(self) -> float:
+        """Variance non biaisée (ddof=1, comme pandas)"""
+        if self._count < 2:
+            return math.nan
+        return self._m2 / (self._count - 1)
+
+    @property
+    def std(self) -> float:
+        """Écart-type non biaisé (ddof=1, comme pandas)"""
+        variance = self.variance
+        return math.sqrt(variance) if variance == variance else math.nan
+
+    @property
+    def last(self) -> float:
+        """Valeur la plus récente"""
+        if not self._count:
+            raise IndexError("Fenêtre vide")
+        return self._buffer[(self._head + self._count - 1) % self.size]
+
+    def values(self) -> list:
+        """Valeurs de la fenêtre, de la plus ancienne à la plus récente"""
+        return [self._buffer[(self._head + i) % self.size] for i in range(self._count)]
+
+    def clear(self):
+        """Vide la fenêtre"""
+        self._head = 0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._mutations = 0
+
+    def append(self, value: float):
+        """Ajoute une valeur (remplace la plus ancienne si la fenêtre est pleine)"""
+        value = float(value)
+        if self._count < self.size:
+            self._buffer[(self._head + self._count) % self.size] = value
+            self._count += 1
+            # Welford classique tant que la fenêtre se remplit
+            delta = value - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (value - self._mean)
+        else:
+            old = self._buffer[self._head]
+            self._buffer[self._head] = value
+            self._head = (self._head + 1) % self.size
+            self._replace(old, value)
+        self._after_mutation()
+
+    def replace_last(self, value: float):
+        """Remplace la valeur la plus récente (bougie encore ouverte)"""
+        if not self._count:
+            self.append(value)
+            return
+        value = float(value)
+        index = (self._head + self._count - 1) % self.size
+        old = self._buffer[index]
+        self._buffer[index] = value
+        self._replace(old, value)
+        self._after_mutation()
+
+    def _replace(self, old: float, new: float):
+        """Met à jour moyenne et M2 quand `old` est remplacé par `new`"""
+        old_mean = self._mean
+        self._mean += (new - old) / self._count
+        self._m2 += (new - old) * (new - self._mean + old - old_mean)
+        if self._m2 < 0.0:
+            self._m2 = 0.0
+
+    def _after_mutation(self):
+        self._mutations += 1
+        if self._mutations >= self.RESYNC_EVERY:
+            self._resync()
+
+    def _resync(self):
+        """Recalcule exactement moyenne et M2 depuis le buffer"""
+        values = self.values()
+        self._mean = math.fsum(values) / self._count
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in values)
+        self._mutations = 0
 
 
 class BollingerBands:
     """Calcule les Bandes de Bollinger et détecte les proximités"""
 
-    def __init__(self, period: int = 20, multiplier: float = 2.0):
+    def __init__(self, period: int = 20, multiplier: float = 2.0,
+                 window: Optional[RollingWindow] = None):
         """
         Initialise les paramètres des Bandes de Bollinger
 
         Args:
             period: Période pour la moyenne mobile
             multiplier: Multiplicateur pour l'écart-type
+            window: Fenêtre glissante partagée (ex: `RollingStats.window` d'un
+                pipeline d'indicateurs) ; son propriétaire l'alimente et
+                appelle `refresh` au lieu de `update` / `replace_last`
         """
+        if window is not None and window.size != period:
+            raise ValueError(f"Fenêtre partagée de taille {window.size} pour une période {period}")
         self.period = period
         self.multiplier = multiplier
+        # État du mode streaming (update / replace_last)
+        self._window = window if window is not None else RollingWindow(period)
+        # Prix de déclenchement (seuil, bas, haut), recalculés après chaque mise à jour
+        self._triggers: Optional[Tuple[float, float, float]] = None
 
-    def calculate(self, prices: pd.Series) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    def calculate(self, prices: 'pd.Series') -> Tuple['pd.Series', 'pd.Series', 'pd.Series']:
         """
         Calcule les Bandes de Bollinger
 
@@ -42,6 +343,126 @@ class BollingerBands:
 
         return upper_band, basis, lower_band
 
+    def seed(self, prices: Iterable[float]) -> Tuple[float, float, float]:
+        """
+        Initialise le mode streaming avec un historique de clôtures
+
+        Args:
+            prices: Prix de clôture, du plus ancien au plus récent
+
+        Returns:
+            Tuple (upper_band, basis, lower_band) pour la dernière bougie
+        """
+        self._window.clear()
+        self._triggers = None
+        for price in list(prices)[-self.period:]:
+            self._window.append(price)
+        return self.current_bands()
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        """
+        Ajoute une nouvelle bougie au mode streaming en O(1)
+
+        Args:
+            close: Prix de clôture de la nouvelle bougie
+
+        Returns:
+            Tuple (upper_band, basis, lower_band)
+        """
+        self._window.append(close)
+        self._triggers = None
+        return self.current_bands()
+
+    def replace_last(self, close: float) -> Tuple[float, float, float]:
+        """
+        Met à jour la bougie encore ouverte en O(1)
+
+        Args:
+            close: Dernier prix de la bougie en cours
+
+        Returns:
+            Tuple (upper_band, basis, lower_band)
+        """
+        self._window.replace_last(close)
+        self._triggers = None
+        return self.current_bands()
+
+    def refresh(self) -> Tuple[float, float, float]:
+        """
+        Bandes courantes après une mise à jour de la fenêtre partagée par son propriétaire
+
+        Returns:
+            Tuple (upper_band, basis, lower_band)
+        """
+        self._triggers = None
+        return self.current_bands()
+
+    def current_bands(self) -> Tuple[float, float, float]:
+        """
+        Bandes courantes du mode streaming (NaN tant que `period` bougies
+        n'ont pas été reçues, comme `calculate`)
+
+        Returns:
+            Tuple (upper_band, basis, lower_band)
+        """
+        if not self._window.is_full:
+            return math.nan, math.nan, math.nan
+
+        basis = self._window.mean
+        width = self.multiplier * self._window.std
+        return basis + width, basis, basis - width
+
+    def trigger_prices(self, proximity_threshold: float) -> Tuple[float, float]:
+        """
+        Prix à partir desquels `check_proximity` peut signaler une bande
+
+        Calculés une fois par mise à jour des bandes du mode streaming : entre
+        deux bougies, un tick se filtre avec deux comparaisons (`may_be_near`).
+
+        Args:
+            proximity_threshold: Seuil de proximité en %
+
+        Returns:
+            Tuple (lower_trigger, upper_trigger) : le prix ne peut être proche
+            d'aucune bande s'il est strictement entre les deux
+        """
+        triggers = self._triggers
+        if triggers is not None and triggers[0] == proximity_threshold:
+            return triggers[1], triggers[2]
+
+        upper, _, lower = self.current_bands()
+        ratio = proximity_threshold / 100
+        if lower > 0 and upper > 0:
+            lower_trigger = lower * (1 + ratio) * (1 + TRIGGER_MARGIN)
+            upper_trigger = upper * (1 - ratio) * (1 - TRIGGER_MARGIN)
+        else:
+            # Bandes NaN ou négatives : tout prix passe par le calcul complet
+            lower_trigger, upper_trigger = math.inf, -math.inf
+        self._triggers = (proximity_threshold, lower_trigger, upper_trigger)
+        return lower_trigger, upper_trigger
+
+    def may_be_near(self, current_price: float, proximity_threshold: float) -> bool:
+        """
+        Filtre rapide d'un tick avant `check_proximity` (mode streaming)
+
+        Args:
+            current_price: Prix actuel
+            proximity_threshold: Seuil de proximité en %
+
+        Returns:
+            False si le prix est sûrement loin des deux bandes
+        """
+        triggers = self._triggers
+        if triggers is None or triggers[0] != proximity_threshold:
+            self.trigger_prices(proximity_threshold)
+            triggers = self._triggers
+        return not triggers[1] < current_price < triggers[2]
+
+    @property
+    def is_ready(self) -> bool:
+        """True si le mode streaming a assez de bougies pour calculer les bandes"""
+        return self._window.is_full
+
     def calculate_distance(self, current_price: float, upper_band: float,
                           lower_band: float) -> Tuple[float, float]:
         """
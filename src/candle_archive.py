@@ -0,0 +1,371 @@
+"""
+Module d'archive historique des bougies en colonnes (fichiers memmap)
+
+Pour la recherche et les backtests sur plusieurs années de bougies 1m, chaque
+série (source, symbole, intervalle) est un dossier de fichiers colonnes à
+largeur fixe et d'un petit index JSON :
+
+    <racine>/<source>/<symbole>/<intervalle>/
+        index.json          # nombre de bougies, première et dernière heure d'ouverture
+        open_time.int64     # heures d'ouverture en ms, croissantes
+        open.float64, high.float64, low.float64, close.float64, volume.float64
+
+L'ouverture ne lit que l'index : les colonnes sont projetées en mémoire avec
+`numpy.memmap` et une plage de dates se résout par recherche dichotomique sur
+open_time. Les tableaux renvoyés sont des vues sans copie, utilisables
+directement par `bollinger_arrays`.
+
+Les colonnes sont écrites avant l'index (remplacé atomiquement) : un lecteur,
+ou une reprise après un arrêt brutal, ne voit jamais de bougie à moitié écrite.
+Cette garantie vaut pour l'ajout après la dernière bougie, qui n'écrit
+qu'au-delà du nombre de bougies de l'index. Une réécriture de bougies
+existantes (page qui recouvre la fin, fusion) écrit toutes les colonnes dans
+des fichiers temporaires puis les remplace avec `os.replace` : un lecteur qui
+a déjà ouvert la série garde l'ancienne version, mais un arrêt brutal entre
+deux remplacements peut laisser des colonnes de versions différentes.
+Un seul processus doit écrire dans une série à la fois.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.bollinger_bands import bollinger_arrays
+from src.intervals import interval_to_milliseconds
+
+# Colonnes de l'archive et leur type (largeur fixe)
+ARCHIVE_COLUMNS = {
+    'open_time': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+}
+
+INDEX_FILE = 'index.json'
+
+
+def _empty(fields: Iterable[str]) -> Dict[str, np.ndarray]:
+    return {field: np.empty(0, dtype=ARCHIVE_COLUMNS[field]) for field in fields}
+
+
+def _block_end(times: np.ndarray, position: int, size: int) -> float:
+    """Heure d'ouverture de la dernière bougie du bloc qui commence à `position`"""
+    return times[position + size - 1] if position + size <= len(times) else np.inf
+
+
+class CandleArchive:
+    """Archive de bougies sur disque, une colonne par fichier, lue en memmap"""
+
+    def __init__(self, root: str = "data/archive"):
+        """
+        Args:
+            root: Dossier racine de l'archive (créé à la première écriture)
+        """
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _directory(self, source: str, symbol: str, interval: str) -> str:
+        # Les symboles Twelve Data (XAU/USD) ne peuvent pas servir de nom de dossier tels quels
+        return os.path.join(self.root, source, symbol.replace('/', '-'), interval)
+
+    @staticmethod
+    def _column_path(directory: str, field: str) -> str:
+        return os.path.join(directory, f"{field}.{np.dtype(ARCHIVE_COLUMNS[field]).name}")
+
+    def info(self, source: str, symbol: str, interval: str) -> Optional[dict]:
+        """
+        Index de la série (symbol, interval, count, first_open_time, last_open_time)
+
+        Returns:
+            Dict, ou None si la série n'existe pas
+        """
+        path = os.path.join(self._directory(source, symbol, interval), INDEX_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def count(self, source: str, symbol: str, interval: str) -> int:
+        """Nombre de bougies archivées"""
+        index = self.info(source, symbol, interval)
+        return index['count'] if index else 0
+
+    def last_open_time(self, source: str, symbol: str, interval: str) -> Optional[int]:
+        """Heure d'ouverture (ms) de la dernière bougie archivée"""
+        index = self.info(source, symbol, interval)
+        return index['last_open_time'] if index and index['count'] else None
+
+    def series(self) -> List[dict]:
+        """Index de toutes les séries de l'archive (avec leur source)"""
+        found = []
+        for directory, subdirectories, files in os.walk(self.root):
+            # Séries temporaires d'un rattrapage en cours (.backfill-*)
+            subdirectories[:] = [d for d in subdirectories if not d.startswith('.')]
+            if INDEX_FILE in files:
+                with open(os.path.join(directory, INDEX_FILE)) as f:
+                    found.append(json.load(f))
+        return sorted(found, key=lambda s: (s['source'], s['symbol'], s['interval']))
+
+    def open(self, source: str, symbol: str, interval: str,
+             fields: Iterable[str] = tuple(ARCHIVE_COLUMNS),
+             start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Ouvre une série en memmap, sans lire les colonnes
+
+        Args:
+            fields: Colonnes voulues (parmi ARCHIVE_COLUMNS)
+            start: Première heure d'ouverture incluse en ms (None = début de la série)
+            end: Dernière heure d'ouverture incluse en ms (None = fin de la série)
+
+        Returns:
+            Dict {champ: tableau en lecture seule}, de la plus ancienne à la plus récente
+        """
+        fields = list(fields)
+        unknown = set(fields) - set(ARCHIVE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Champs inconnus: {sorted(unknown)}")
+
+        lo, hi, columns = self._open_range(source, symbol, interval, fields, start, end)
+        if columns is None:
+            return _empty(fields)
+        return {field: columns[field][lo:hi] for field in fields}
+
+    def _open_range(self, source: str, symbol: str, interval: str, fields: List[str],
+                    start: Optional[int], end: Optional[int]):
+        """Colonnes complètes en memmap et bornes [lo, hi) de la plage demandée"""
+        index = self.info(source, symbol, interval)
+        if not index or not index['count']:
+            return 0, 0, None
+
+        directory = self._directory(source, symbol, interval)
+        count = index['count']
+        columns = {
+            field: np.memmap(self._column_path(directory, field), dtype=ARCHIVE_COLUMNS[field],
+                             mode='r', shape=(count,))
+            for field in set(fields) | {'open_time'}
+        }
+        # Recherche dichotomique : seules quelques pages de open_time sont lues
+        times = columns['open_time']
+        lo = int(np.searchsorted(times, start, 'left')) if start is not None else 0
+        hi = int(np.searchsorted(times, end, 'right')) if end is not None else count
+        return lo, max(lo, hi), columns
+
+    def bands(self, source: str, symbol: str, interval: str, period: int = 20,
+              multiplier: float = 2.0, start: Optional[int] = None,
+              end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bandes de Bollinger sur une plage de la série, calculées sur la tranche memmap
+
+        Les `period - 1` bougies qui précèdent `start` servent d'amorçage : la
+        première bande de la plage est déjà valide quand l'historique le permet.
+
+        Returns:
+            Tuple (open_time, upper_band, basis, lower_band) de la plage
+        """
+        lo, hi, columns = self._open_range(source, symbol, interval, ['close'], start, end)
+        if columns is None:
+            empty = np.empty(0)
+            return np.empty(0, dtype=np.int64), empty, empty, empty
+
+        warmup = max(0, lo - period + 1)
+        upper, basis, lower = bollinger_arrays(columns['close'][warmup:hi], period, multiplier)
+        skip = lo - warmup
+        return columns['open_time'][lo:hi], upper[skip:], basis[skip:], lower[skip:]
+
+    def append(self, source: str, symbol: str, interval: str,
+               arrays: Dict[str, np.ndarray]) -> int:
+        """
+        Ajoute des bougies à la série (la crée si besoin)
+
+        Les bougies déjà archivées avec la même heure d'ouverture sont
+        remplacées. L'ajout après la dernière bougie (cas normal) n'écrit que
+        les nouvelles lignes ; une page qui recouvre la fin de la série fait
+        réécrire les colonnes dans des fichiers temporaires, remplacés ensuite
+        (un lecteur qui a déjà ouvert la série garde l'ancienne version).
+
+        Args:
+            arrays: Dict {champ: tableau} contenant toutes les colonnes de ARCHIVE_COLUMNS
+
+        Returns:
+            Nombre de bougies de la série après l'ajout
+        """
+        new = {field: np.asarray(arrays[field], dtype=dtype) for field, dtype in ARCHIVE_COLUMNS.items()}
+        if not len(new['open_time']):
+            return self.count(source, symbol, interval)
+
+        directory = self._directory(source, symbol, interval)
+        with self._lock:
+            index = self.info(source, symbol, interval)
+            count = index['count'] if index else 0
+            position = count
+            if count:
+                times = np.memmap(self._column_path(directory, 'open_time'), dtype=np.int64,
+                                  mode='r', shape=(count,))
+                position = int(np.searchsorted(times, new['open_time'].min(), 'left'))
+                del times
+
+            # Fusion avec les bougies archivées après `position` : tri par heure
+            # d'ouverture, la dernière version de chaque bougie l'emporte
+            rows = {field: new[field][::-1] for field in ARCHIVE_COLUMNS}
+            if position < count:
+                rows = {
+                    field: np.concatenate((rows[field], np.memmap(
+                        self._column_path(directory, field), dtype=dtype, mode='r', shape=(count,)
+                    )[position:]))
+                    for field, dtype in ARCHIVE_COLUMNS.items()
+                }
+            _, keep = np.unique(rows['open_time'], return_index=True)
+
+            os.makedirs(directory, exist_ok=True)
+            if position < count:
+                # Recouvrement : jamais de réécriture en place des lignes indexées ;
+                # toutes les colonnes sont écrites à côté avant d'être remplacées
+                for field, dtype in ARCHIVE_COLUMNS.items():
+                    self._write_temporary(self._column_path(directory, field),
+                                          position * np.dtype(dtype).itemsize, rows[field][keep])
+                for field in ARCHIVE_COLUMNS:
+                    path = self._column_path(directory, field)
+                    os.replace(path + '.tmp', path)
+            else:
+                for field, dtype in ARCHIVE_COLUMNS.items():
+                    path = self._column_path(directory, field)
+                    with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                        f.seek(position * np.dtype(dtype).itemsize)
+                        rows[field][keep].tofile(f)
+                        f.truncate()
+
+            total = position + len(keep)
+            first = int(rows['open_time'][keep[0]]) if position == 0 else index['first_open_time']
+            self._write_index(directory, {
+                'source': source,
+                'symbol': symbol,
+                'interval': interval,
+                'count': total,
+                'first_open_time': first,
+                'last_open_time': int(rows['open_time'][keep[-1]]),
+                'updated_at': time.time(),
+            })
+        return total
+
+    def gaps(self, source: str, symbol: str, interval: str, start: Optional[int] = None,
+             end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Trous de la série : bougies attendues mais absentes entre `start` et `end`
+
+        Args:
+            start: Première heure d'ouverture attendue en ms (None = début de la série)
+            end: Dernière heure d'ouverture attendue en ms (None = fin de la série)
+
+        Returns:
+            Liste de (première, dernière) heures d'ouverture manquantes en ms
+        """
+        step = interval_to_milliseconds(interval)
+        times = self.open(source, symbol, interval, fields=('open_time',),
+                          start=start, end=end)['open_time']
+        if not len(times):
+            return [(start, end)] if start is not None and end is not None and start <= end else []
+
+        gaps = []
+        if start is not None and times[0] > start:
+            gaps.append((start, int(times[0]) - step))
+        for position in np.flatnonzero(np.diff(times) > step):
+            gaps.append((int(times[position]) + step, int(times[position + 1]) - step))
+        if end is not None and times[-1] + step <= end:
+            gaps.append((int(times[-1]) + step, end))
+        return gaps
+
+    def merge(self, other: 'CandleArchive', source: str, symbol: str, interval: str,
+              chunk_size: int = 1_000_000) -> int:
+        """
+        Fusionne la série de `other` dans celle de l'archive, en une seule réécriture
+
+        Les deux séries sont parcourues par blocs (mémoire bornée) ; les bougies
+        de `other` remplacent celles de même heure d'ouverture. Les colonnes
+        sont réécrites dans des fichiers temporaires puis remplacées : un
+        lecteur qui a déjà ouvert la série garde l'ancienne version.
+
+        Returns:
+            Nombre de bougies de la série après la fusion
+        """
+        index = self.info(source, symbol, interval)
+        incoming = other.info(source, symbol, interval)
+        if not incoming or not incoming['count']:
+            return index['count'] if index else 0
+        if not index or not index['count']:
+            return self.append(source, symbol, interval, other.open(source, symbol, interval))
+
+        directory = self._directory(source, symbol, interval)
+        with self._lock:
+            ours = self.open(source, symbol, interval)
+            theirs = other.open(source, symbol, interval)
+            outputs = {field: open(self._column_path(directory, field) + '.tmp', 'wb')
+                       for field in ARCHIVE_COLUMNS}
+            total, i, j = 0, 0, 0
+            try:
+                while i < len(ours['open_time']) or j < len(theirs['open_time']):
+                    # Fin du prochain bloc : le plus petit des deux bords de bloc
+                    cutoff = min(_block_end(ours['open_time'], i, chunk_size),
+                                 _block_end(theirs['open_time'], j, chunk_size))
+                    i_end = int(np.searchsorted(ours['open_time'], cutoff, 'right'))
+                    j_end = int(np.searchsorted(theirs['open_time'], cutoff, 'right'))
+                    block = {field: np.concatenate((theirs[field][j:j_end], ours[field][i:i_end]))
+                             for field in ARCHIVE_COLUMNS}
+                    _, keep = np.unique(block['open_time'], return_index=True)
+                    for field, output in outputs.items():
+                        block[field][keep].tofile(output)
+                    total += len(keep)
+                    i, j = i_end, j_end
+            finally:
+                for output in outputs.values():
+                    output.close()
+
+            for field in ARCHIVE_COLUMNS:
+                path = self._column_path(directory, field)
+                os.replace(path + '.tmp', path)
+            self._write_index(directory, {
+                **index,
+                'count': total,
+                'first_open_time': min(index['first_open_time'], incoming['first_open_time']),
+                'last_open_time': max(index['last_open_time'], incoming['last_open_time']),
+                'updated_at': time.time(),
+            })
+        return total
+
+    @staticmethod
+    def _write_temporary(path: str, prefix_bytes: int, tail: np.ndarray):
+        """Écrit `<path>.tmp` : les `prefix_bytes` premiers octets de la colonne, puis `tail`"""
+        with open(path, 'rb') as source, open(path + '.tmp', 'wb') as output:
+            remaining = prefix_bytes
+            while remaining:
+                chunk = source.read(min(remaining, 1 << 24))
+                if not chunk:
+                    raise IOError(f"Colonne tronquée: {path}")
+                output.write(chunk)
+                remaining -= len(chunk)
+            tail.tofile(output)
+
+    @staticmethod
+    def _write_index(directory: str, index: dict):
+        path = os.path.join(directory, INDEX_FILE)
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(index, f)
+        os.replace(temporary, path)
+
+    def remove(self, source: str, symbol: str, interval: str):
+        """Supprime la série (index puis colonnes)"""
+        directory = self._directory(source, symbol, interval)
+        with self._lock:
+            for name in [INDEX_FILE] + [os.path.basename(self._column_path(directory, f))
+                                        for f in ARCHIVE_COLUMNS]:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+
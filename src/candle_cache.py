@@ -0,0 +1,229 @@
+"""
+Module de cache local des bougies (SQLite)
+
+Les bougies déjà récupérées sont conservées sur disque, par
+(source, symbole, intervalle). Les fetchers ne demandent ensuite à l'API que
+les bougies plus récentes que la dernière bougie stockée.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.intervals import interval_to_milliseconds, timestamps_to_milliseconds
+
+# Colonnes stockées pour chaque bougie
+CANDLE_FIELDS = ('open_time', 'open', 'high', 'low', 'close', 'volume')
+
+
+class CandleCache:
+    """Stockage persistant des bougies avec récupération incrémentale"""
+
+    def __init__(self, path: str = "data/candles.db", open_candle_ttl: float = 0):
+        """
+        Ouvre (ou crée) le cache
+
+        Args:
+            path: Chemin du fichier SQLite
+            open_candle_ttl: Durée en secondes pendant laquelle la bougie en cours
+                est servie depuis le disque sans nouvelle requête (0 = toujours rafraîchir)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.open_candle_ttl = open_candle_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS candles (
+                source TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                open_time INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (source, symbol, interval, open_time)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS series (
+                source TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (source, symbol, interval)
+            );
+        """)
+
+    def close(self):
+        """Ferme la connexion"""
+        with self._lock:
+            self._conn.close()
+
+    def last_open_time(self, source: str, symbol: str, interval: str) -> Optional[int]:
+        """Heure d'ouverture (ms) de la dernière bougie stockée"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(open_time) FROM candles WHERE source=? AND symbol=? AND interval=?",
+                (source, symbol, interval)
+            ).fetchone()
+        return row[0]
+
+    def delta_start(self, source: str, symbol: str, interval: str, limit: int,
+                    now: Optional[float] = None) -> Optional[int]:
+        """
+        Calcule à partir de quelle bougie l'API doit être interrogée
+
+        Args:
+            source: Source de données ("binance", "twelvedata")
+            symbol: Symbole
+            interval: Intervalle des bougies
+            limit: Nombre de bougies demandées par l'appelant
+            now: Heure actuelle en secondes (pour les tests)
+
+        Returns:
+            Heure d'ouverture (ms) de la dernière bougie stockée, à redemander
+            avec les suivantes, ou None si l'historique complet doit être récupéré
+        """
+        last = self.last_open_time(source, symbol, interval)
+        if last is None or self.count(source, symbol, interval, limit) < limit:
+            return None
+
+        now_ms = (time.time() if now is None else now) * 1000
+        if (now_ms - last) // interval_to_milliseconds(interval) >= limit:
+            # Cache trop ancien : les bougies stockées ne servent plus
+            return None
+        return last
+
+    def is_fresh(self, source: str, symbol: str, interval: str,
+                 now: Optional[float] = None) -> bool:
+        """
+        True si aucune requête n'est nécessaire : la dernière bougie stockée est
+        toujours ouverte et a été récupérée il y a moins de `open_candle_ttl` secondes
+        """
+        if self.open_candle_ttl <= 0:
+            return False
+
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at FROM series WHERE source=? AND symbol=? AND interval=?",
+                (source, symbol, interval)
+            ).fetchone()
+        last = self.last_open_time(source, symbol, interval)
+        if row is None or last is None:
+            return False
+
+        candle_is_open = now * 1000 < last + interval_to_milliseconds(interval)
+        return candle_is_open and now - row[0] < self.open_candle_ttl
+
+    def count(self, source: str, symbol: str, interval: str, limit: int) -> int:
+        """Nombre de bougies stockées, plafonné à `limit`"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM candles WHERE source=? AND symbol=? "
+                "AND interval=? LIMIT ?)",
+                (source, symbol, interval, limit)
+            ).fetchone()
+        return row[0]
+
+    def upsert(self, source: str, symbol: str, interval: str,
+               rows: Iterable[Tuple[int, float, float, float, float, float]],
+               fetched_at: Optional[float] = None):
+        """
+        Enregistre des bougies (remplace celles qui existent déjà)
+
+        Args:
+            source: Source de données
+            symbol: Symbole
+            interval: Intervalle
+            rows: Tuples (open_time ms, open, high, low, close, volume)
+            fetched_at: Heure de récupération en secondes
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((source, symbol, interval, *row) for row in rows)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?)",
+                (source, symbol, interval, fetched_at)
+            )
+
+    def load(self, source: str, symbol: str, interval: str, limit: int) -> List[Tuple]:
+        """
+        Lit les `limit` dernières bougies, de la plus ancienne à la plus récente
+
+        Returns:
+            Liste de tuples (open_time, open, high, low, close, volume)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT open_time, open, high, low, close, volume FROM candles "
+                "WHERE source=? AND symbol=? AND interval=? "
+                "ORDER BY open_time DESC LIMIT ?",
+                (source, symbol, interval, limit)
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+    def load_dataframe(self, source: str, symbol: str, interval: str, limit: int) -> pd.DataFrame:
+        """
+        Lit les `limit` dernières bougies sous forme de DataFrame OHLCV
+
+        Returns:
+            DataFrame avec les colonnes timestamp, open, high, low, close, volume
+        """
+        df = pd.DataFrame(self.load(source, symbol, interval, limit), columns=list(CANDLE_FIELDS))
+        df['timestamp'] = pd.to_datetime(df.pop('open_time'), unit='ms')
+        return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+
+    def load_arrays(self, source: str, symbol: str, interval: str, limit: Optional[int] = None,
+                    fields: Iterable[str] = CANDLE_FIELDS) -> Dict[str, np.ndarray]:
+        """
+        Lit les bougies stockées sous forme de tableaux NumPy
+
+        Args:
+            limit: Nombre de bougies les plus récentes (None = toutes)
+            fields: Champs à lire (parmi CANDLE_FIELDS)
+
+        Returns:
+            Dict {champ: tableau}, de la bougie la plus ancienne à la plus récente
+        """
+        fields = list(fields)
+        unknown = set(fields) - set(CANDLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Champs inconnus: {sorted(unknown)}")
+
+        query = (f"SELECT {', '.join(fields)} FROM candles "
+                 "WHERE source=? AND symbol=? AND interval=? ORDER BY open_time")
+        params: tuple = (source, symbol, interval)
+        if limit is not None:
+            query += " DESC LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        if limit is not None:
+            rows.reverse()
+
+        columns = list(zip(*rows)) if rows else [()] * len(fields)
+        return {
+            field: np.array(column, dtype=np.int64 if field == 'open_time' else np.float64)
+            for field, column in zip(fields, columns)
+        }
+
+
+def dataframe_to_rows(df: pd.DataFrame) -> List[Tuple]:
+    """Convertit un DataFrame OHLCV (colonne timestamp) en tuples pour `CandleCache.upsert`"""
+    open_times = timestamps_to_milliseconds(df['timestamp'])
+    volume = df['volume'].tolist() if 'volume' in df else [None] * len(df)
+    return list(zip(
+        open_times, df['open'].tolist(), df['high'].tolist(),
+        df['low'].tolist(), df['close'].tolist(), volume
+    ))
@@ -0,0 +1,169 @@
+"""
+Module d'état des cooldowns d'alertes (mémoire ou SQLite partagé)
+
+Chaque clé (symbole, intervalle, bande, règle) garde l'heure de sa dernière
+alerte et un drapeau « armé » pour l'hystérésis : après une alerte, la bande
+n'est réarmée que lorsque le prix est ressorti de la zone.
+
+`MemoryCooldownStore` (dict, un seul processus) est le défaut.
+`SQLiteCooldownStore` partage le même état entre processus (workers, cron,
+redémarrages) via un fichier SQLite en WAL : la prise d'une alerte est une
+seule requête atomique sur la clé primaire, sans fsync à chaque alerte.
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# (symbole, intervalle, bande, règle)
+CooldownKey = Tuple[str, str, str, str]
+
+
+class MemoryCooldownStore:
+    """État des cooldowns en mémoire (dict, accès O(1))"""
+
+    def __init__(self):
+        # clé -> [heure de la dernière alerte (epoch), armé]
+        self._state: Dict[CooldownKey, List] = {}
+        self._lock = threading.Lock()
+
+    def last_alert(self, key: CooldownKey) -> Optional[float]:
+        """Heure (epoch) de la dernière alerte, None si jamais alertée"""
+        entry = self._state.get(key)
+        return entry[0] if entry is not None else None
+
+    def is_armed(self, key: CooldownKey) -> bool:
+        entry = self._state.get(key)
+        return entry is None or entry[1]
+
+    def acquire(self, key: CooldownKey, now: float, cooldown: float,
+                hysteresis: bool = False) -> bool:
+        """
+        Réserve l'alerte si le cooldown est écoulé (et la bande réarmée)
+
+        Args:
+            key: Clé (symbole, intervalle, bande, règle)
+            now: Heure courante (epoch)
+            cooldown: Délai minimum entre deux alertes en secondes
+            hysteresis: Exiger aussi que la bande ait été réarmée
+
+        Returns:
+            True si l'alerte peut partir (heure enregistrée, bande désarmée)
+        """
+        with self._lock:
+            entry = self._state.get(key)
+            if entry is not None and (now - entry[0] < cooldown or (hysteresis and not entry[1])):
+                return False
+            self._state[key] = [now, False]
+            return True
+
+    def record(self, key: CooldownKey, now: float):
+        """Enregistre une alerte sans condition (bande désarmée)"""
+        with self._lock:
+            self._state[key] = [now, False]
+
+    def rearm(self, key: CooldownKey):
+        """Réarme la bande (le prix est sorti de la zone)"""
+        with self._lock:
+            entry = self._state.get(key)
+            if entry is not None:
+                entry[1] = True
+
+    def clear(self, key: CooldownKey):
+        """Oublie la clé (prochaine alerte autorisée immédiatement)"""
+        with self._lock:
+            self._state.pop(key, None)
+
+    def close(self):
+        pass
+
+
+class SQLiteCooldownStore:
+    """État des cooldowns partagé entre processus (SQLite WAL, une ligne par clé)"""
+
+    def __init__(self, path: str = "data/cooldowns.db", timeout: float = 5.0):
+        """
+        Ouvre (ou crée) le fichier d'état
+
+        Args:
+            path: Chemin du fichier SQLite, partagé par tous les processus
+            timeout: Attente maximum en secondes si un autre processus écrit
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit : chaque prise d'alerte est visible immédiatement par les autres processus
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cooldowns (
+                symbol TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                band TEXT NOT NULL,
+                rule TEXT NOT NULL,
+                last_alert REAL NOT NULL,
+                armed INTEGER NOT NULL,
+                PRIMARY KEY (symbol, interval, band, rule)
+            ) WITHOUT ROWID
+        """)
+
+    def _row(self, key: CooldownKey):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT last_alert, armed FROM cooldowns "
+                "WHERE symbol = ? AND interval = ? AND band = ? AND rule = ?", key
+            ).fetchone()
+
+    def last_alert(self, key: CooldownKey) -> Optional[float]:
+        """Heure (epoch) de la dernière alerte, None si jamais alertée"""
+        row = self._row(key)
+        return row[0] if row is not None else None
+
+    def is_armed(self, key: CooldownKey) -> bool:
+        row = self._row(key)
+        return row is None or bool(row[1])
+
+    def acquire(self, key: CooldownKey, now: float, cooldown: float,
+                hysteresis: bool = False) -> bool:
+        """Réserve l'alerte (voir `MemoryCooldownStore.acquire`), atomique entre processus"""
+        with self._lock:
+            cursor = self._conn.execute("""
+                INSERT INTO cooldowns (symbol, interval, band, rule, last_alert, armed)
+                VALUES (?, ?, ?, ?, ?, 0)
+                ON CONFLICT (symbol, interval, band, rule) DO UPDATE
+                SET last_alert = excluded.last_alert, armed = 0
+                WHERE cooldowns.last_alert <= ? AND (cooldowns.armed = 1 OR ? = 0)
+            """, (*key, now, now - cooldown, int(hysteresis)))
+            return cursor.rowcount == 1
+
+    def record(self, key: CooldownKey, now: float):
+        """Enregistre une alerte sans condition (bande désarmée)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cooldowns (symbol, interval, band, rule, last_alert, armed) "
+                "VALUES (?, ?, ?, ?, ?, 0)", (*key, now)
+            )
+
+    def rearm(self, key: CooldownKey):
+        """Réarme la bande (le prix est sorti de la zone)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE cooldowns SET armed = 1 "
+                "WHERE symbol = ? AND interval = ? AND band = ? AND rule = ? AND armed = 0", key
+            )
+
+    def clear(self, key: CooldownKey):
+        """Oublie la clé (prochaine alerte autorisée immédiatement)"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cooldowns WHERE symbol = ? AND interval = ? AND band = ? AND rule = ?", key
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
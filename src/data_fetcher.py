@@ -1,24 +1,159 @@
 """
 Module pour récupérer les données de prix depuis Binance
 """
+import threading
+
+import numpy as np
 import pandas as pd
 from binance.client import Client
-from typing import Optional
+from typing import Dict, List, Optional, Sequence
 from datetime import datetime
+from src.candle_cache import CandleCache
+from src.rate_limiter import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    RateLimiter,
+    binance_retry_after
+)
+
+
+KLINE_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_volume', 'trades', 'taker_buy_base',
+    'taker_buy_quote', 'ignore'
+]
+
+# Position et type NumPy de chaque champ dans une bougie brute Binance
+KLINE_FIELDS = {
+    'open_time': (0, np.int64),
+    'open': (1, np.float64),
+    'high': (2, np.float64),
+    'low': (3, np.float64),
+    'close': (4, np.float64),
+    'volume': (5, np.float64),
+    'close_time': (6, np.int64),
+    'quote_volume': (7, np.float64),
+    'trades': (8, np.int64),
+}
+
+
+def klines_to_arrays(klines: list, fields: Sequence[str] = ('open_time', 'close')) -> Dict[str, np.ndarray]:
+    """
+    Convertit la réponse brute /api/v3/klines en tableaux NumPy, sans pandas
+
+    Seuls les champs demandés sont lus : chaque tableau est alloué une fois
+    à la bonne taille et rempli directement depuis les listes brutes.
+
+    Args:
+        klines: Liste de chandeliers au format Binance
+        fields: Champs à extraire (clés de KLINE_FIELDS)
+
+    Returns:
+        Dict {champ: tableau}
+    """
+    count = len(klines)
+    arrays = {}
+    for field in fields:
+        index, dtype = KLINE_FIELDS[field]
+        arrays[field] = np.fromiter((kline[index] for kline in klines), dtype=dtype, count=count)
+    return arrays
+
+
+def klines_to_dataframe(klines: list) -> pd.DataFrame:
+    """
+    Convertit la réponse brute /api/v3/klines en DataFrame
+
+    Args:
+        klines: Liste de chandeliers au format Binance
+
+    Returns:
+        DataFrame avec les données OHLCV
+    """
+    df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
+
+    # Conversion des types
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df['close'] = df['close'].astype(float)
+    df['open'] = df['open'].astype(float)
+    df['high'] = df['high'].astype(float)
+    df['low'] = df['low'].astype(float)
+    df['volume'] = df['volume'].astype(float)
+
+    return df
 
 
 class DataFetcher:
     """Récupère les données de prix depuis Binance"""
 
-    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None):
+    SOURCE = 'binance'
+
+    # Poids des endpoints (limite par défaut : 6000 par minute et par IP)
+    KLINES_WEIGHT = 2
+    TICKER_WEIGHT = 2
+    ALL_TICKERS_WEIGHT = 4
+
+    # Nombre maximum de bougies par requête /api/v3/klines
+    PAGE_SIZE = 1000
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 cache: Optional[CandleCache] = None, client=None,
+                 rate_limiter: Optional[RateLimiter] = None):
         """
         Initialise le client Binance
 
         Args:
             api_key: Clé API Binance (optionnel pour données publiques)
             api_secret: Secret API Binance (optionnel pour données publiques)
+            cache: Cache local des bougies (seules les nouvelles bougies sont demandées)
+            client: Client déjà construit (remplace le client par défaut)
+            rate_limiter: Limiteur de débit partagé (None = pas de limitation)
         """
-        self.client = Client(api_key, api_secret)
+        self.client = client if client is not None else Client(api_key, api_secret)
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+
+        # `client.response` est partagé par les threads (rattrapage parallèle) : la
+        # réponse de chaque appel est capturée dans son thread par un hook requests
+        self._responses = threading.local()
+        self._response_lock = threading.Lock()
+        hooks = getattr(getattr(self.client, 'session', None), 'hooks', None)
+        self._hooked = isinstance(hooks, dict) and isinstance(hooks.get('response'), list)
+        if self._hooked:
+            hooks['response'].append(self._capture_response)
+
+    def _capture_response(self, response, *args, **kwargs):
+        self._responses.current = response
+
+    def _call_with_response(self, function, params: dict):
+        """Appelle le client et renvoie (résultat, réponse HTTP de cet appel)"""
+        if self._hooked:
+            self._responses.current = None
+            return function(**params), self._responses.current
+        if not hasattr(self.client, 'response'):
+            return function(**params), None
+        # Client sans session requests : appel et lecture de la réponse sérialisés
+        with self._response_lock:
+            return function(**params), self.client.response
+
+    def _request(self, method: str, weight: int, priority: int = PRIORITY_NORMAL, **params):
+        """Appelle une méthode du client en passant par le limiteur de débit"""
+        function = getattr(self.client, method)
+        if self.rate_limiter is None:
+            return function(**params)
+
+        def call():
+            result, response = self._call_with_response(function, params)
+            # Poids consommé selon Binance, toutes connexions de l'IP confondues
+            self.rate_limiter.update_from_headers(getattr(response, 'headers', None), weight=weight)
+            return result
+
+        key = (method,) + tuple(sorted(params.items()))
+        return self.rate_limiter.call(call, key=key, weight=weight, priority=priority,
+                                      retry_after=binance_retry_after)
+
+    def _get_klines(self, priority: int = PRIORITY_NORMAL, **params) -> list:
+        return self._request('get_klines', self.KLINES_WEIGHT, priority, **params)
 
     def get_historical_klines(self, symbol: str, interval: str, limit: int = 100) -> pd.DataFrame:
         """
@@ -32,27 +167,81 @@ class DataFetcher:
         Returns:
             DataFrame avec les données OHLCV
         """
-        klines = self.client.get_klines(
+        if self.cache is not None:
+            return self._get_cached_klines(symbol, interval, limit)
+
+        klines = self._get_klines(
             symbol=symbol,
             interval=interval,
             limit=limit
         )
 
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-            'taker_buy_quote', 'ignore'
-        ])
+        return klines_to_dataframe(klines)
 
-        # Conversion des types
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df['close'] = df['close'].astype(float)
-        df['open'] = df['open'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['volume'] = df['volume'].astype(float)
+    def get_kline_arrays(self, symbol: str, interval: str, limit: int = 100,
+                         fields: Sequence[str] = ('open_time', 'close')) -> Dict[str, np.ndarray]:
+        """
+        Récupère les chandeliers sous forme de tableaux NumPy (chemin léger, sans DataFrame)
 
-        return df
+        Args:
+            symbol: Symbole de trading (ex: BTCUSDT)
+            interval: Intervalle de temps (1m, 5m, 15m, 1h, 4h, 1d)
+            limit: Nombre de chandeliers à récupérer
+            fields: Champs à extraire (open_time en ms, open, high, low, close, volume...)
+
+        Returns:
+            Dict {champ: tableau}, de la bougie la plus ancienne à la plus récente
+        """
+        if self.cache is not None:
+            self._refresh_cache(symbol, interval, limit)
+            return self.cache.load_arrays(self.SOURCE, symbol, interval, limit=limit, fields=fields)
+
+        klines = self._get_klines(symbol=symbol, interval=interval, limit=limit)
+        return klines_to_arrays(klines, fields)
+
+    def get_kline_range(self, symbol: str, interval: str, start: int, end: int) -> Dict[str, np.ndarray]:
+        """
+        Récupère une page de bougies entre deux heures d'ouverture (téléchargement d'historique)
+
+        Args:
+            symbol: Symbole de trading (ex: BTCUSDT)
+            interval: Intervalle de temps
+            start: Première heure d'ouverture en ms (incluse)
+            end: Dernière heure d'ouverture en ms (incluse), au plus PAGE_SIZE bougies après `start`
+
+        Returns:
+            Dict {champ: tableau} (open_time, open, high, low, close, volume)
+        """
+        klines = self._get_klines(PRIORITY_LOW, symbol=symbol, interval=interval,
+                                  startTime=start, endTime=end, limit=self.PAGE_SIZE)
+        return klines_to_arrays(klines, ('open_time', 'open', 'high', 'low', 'close', 'volume'))
+
+    def _get_cached_klines(self, symbol: str, interval: str, limit: int) -> pd.DataFrame:
+        """Complète le cache avec les bougies manquantes puis lit les `limit` dernières"""
+        self._refresh_cache(symbol, interval, limit)
+        return self.cache.load_dataframe(self.SOURCE, symbol, interval, limit)
+
+    def _refresh_cache(self, symbol: str, interval: str, limit: int):
+        """Demande à l'API uniquement les bougies absentes du cache"""
+        if self.cache.is_fresh(self.SOURCE, symbol, interval):
+            return
+
+        start = self.cache.delta_start(self.SOURCE, symbol, interval, limit)
+        if start is None:
+            # Historique complet : passe après les requêtes du cycle de surveillance
+            klines = self._get_klines(PRIORITY_LOW, symbol=symbol, interval=interval, limit=limit)
+        else:
+            # Dernière bougie stockée (peut-être encore ouverte) et suivantes
+            klines = self._get_klines(
+                symbol=symbol,
+                interval=interval,
+                startTime=start,
+                limit=1000
+            )
+        self.cache.upsert(self.SOURCE, symbol, interval, (
+            (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+            for k in klines
+        ))
 
     def get_current_price(self, symbol: str) -> float:
         """
@@ -64,9 +253,31 @@ class DataFetcher:
         Returns:
             Prix actuel
         """
-        ticker = self.client.get_symbol_ticker(symbol=symbol)
+        ticker = self._request('get_symbol_ticker', self.TICKER_WEIGHT, PRIORITY_HIGH, symbol=symbol)
         return float(ticker['price'])
 
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Récupère le prix actuel de plusieurs symboles en une seule requête
+
+        Args:
+            symbols: Liste de symboles de trading
+
+        Returns:
+            Dict {symbole: prix}
+        """
+        if len(symbols) == 1:
+            return {symbols[0]: self.get_current_price(symbols[0])}
+
+        # Un seul appel pour tous les tickers au lieu d'un appel par symbole
+        wanted = set(symbols)
+        tickers = self._request('get_symbol_ticker', self.ALL_TICKERS_WEIGHT, PRIORITY_HIGH)
+        return {
+            ticker['symbol']: float(ticker['price'])
+            for ticker in tickers
+            if ticker['symbol'] in wanted
+        }
+
     def get_latest_close_prices(self, symbol: str, interval: str, limit: int = 100) -> pd.Series:
         """
         Récupère uniquement les prix de clôture
@@ -79,5 +290,5 @@ class DataFetcher:
         Returns:
             Série de prix de clôture
         """
-        df = self.get_historical_klines(symbol, interval, limit)
-        return df['close']
+        arrays = self.get_kline_arrays(symbol, interval, limit, fields=('close',))
+        return pd.Series(arrays['close'], name='close')
@@ -0,0 +1,516 @@
+"""
+Module de pipeline d'indicateurs en streaming (BB, Keltner, ATR, RSI, squeeze)
+
+Plusieurs indicateurs s'abonnent au même flux de bougies. Les calculs
+intermédiaires (clôture précédente, moyenne/variance glissantes, true range)
+sont des nœuds partagés : un même nœud n'est créé qu'une fois par pipeline et
+n'est calculé qu'une fois par mise à jour, quel que soit le nombre
+d'indicateurs qui l'utilisent.
+
+Les conditions (`rsi > 70`, `near(close, bb.upper, 0.5)`...) se combinent avec
+`&`, `|` et `~` et ne lisent que les valeurs déjà calculées.
+"""
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from src.bollinger_bands import RollingWindow
+
+
+class Signal(ABC):
+    """Valeur numérique lisible à tout moment ; les comparaisons donnent des conditions"""
+
+    name = 'signal'
+
+    @abstractmethod
+    def current(self) -> float:
+        """Valeur actuelle (NaN tant qu'elle n'est pas calculable)"""
+
+    def _compare(self, other, operator: Callable[[float, float], bool], symbol: str) -> 'Condition':
+        if isinstance(other, Signal):
+            right, label = other.current, other.name
+        else:
+            right, label = (lambda: other), repr(other)
+        return Condition(lambda: operator(self.current(), right()), f"{self.name} {symbol} {label}")
+
+    def __gt__(self, other) -> 'Condition':
+        return self._compare(other, lambda a, b: a > b, '>')
+
+    def __ge__(self, other) -> 'Condition':
+        return self._compare(other, lambda a, b: a >= b, '>=')
+
+    def __lt__(self, other) -> 'Condition':
+        return self._compare(other, lambda a, b: a < b, '<')
+
+    def __le__(self, other) -> 'Condition':
+        return self._compare(other, lambda a, b: a <= b, '<=')
+
+
+class Condition:
+    """Condition booléenne combinable (NaN = fausse, comme toute comparaison avec NaN)"""
+
+    def __init__(self, predicate: Callable[[], bool], description: str):
+        self._predicate = predicate
+        self.description = description
+
+    def __call__(self) -> bool:
+        return bool(self._predicate())
+
+    def __and__(self, other: 'Condition') -> 'Condition':
+        return Condition(lambda: self() and other(), f"({self.description} ET {other.description})")
+
+    def __or__(self, other: 'Condition') -> 'Condition':
+        return Condition(lambda: self() or other(), f"({self.description} OU {other.description})")
+
+    def __invert__(self) -> 'Condition':
+        return Condition(lambda: not self(), f"NON {self.description}")
+
+    def __repr__(self) -> str:
+        return f"Condition({self.description})"
+
+
+def near(price: Signal, band: Signal, percent: float) -> Condition:
+    """Prix à moins de `percent` % de la bande (même calcul que `check_proximity`)"""
+    def predicate():
+        value = band.current()
+        return abs(value - price.current()) / value * 100 <= percent
+    return Condition(predicate, f"{price.name} à {percent}% de {band.name}")
+
+
+class Node(Signal):
+    """Nœud du pipeline : recalculé une fois par bougie, après ses dépendances"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value = math.nan
+
+    @abstractmethod
+    def push(self, candle: Dict[str, float], new: bool):
+        """
+        Met à jour la valeur du nœud
+
+        Args:
+            candle: Bougie courante {'high', 'low', 'close'}
+            new: True pour une nouvelle bougie, False si la dernière bougie
+                (encore ouverte) est remplacée
+        """
+
+    def reset(self):
+        """Oublie l'historique (avant un nouveau `seed`)"""
+        self.value = math.nan
+
+    def current(self) -> float:
+        return self.value
+
+
+class Output(Signal):
+    """Composante d'un nœud à plusieurs valeurs (ex: bande haute)"""
+
+    def __init__(self, node: Node, index: int, name: str):
+        self.node = node
+        self.index = index
+        self.name = name
+
+    def current(self) -> float:
+        return self.node.value[self.index]
+
+
+class Field(Node):
+    """Champ brut de la bougie (high, low, close)"""
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.field = field
+
+    def push(self, candle, new):
+        self.value = candle[self.field]
+
+
+class PreviousClose(Node):
+    """Clôture de la dernière bougie clôturée (partagée par true range et RSI)"""
+
+    def __init__(self):
+        super().__init__('previous_close')
+        self._current: Optional[float] = None
+
+    def push(self, candle, new):
+        if new and self._current is not None:
+            self.value = self._current
+        self._current = candle['close']
+
+    def reset(self):
+        super().reset()
+        self._current = None
+
+
+class RollingStats(Node):
+    """Moyenne et écart-type glissants d'un nœud (fenêtre de Welford en O(1))"""
+
+    def __init__(self, source: Node, period: int):
+        super().__init__(f"stats_{source.name}_{period}")
+        self.source = source
+        self.window = RollingWindow(period)
+        self.value = (math.nan, math.nan)
+
+    def push(self, candle, new):
+        if new:
+            self.window.append(self.source.value)
+        else:
+            self.window.replace_last(self.source.value)
+        if self.window.is_full:
+            self.value = (self.window.mean, self.window.std)
+        else:
+            self.value = (math.nan, math.nan)
+
+    def reset(self):
+        self.window.clear()
+        self.value = (math.nan, math.nan)
+
+    @property
+    def mean(self) -> Output:
+        return Output(self, 0, f"sma_{self.window.size}")
+
+    @property
+    def std(self) -> Output:
+        return Output(self, 1, f"std_{self.window.size}")
+
+
+class _WilderAverage:
+    """
+    Moyenne lissée de Wilder (alpha = 1/period) avec bougie ouverte remplaçable
+
+    L'état validé ne contient que les bougies clôturées ; la valeur courante
+    est recalculée depuis cet état et la dernière valeur reçue.
+    """
+
+    def __init__(self, period: int, seed_with_mean: bool):
+        self.period = period
+        self.seed_with_mean = seed_with_mean
+        self.reset()
+
+    def reset(self):
+        self._count = 0
+        self._sum = 0.0
+        self._average = math.nan
+        self._pending: Optional[float] = None
+
+    def _next(self, value: float) -> Tuple[int, float, float]:
+        count = self._count + 1
+        if self.seed_with_mean and count <= self.period:
+            # Premier point : moyenne simple des `period` premières valeurs
+            total = self._sum + value
+            return count, total, total / count
+        if count == 1:
+            return count, 0.0, value
+        return count, 0.0, self._average + (value - self._average) / self.period
+
+    def push(self, value: float, new: bool) -> float:
+        if new and self._pending is not None:
+            self._count, self._sum, self._average = self._next(self._pending)
+        self._pending = value
+        count, _, average = self._next(value)
+        return average if count >= self.period else math.nan
+
+
+class TrueRange(Node):
+    """True range : max(high - low, |high - clôture précédente|, |low - clôture précédente|)"""
+
+    def __init__(self, previous_close: PreviousClose):
+        super().__init__('true_range')
+        self.previous_close = previous_close
+
+    def push(self, candle, new):
+        high, low = candle['high'], candle['low']
+        previous = self.previous_close.value
+        if math.isnan(previous):
+            self.value = high - low
+        else:
+            self.value = max(high - low, abs(high - previous), abs(low - previous))
+
+
+class ATR(Node):
+    """Average True Range (lissage de Wilder, initialisé par une moyenne simple)"""
+
+    def __init__(self, true_range: TrueRange, period: int):
+        super().__init__(f"atr_{period}")
+        self.true_range = true_range
+        self._average = _WilderAverage(period, seed_with_mean=True)
+
+    def push(self, candle, new):
+        self.value = self._average.push(self.true_range.value, new)
+
+    def reset(self):
+        super().reset()
+        self._average.reset()
+
+
+class RSI(Node):
+    """Relative Strength Index (moyennes de Wilder des hausses et des baisses)"""
+
+    def __init__(self, previous_close: PreviousClose, period: int):
+        super().__init__(f"rsi_{period}")
+        self.previous_close = previous_close
+        self._gains = _WilderAverage(period, seed_with_mean=False)
+        self._losses = _WilderAverage(period, seed_with_mean=False)
+
+    def push(self, candle, new):
+        previous = self.previous_close.value
+        # Première bougie : variation nulle (même convention que `ta`)
+        change = 0.0 if math.isnan(previous) else candle['close'] - previous
+        gain = self._gains.push(max(change, 0.0), new)
+        loss = self._losses.push(max(-change, 0.0), new)
+        if math.isnan(gain):
+            self.value = math.nan
+        elif loss == 0.0:
+            self.value = 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + gain / loss)
+
+    def reset(self):
+        super().reset()
+        self._gains.reset()
+        self._losses.reset()
+
+
+class Bands(Node):
+    """Canal (upper, basis, lower) autour d'une moyenne glissante"""
+
+    def __init__(self, name: str, stats: RollingStats, width: Callable[[], float]):
+        super().__init__(name)
+        self.stats = stats
+        self._width = width
+        self.value = (math.nan, math.nan, math.nan)
+
+    def push(self, candle, new):
+        basis = self.stats.value[0]
+        width = self._width()
+        self.value = (basis + width, basis, basis - width)
+
+    def reset(self):
+        self.value = (math.nan, math.nan, math.nan)
+
+    @property
+    def upper(self) -> Output:
+        return Output(self, 0, f"{self.name}.upper")
+
+    @property
+    def basis(self) -> Output:
+        return Output(self, 1, f"{self.name}.basis")
+
+    @property
+    def lower(self) -> Output:
+        return Output(self, 2, f"{self.name}.lower")
+
+
+class Bandwidth(Node):
+    """Largeur relative des bandes : (upper - lower) / basis"""
+
+    def __init__(self, bands: Bands):
+        super().__init__(f"{bands.name}.bandwidth")
+        self.bands = bands
+
+    def push(self, candle, new):
+        upper, basis, lower = self.bands.value
+        self.value = (upper - lower) / basis
+
+
+class PercentB(Node):
+    """Position de la clôture dans les bandes : 0 = bande basse, 1 = bande haute"""
+
+    def __init__(self, bands: Bands):
+        super().__init__(f"{bands.name}.percent_b")
+        self.bands = bands
+
+    def push(self, candle, new):
+        upper, _, lower = self.bands.value
+        width = upper - lower
+        self.value = (candle['close'] - lower) / width if width else math.nan
+
+
+class IndicatorPipeline:
+    """Ensemble d'indicateurs alimentés par un même flux de bougies"""
+
+    def __init__(self):
+        self._nodes: Dict[Hashable, Node] = {}
+        self._order: List[Node] = []
+        self.close = self._node(('field', 'close'), lambda: Field('close'))
+        self.high = self._node(('field', 'high'), lambda: Field('high'))
+        self.low = self._node(('field', 'low'), lambda: Field('low'))
+
+    def _node(self, key: Hashable, factory: Callable[[], Node]) -> Node:
+        """Nœud existant pour `key`, ou créé (après ses dépendances, donc dans l'ordre de calcul)"""
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes[key] = factory()
+            self._order.append(node)
+        return node
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    # Nœuds partagés
+
+    def previous_close(self) -> PreviousClose:
+        return self._node(('previous_close',), PreviousClose)
+
+    def rolling_stats(self, period: int) -> RollingStats:
+        """Moyenne et écart-type glissants des clôtures"""
+        return self._node(('stats', period), lambda: RollingStats(self.close, period))
+
+    def true_range(self) -> TrueRange:
+        return self._node(('true_range',), lambda: TrueRange(self.previous_close()))
+
+    # Indicateurs
+
+    def sma(self, period: int) -> Output:
+        return self.rolling_stats(period).mean
+
+    def atr(self, period: int = 14) -> ATR:
+        return self._node(('atr', period), lambda: ATR(self.true_range(), period))
+
+    def rsi(self, period: int = 14) -> RSI:
+        return self._node(('rsi', period), lambda: RSI(self.previous_close(), period))
+
+    def bollinger(self, period: int = 20, multiplier: float = 2.0) -> Bands:
+        """Bandes de Bollinger (écart-type ddof=1, comme `BollingerBands`)"""
+        stats = self.rolling_stats(period)
+        return self._node(('bollinger', period, multiplier), lambda: Bands(
+            f"bb_{period}_{multiplier}", stats, lambda: multiplier * stats.value[1]
+        ))
+
+    def keltner(self, period: int = 20, multiplier: float = 1.5,
+                atr_period: Optional[int] = None) -> Bands:
+        """
+        Canal de Keltner : SMA des clôtures ± multiplier x ATR
+
+        La SMA (et non une EMA) permet de partager la moyenne glissante avec
+        les Bandes de Bollinger de même période, comme pour le squeeze.
+        """
+        atr_period = atr_period or period
+        stats = self.rolling_stats(period)
+        atr = self.atr(atr_period)
+        return self._node(('keltner', period, multiplier, atr_period), lambda: Bands(
+            f"kc_{period}_{multiplier}_{atr_period}", stats, lambda: multiplier * atr.value
+        ))
+
+    def bandwidth(self, bands: Bands) -> Bandwidth:
+        return self._node(('bandwidth', bands.name), lambda: Bandwidth(bands))
+
+    def percent_b(self, bands: Bands) -> PercentB:
+        return self._node(('percent_b', bands.name), lambda: PercentB(bands))
+
+    def squeeze(self, bollinger: Bands, keltner: Bands) -> Condition:
+        """Bandes de Bollinger entièrement à l'intérieur du canal de Keltner"""
+        return Condition(
+            lambda: bollinger.value[0] < keltner.value[0] and bollinger.value[2] > keltner.value[2],
+            f"squeeze {bollinger.name} / {keltner.name}"
+        )
+
+    # Flux de bougies
+
+    def _push(self, close: float, high: Optional[float], low: Optional[float], new: bool):
+        candle = {
+            'close': float(close),
+            'high': float(close if high is None else high),
+            'low': float(close if low is None else low),
+        }
+        for node in self._order:
+            node.push(candle, new)
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None):
+        """Ajoute une nouvelle bougie (high/low = close s'ils ne sont pas fournis)"""
+        self._push(close, high, low, True)
+
+    def replace_last(self, close: float, high: Optional[float] = None, low: Optional[float] = None):
+        """Met à jour la bougie encore ouverte"""
+        self._push(close, high, low, False)
+
+    def seed(self, closes: Sequence[float], highs: Optional[Sequence[float]] = None,
+             lows: Optional[Sequence[float]] = None):
+        """Réinitialise le pipeline avec un historique, de la bougie la plus ancienne à la plus récente"""
+        for node in self._order:
+            node.reset()
+        highs = highs if highs is not None else [None] * len(closes)
+        lows = lows if lows is not None else [None] * len(closes)
+        for close, high, low in zip(closes, highs, lows):
+            self._push(close, high, low, True)
+
+    def values(self, names: Optional[Iterable[str]] = None) -> Dict[str, object]:
+        """Valeurs courantes des nœuds, par nom"""
+        wanted = set(names) if names is not None else None
+        return {
+            node.name: node.value for node in self._order
+            if wanted is None or node.name in wanted
+        }
+
+
+def build_filters(pipeline: IndicatorPipeline, spec: Dict[str, Sequence[dict]],
+                  period: int = 20, multiplier: float = 2.0) -> Dict[str, Condition]:
+    """
+    Construit les conditions d'alerte décrites dans la configuration (section `filters`)
+
+    Chaque type d'alerte ('upper' / 'lower') reçoit une liste de conditions
+    combinées par ET, par exemple :
+
+        upper:
+          - {indicator: rsi, period: 14, above: 70}
+          - {indicator: squeeze, active: false}
+
+    Indicateurs : rsi et atr (period, défaut 14), percent_b et bandwidth
+    (bandes de la surveillance, ou period / multiplier), squeeze (bandes de la
+    surveillance dans un canal de Keltner keltner_multiplier / atr_period).
+
+    Args:
+        pipeline: Pipeline de la surveillance (les nœuds y sont créés)
+        spec: {type d'alerte: [condition, ...]}
+        period, multiplier: Réglages des bandes de la surveillance
+
+    Returns:
+        Dict {type d'alerte: Condition}
+    """
+    filters = {}
+    for alert_type, conditions in spec.items():
+        if alert_type not in ('upper', 'lower'):
+            raise ValueError(f"Type d'alerte inconnu dans filters: {alert_type}")
+        combined = None
+        for condition in conditions:
+            condition = _build_condition(pipeline, dict(condition), period, multiplier)
+            combined = condition if combined is None else combined & condition
+        if combined is not None:
+            filters[alert_type] = combined
+    return filters
+
+
+def _build_condition(pipeline: IndicatorPipeline, spec: dict, period: int,
+                     multiplier: float) -> Condition:
+    name = spec.pop('indicator', None)
+    if name in ('rsi', 'atr'):
+        signal = getattr(pipeline, name)(spec.pop('period', 14))
+    elif name in ('percent_b', 'bandwidth', 'squeeze'):
+        # Par défaut les bandes de la surveillance : moyenne glissante partagée
+        bands_period = spec.pop('period', period)
+        bands = pipeline.bollinger(bands_period, spec.pop('multiplier', multiplier))
+        if name == 'squeeze':
+            keltner = pipeline.keltner(bands_period, spec.pop('keltner_multiplier', 1.5),
+                                       spec.pop('atr_period', None))
+            condition = pipeline.squeeze(bands, keltner)
+            if not spec.pop('active', True):
+                condition = ~condition
+            _check_empty(name, spec)
+            return condition
+        signal = getattr(pipeline, name)(bands)
+    else:
+        raise ValueError(f"Indicateur inconnu dans filters: {name}")
+
+    above, below = spec.pop('above', None), spec.pop('below', None)
+    _check_empty(name, spec)
+    if above is None and below is None:
+        raise ValueError(f"Condition sans seuil pour {name} (above / below)")
+    if above is not None and below is not None:
+        return (signal > above) & (signal < below)
+    return signal > above if above is not None else signal < below
+
+
+def _check_empty(name: str, spec: dict):
+    if spec:
+        raise ValueError(f"Clés inconnues pour {name}: {sorted(spec)}")
@@ -0,0 +1,78 @@
+"""
+Module utilitaire pour les intervalles de bougies
+"""
+
+# Durée des intervalles au format Binance, en secondes
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '3m': 180,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '2h': 7200,
+    '4h': 14400,
+    '6h': 21600,
+    '8h': 28800,
+    '12h': 43200,
+    '1d': 86400,
+    '3d': 259200,
+    '1w': 604800
+}
+
+
+def interval_to_seconds(interval: str) -> int:
+    """
+    Convertit un intervalle (1m, 5m, 1h, 4h, 1d...) en secondes
+
+    Args:
+        interval: Intervalle au format Binance
+
+    Returns:
+        Durée en secondes
+    """
+    try:
+        return INTERVAL_SECONDS[interval]
+    except KeyError:
+        raise ValueError(f"Intervalle non supporté: {interval}") from None
+
+
+def interval_to_milliseconds(interval: str) -> int:
+    """Convertit un intervalle en millisecondes"""
+    return interval_to_seconds(interval) * 1000
+
+
+def timestamps_to_milliseconds(timestamps) -> list:
+    """
+    Convertit une colonne pandas de dates en heures Unix en millisecondes
+
+    Args:
+        timestamps: Série pandas de type datetime
+
+    Returns:
+        Liste d'entiers (ms)
+    """
+    import pandas as pd
+    return ((timestamps - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).tolist()
+
+
+# Décalage des bougies par rapport à l'epoch Unix (un jeudi) :
+# les bougies hebdomadaires Binance commencent le lundi
+INTERVAL_OFFSET_MS = {
+    '1w': 4 * 86400 * 1000
+}
+
+
+def interval_start(time_ms: int, interval: str) -> int:
+    """
+    Heure d'ouverture (ms) de la bougie `interval` qui contient `time_ms`
+
+    Args:
+        time_ms: Instant en millisecondes
+        interval: Intervalle au format Binance
+
+    Returns:
+        Début de la bougie en millisecondes (UTC)
+    """
+    offset = INTERVAL_OFFSET_MS.get(interval, 0)
+    return time_ms - (time_ms - offset) % interval_to_milliseconds(interval)
@@ -0,0 +1,329 @@
+"""
+Module de métriques internes (format texte Prometheus)
+
+Histogrammes de durée par étape et par symbole, compteurs d'erreurs et
+jauges (retard de boucle, files de notification...). Les valeurs sont
+exposées sur un endpoint HTTP local `/metrics` et peuvent être résumées
+périodiquement dans la console.
+
+Désactivées, les métriques sont remplacées par `NULL_METRICS` dont toutes les
+méthodes sont vides : le coût se limite à un appel de méthode par mesure.
+"""
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Bornes des histogrammes de durée, en secondes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"') for _, value in items)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Histogram:
+    """Histogramme cumulatif d'une série (un jeu de labels)"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Quantile approché (borne haute du bucket qui le contient)"""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Timer:
+    """Mesure la durée d'un bloc `with` et l'ajoute à un histogramme"""
+
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str, labels: Dict[str, object]):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Metrics:
+    """Registre thread-safe de compteurs, jauges et histogrammes"""
+
+    enabled = True
+
+    def __init__(self, prefix: str = 'bollinger', buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Initialise le registre
+
+        Args:
+            prefix: Préfixe des noms de métriques exposés
+            buckets: Bornes des histogrammes en secondes
+        """
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._callbacks: List[Tuple[str, str, Callable[[], Dict[Labels, float]]]] = []
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, text: str):
+        """Texte d'aide (# HELP) d'une métrique"""
+        self._help[name] = text
+
+    def timer(self, name: str, **labels) -> _Timer:
+        """Context manager qui mesure la durée du bloc dans l'histogramme `name`"""
+        return _Timer(self, name, labels)
+
+    def observe(self, name: str, value: float, **labels):
+        """Ajoute une valeur (en secondes) à l'histogramme `name`"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Incrémente le compteur `name`"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Fixe la valeur de la jauge `name`"""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def register_callback(self, name: str, kind: str, callback: Callable[[], Dict[Tuple, float]]):
+        """
+        Métrique lue au moment de l'export (ex: profondeur des files de notification)
+
+        Args:
+            name: Nom de la métrique
+            kind: 'gauge' ou 'counter'
+            callback: Renvoie {labels (dict ou tuple de paires): valeur}
+        """
+        def read() -> Dict[Labels, float]:
+            return {_labels(dict(labels)): value for labels, value in callback().items()}
+        self._callbacks.append((name, kind, read))
+
+    def counter_value(self, name: str, **labels) -> float:
+        """Valeur actuelle d'un compteur (0 si jamais incrémenté)"""
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0)
+
+    def gauge_value(self, name: str, **labels) -> Optional[float]:
+        """Valeur actuelle d'une jauge (None si jamais fixée)"""
+        with self._lock:
+            return self._gauges.get(name, {}).get(_labels(labels))
+
+    def histogram_count(self, name: str, **labels) -> int:
+        """Nombre de mesures d'un histogramme"""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_labels(labels))
+            return histogram.count if histogram is not None else 0
+
+    def _snapshot(self):
+        with self._lock:
+            histograms = {
+                name: {labels: (list(h.counts), h.count, h.sum, h.max, h.quantile(0.5), h.quantile(0.95))
+                       for labels, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+
+        for name, kind, read in self._callbacks:
+            try:
+                values = read()
+            except Exception as e:
+                print(f"⚠️ Métrique {name} indisponible: {e}")
+                continue
+            (counters if kind == 'counter' else gauges).setdefault(name, {}).update(values)
+        return histograms, counters, gauges
+
+    def render(self) -> str:
+        """Export au format texte Prometheus"""
+        histograms, counters, gauges = self._snapshot()
+        lines = []
+
+        def header(name: str, kind: str):
+            full = f"{self.prefix}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        for name in sorted(counters):
+            full = header(name, 'counter')
+            for labels, value in sorted(counters[name].items()):
+                lines.append(f"{full}{_format_labels(labels)} {_format_value(value)}")
+
+        for name in sorted(gauges):
+            full = header(name, 'gauge')
+            for labels, value in sorted(gauges[name].items()):
+                lines.append(f"{full}{_format_labels(labels)} {_format_value(value)}")
+
+        for name in sorted(histograms):
+            full = header(name, 'histogram')
+            for labels, (counts, count, total, _, _, _) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = ('le', _format_value(bound) if bound != float('inf') else '+Inf')
+                    lines.append(f"{full}_bucket{_format_labels(labels, le)} {cumulative}")
+                lines.append(f"{full}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{full}_count{_format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Résumé lisible : durée moyenne / p95 / max par série, compteurs et jauges"""
+        histograms, counters, gauges = self._snapshot()
+        lines = ["📊 Métriques"]
+        for name in sorted(histograms):
+            for labels, (_, count, total, maximum, _, p95) in sorted(histograms[name].items()):
+                label = ''.join(f" {value}" for _, value in labels)
+                lines.append(f"  {name}{label}: n={count} moy={total / count * 1000:.1f}ms "
+                             f"p95≤{p95 * 1000:.1f}ms max={maximum * 1000:.1f}ms")
+        for kind in (counters, gauges):
+            for name in sorted(kind):
+                for labels, value in sorted(kind[name].items()):
+                    label = ''.join(f" {value}" for _, value in labels)
+                    lines.append(f"  {name}{label}: {value:g}")
+        return "\n".join(lines)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+class NullMetrics:
+    """Métriques désactivées : même interface que `Metrics`, sans aucun effet"""
+
+    enabled = False
+    _TIMER = _NullTimer()
+
+    def describe(self, name, text):
+        pass
+
+    def timer(self, name, **labels):
+        return self._TIMER
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def inc(self, name, amount=1, **labels):
+        pass
+
+    def set_gauge(self, name, value, **labels):
+        pass
+
+    def register_callback(self, name, kind, callback):
+        pass
+
+    def render(self) -> str:
+        return ""
+
+    def summary(self) -> str:
+        return ""
+
+
+NULL_METRICS = NullMetrics()
+
+
+class MetricsServer:
+    """Serveur HTTP local qui expose `/metrics` dans un thread dédié"""
+
+    def __init__(self, metrics: Metrics, host: str = '127.0.0.1', port: int = 9108):
+        """
+        Démarre le serveur
+
+        Args:
+            metrics: Registre à exposer
+            host: Adresse d'écoute (locale par défaut)
+            port: Port d'écoute (0 = port libre choisi par le système)
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Pas de ligne de log à chaque collecte
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='metrics-http', daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def close(self):
+        """Arrête le serveur"""
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,11 +1,14 @@
 """
 Module pour les différents types de notifications
+
+`requests` et `smtplib` / `email` ne sont importés qu'à la création du
+notifier qui en a besoin : le démarrage ne paie que les canaux configurés.
 """
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, Optional
+import queue
+import re
+import threading
+import time
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -17,23 +20,38 @@ class ConsoleNotifier:
         print("\n" + "=" * 60)
         print(f"{alert['message']}")
         print(f"Timestamp: {alert['timestamp']}")
+        if alert.get('symbol'):
+            print(f"Symbole: {alert['symbol']}")
         print(f"Prix actuel: {alert['price']}")
         print(f"Bande {alert['type']}: {alert['band_value']}")
         print(f"Distance: {alert['distance_pct']}%")
         print("=" * 60 + "\n")
 
+    def send_batch(self, alerts: List[Dict]):
+        """Affiche plusieurs alertes"""
+        for alert in alerts:
+            self.send(alert)
+
 
 class TelegramNotifier:
     """Envoie des alertes via Telegram"""
 
-    def __init__(self, bot_token: str, chat_id: str):
+    # Longueur maximale d'un message accepté par l'API Telegram
+    MAX_MESSAGE_LENGTH = 4096
+
+    def __init__(self, bot_token: str, chat_id: str, timeout: float = 10.0):
         self.bot_token = bot_token
         self.chat_id = chat_id
+        self.timeout = timeout
         self.api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        # Session partagée : la connexion HTTPS est réutilisée d'une alerte à l'autre
+        import requests
+        self.session = requests.Session()
 
-    def send(self, alert: Dict):
-        """Envoie l'alerte via Telegram"""
-        message = f"""
+    @staticmethod
+    def format_alert(alert: Dict) -> str:
+        """Texte d'une alerte"""
+        return f"""
 {alert['message']}
 
 📊 Prix: {alert['price']}
@@ -42,40 +60,80 @@ class TelegramNotifier:
 🕐 {datetime.fromisoformat(alert['timestamp']).strftime('%H:%M:%S')}
         """
 
+    def _post(self, text: str):
         payload = {
             'chat_id': self.chat_id,
-            'text': message,
+            'text': text,
             'parse_mode': 'HTML'
         }
 
-        try:
-            response = requests.post(self.api_url, json=payload)
-            response.raise_for_status()
-        except Exception as e:
-            print(f"Erreur lors de l'envoi Telegram: {e}")
+        # Les erreurs remontent au worker du notifier, qui les compte et les affiche
+        response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+    def send(self, alert: Dict):
+        """Envoie l'alerte via Telegram"""
+        for text in self.split_lines(self.format_alert(alert), self.MAX_MESSAGE_LENGTH):
+            self._post(text)
+
+    def send_batch(self, alerts: List[Dict]):
+        """Envoie plusieurs alertes en un seul message (plusieurs au-delà de 4096 caractères)"""
+        for text in self.split_batch(alerts):
+            self._post(text)
+
+    @classmethod
+    def split_batch(cls, alerts: List[Dict]) -> List[str]:
+        """Regroupe les alertes en messages d'au plus MAX_MESSAGE_LENGTH caractères"""
+        limit = cls.MAX_MESSAGE_LENGTH
+        messages = [f"🚨 {len(alerts)} alertes\n"]
+        for alert in alerts:
+            # Une alerte trop longue est coupée entre deux lignes, jamais au milieu d'une balise
+            for text in cls.split_lines(cls.format_alert(alert).strip() + "\n", limit - 1):
+                if len(messages[-1]) + len(text) + 1 > limit:
+                    messages.append("")
+                messages[-1] += ("\n" if messages[-1] else "") + text
+        return messages
+
+    @staticmethod
+    def split_lines(text: str, limit: int) -> List[str]:
+        """Découpe un texte en morceaux d'au plus `limit` caractères, entre deux lignes"""
+        pieces = [""]
+        for line in text.splitlines(keepends=True):
+            if len(line) > limit:
+                # Ligne plus longue qu'un message : balises HTML retirées avant la coupe
+                print(f"⚠️ Ligne Telegram de {len(line)} caractères coupée (balises retirées)")
+                line = re.sub(r'<[^>]*>', '', line)
+            while len(line) > limit:
+                pieces.append(line[:limit])
+                line = line[limit:]
+            if len(pieces[-1]) + len(line) > limit:
+                pieces.append("")
+            pieces[-1] += line
+        return [piece for piece in pieces if piece]
+
+    def close(self):
+        """Ferme la session HTTP"""
+        self.session.close()
 
 
 class EmailNotifier:
     """Envoie des alertes par email"""
 
     def __init__(self, smtp_server: str, smtp_port: int, sender_email: str,
-                 sender_password: str, receiver_email: str):
+                 sender_password: str, receiver_email: str, timeout: float = 30.0):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.sender_email = sender_email
         self.sender_password = sender_password
         self.receiver_email = receiver_email
+        self.timeout = timeout
+        # Connexion SMTP conservée entre les envois (STARTTLS + login une seule fois)
+        self._server: Optional['smtplib.SMTP'] = None
 
-    def send(self, alert: Dict):
-        """Envoie l'alerte par email"""
-        message = MIMEMultipart()
-        message['From'] = self.sender_email
-        message['To'] = self.receiver_email
-        message['Subject'] = f"Trading Alert - Bande {alert['type'].upper()}"
-
-        body = f"""
-        Alerte de Trading - Bandes de Bollinger
-
+    @staticmethod
+    def format_alert(alert: Dict) -> str:
+        """Texte d'une alerte"""
+        return f"""
         {alert['message']}
 
         Prix actuel: {alert['price']}
@@ -85,31 +143,212 @@ class EmailNotifier:
         Heure: {alert['timestamp']}
         """
 
+    def _connect(self) -> 'smtplib.SMTP':
+        import smtplib
+        if self._server is None:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+            try:
+                server.starttls()
+                server.login(self.sender_email, self.sender_password)
+            except Exception:
+                server.close()
+                raise
+            self._server = server
+        return self._server
+
+    def _deliver(self, subject: str, body: str):
+        import smtplib
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        message = MIMEMultipart()
+        message['From'] = self.sender_email
+        message['To'] = self.receiver_email
+        message['Subject'] = subject
         message.attach(MIMEText(body, 'plain'))
 
         try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(message)
-        except Exception as e:
-            print(f"Erreur lors de l'envoi email: {e}")
+            try:
+                self._connect().send_message(message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+                # Connexion fermée par le serveur (inactivité) : on se reconnecte une fois
+                self._disconnect()
+                self._connect().send_message(message)
+        except Exception:
+            # Erreur comptée et affichée par le worker du notifier
+            self._disconnect()
+            raise
+
+    def send(self, alert: Dict):
+        """Envoie l'alerte par email"""
+        body = "\n        Alerte de Trading - Bandes de Bollinger\n" + self.format_alert(alert)
+        self._deliver(f"Trading Alert - Bande {alert['type'].upper()}", body)
+
+    def send_batch(self, alerts: List[Dict]):
+        """Envoie plusieurs alertes dans un seul email"""
+        body = (f"\n        {len(alerts)} alertes de Trading - Bandes de Bollinger\n"
+                + "".join(self.format_alert(alert) for alert in alerts))
+        self._deliver(f"Trading Alert - {len(alerts)} alertes", body)
+
+    def _disconnect(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                self._server.close()
+            self._server = None
+
+    def close(self):
+        """Ferme la connexion SMTP"""
+        self._disconnect()
+
+
+class _ChannelWorker:
+    """File d'attente bornée et thread d'envoi dédiés à un notifier"""
+
+    def __init__(self, notifier, queue_size: int, batch_window: float):
+        self.notifier = notifier
+        self.name = type(notifier).__name__
+        self.batch_window = batch_window
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.sent = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name=f"notify-{self.name}", daemon=True)
+        self._thread.start()
+
+    def put(self, alert: Optional[Dict]) -> bool:
+        """Ajoute une alerte sans bloquer ; False si la file est pleine"""
+        try:
+            self.queue.put_nowait(alert)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _collect(self, first: Dict):
+        """
+        Regroupe les alertes arrivées pendant `batch_window` (même rafale)
+
+        Returns:
+            Tuple (alertes, arrêt demandé)
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                alert = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+            if alert is None:
+                self.queue.task_done()
+                return batch, True
+            batch.append(alert)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            alert = self.queue.get()
+            if alert is None:
+                self.queue.task_done()
+                return
+
+            batch, stopping = self._collect(alert)
+            try:
+                if len(batch) > 1 and hasattr(self.notifier, 'send_batch'):
+                    self.notifier.send_batch(batch)
+                else:
+                    for item in batch:
+                        self.notifier.send(item)
+                self.sent += len(batch)
+                self.batches += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Erreur avec notifier {self.name}: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def stop(self, timeout: Optional[float] = None):
+        while True:
+            try:
+                self.queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                if not self._thread.is_alive():
+                    return
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'sent': self.sent,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'queued': self.queue.qsize(),
+        }
 
 
 class NotificationManager:
     """Gère tous les types de notifications"""
 
-    def __init__(self):
+    def __init__(self, background: bool = True, queue_size: int = 1000, batch_window: float = 0.5):
+        """
+        Initialise le gestionnaire
+
+        Args:
+            background: Envoi dans un thread par notifier (la boucle de prix
+                n'attend jamais un serveur SMTP ou Telegram lent)
+            queue_size: Nombre maximum d'alertes en attente par notifier ;
+                au-delà les nouvelles alertes sont abandonnées et comptées
+            batch_window: Durée en secondes pendant laquelle les alertes d'une
+                même rafale sont regroupées en un seul message par canal
+        """
         self.notifiers = []
+        self.background = background
+        self.queue_size = queue_size
+        self.batch_window = batch_window
+        self._workers: List[_ChannelWorker] = []
 
     def add_notifier(self, notifier):
         """Ajoute un type de notification"""
         self.notifiers.append(notifier)
+        if self.background:
+            self._workers.append(_ChannelWorker(notifier, self.queue_size, self.batch_window))
 
     def send_alert(self, alert: Dict):
         """Envoie l'alerte à tous les notifiers configurés"""
+        if self.background:
+            for worker in self._workers:
+                if not worker.put(alert):
+                    print(f"⚠️ File {worker.name} pleine, alerte abandonnée")
+            return
+
         for notifier in self.notifiers:
             try:
                 notifier.send(alert)
             except Exception as e:
                 print(f"Erreur avec notifier {type(notifier).__name__}: {e}")
+
+    def flush(self):
+        """Attend que toutes les alertes en file aient été envoyées"""
+        for worker in self._workers:
+            worker.queue.join()
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Envoie les alertes restantes, arrête les threads et ferme les connexions"""
+        for worker in self._workers:
+            worker.stop(timeout)
+        self._workers = []
+        for notifier in self.notifiers:
+            if hasattr(notifier, 'close'):
+                try:
+                    notifier.close()
+                except Exception as e:
+                    print(f"Erreur à la fermeture de {type(notifier).__name__}: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Compteurs par notifier : envoyées, messages, abandonnées, erreurs, en file"""
+        return {worker.name: worker.stats() for worker in self._workers}
@@ -0,0 +1,56 @@
+"""
+Registre des fetchers et notifiers, importés seulement quand la configuration les choisit
+
+python-binance (et ses dépendances asyncio), twelvedata, aiohttp ou requests
+coûtent plusieurs centaines de millisecondes à importer. `main.py` ne connaît
+que les noms ci-dessous : seul le module du fetcher de la `data_source`
+configurée et ceux des canaux d'alerte activés sont chargés.
+"""
+import importlib
+from typing import Dict
+
+# Nom -> "module:attribut", résolu au premier `load`
+FETCHERS: Dict[str, str] = {
+    'binance': 'src.data_fetcher:DataFetcher',
+    'twelvedata': 'src.twelve_data_fetcher:TwelveDataFetcher',
+    'binance_async': 'src.async_fetchers:AsyncBinanceFetcher',
+    'twelvedata_async': 'src.async_fetchers:AsyncTwelveDataFetcher',
+}
+
+NOTIFIERS: Dict[str, str] = {
+    'console': 'src.notifiers:ConsoleNotifier',
+    'telegram': 'src.notifiers:TelegramNotifier',
+    'email': 'src.notifiers:EmailNotifier',
+}
+
+_REGISTRIES = {'fetcher': FETCHERS, 'notifier': NOTIFIERS}
+
+
+def register(kind: str, name: str, target: str):
+    """
+    Ajoute un plugin (ex: un notifier maison) sans l'importer
+
+    Args:
+        kind: 'fetcher' ou 'notifier'
+        name: Nom utilisé dans la configuration
+        target: "module:attribut" importé au premier `load`
+    """
+    _REGISTRIES[kind][name] = target
+
+
+def load(kind: str, name: str):
+    """
+    Importe et renvoie la classe du plugin `name`
+
+    Args:
+        kind: 'fetcher' ou 'notifier'
+        name: Nom du plugin (ex: 'binance', 'telegram')
+
+    Returns:
+        Classe du plugin
+    """
+    registry = _REGISTRIES[kind]
+    if name not in registry:
+        raise ValueError(f"{kind} inconnu: {name} (disponibles: {', '.join(sorted(registry))})")
+    module, attribute = registry[name].split(':')
+    return getattr(importlib.import_module(module), attribute)
@@ -0,0 +1,285 @@
+"""
+Module de limitation du débit des requêtes API (Binance / Twelve Data)
+
+Un seau à jetons partagé par toutes les requêtes d'une source :
+- le poids consommé est recalé sur l'en-tête renvoyé par le serveur
+  (`x-mbx-used-weight-1m` chez Binance), qui compte aussi les requêtes des
+  autres processus utilisant la même IP ; le poids des requêtes locales
+  encore en vol, pas forcément compté par le serveur, reste déduit ;
+- les requêtes prioritaires (prix courant) passent avant les rattrapages
+  d'historique, qui ne peuvent pas entamer une réserve de jetons ;
+- les requêtes identiques en cours sont fusionnées (un seul appel réseau) ;
+- les réponses 429/418 suspendent toutes les requêtes (Retry-After ou
+  backoff exponentiel) puis la requête est rejouée.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Optional
+
+# Priorités (plus petit = plus prioritaire)
+PRIORITY_HIGH = 0      # Prix courant (ticker)
+PRIORITY_NORMAL = 1    # Bougies du cycle de surveillance
+PRIORITY_LOW = 2       # Rattrapage / téléchargement d'historique
+
+# En-tête Binance : poids utilisé sur la fenêtre glissante d'une minute
+BINANCE_USED_WEIGHT_HEADER = 'x-mbx-used-weight-1m'
+
+
+class RateLimiter:
+    """Seau à jetons thread-safe avec priorités, fusion des requêtes et backoff"""
+
+    def __init__(self, capacity: int, period: float = 60.0, reserve: float = 0.1,
+                 max_retries: int = 3, base_backoff: float = 1.0, max_backoff: float = 60.0):
+        """
+        Initialise le limiteur
+
+        Args:
+            capacity: Poids (ou crédits) autorisé par période
+            period: Durée de la période en secondes
+            reserve: Fraction de la capacité réservée aux requêtes PRIORITY_HIGH
+            max_retries: Nombre de nouvelles tentatives après un 429/418
+            base_backoff: Premier délai d'attente si le serveur n'indique pas Retry-After
+            max_backoff: Délai d'attente maximum
+        """
+        if capacity <= 0 or period <= 0:
+            raise ValueError("capacity et period doivent être > 0")
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self.reserve = capacity * reserve
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        # Poids des requêtes envoyées dont la réponse n'est pas encore arrivée
+        self._sending = 0.0
+        self._waiting = {PRIORITY_HIGH: 0, PRIORITY_NORMAL: 0, PRIORITY_LOW: 0}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._condition = threading.Condition()
+
+        # Statistiques
+        self.requests = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+
+    @property
+    def tokens(self) -> float:
+        """Jetons disponibles actuellement"""
+        with self._condition:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self, weight: float, priority: int) -> float:
+        """Prend `weight` jetons si possible ; sinon renvoie le délai d'attente estimé"""
+        now = time.monotonic()
+        if now < self._blocked_until:
+            return self._blocked_until - now
+
+        self._refill(now)
+        weight = min(weight, self.capacity)
+        if any(self._waiting[p] for p in self._waiting if p < priority):
+            # Une requête plus prioritaire attend : on lui laisse les prochains jetons
+            return max(weight / self.rate, 0.01)
+
+        floor = self.reserve if priority > PRIORITY_HIGH else 0.0
+        missing = weight + floor - self._tokens
+        if missing <= 0:
+            self._tokens -= weight
+            self.requests += 1
+            return 0.0
+        return missing / self.rate
+
+    def acquire(self, weight: float = 1, priority: int = PRIORITY_NORMAL):
+        """
+        Bloque jusqu'à ce que `weight` jetons soient disponibles
+
+        Args:
+            weight: Poids de la requête
+            priority: PRIORITY_HIGH, PRIORITY_NORMAL ou PRIORITY_LOW
+        """
+        start = time.monotonic()
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    delay = self._try_take(weight, priority)
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+            finally:
+                self._waiting[priority] -= 1
+                self.wait_time += time.monotonic() - start
+                self._condition.notify_all()
+
+    async def acquire_async(self, weight: float = 1, priority: int = PRIORITY_NORMAL):
+        """Équivalent de `acquire` qui n'occupe pas la boucle asyncio pendant l'attente"""
+        start = time.monotonic()
+        with self._condition:
+            self._waiting[priority] += 1
+        try:
+            while True:
+                with self._condition:
+                    delay = self._try_take(weight, priority)
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            with self._condition:
+                self._waiting[priority] -= 1
+                self.wait_time += time.monotonic() - start
+                self._condition.notify_all()
+
+    @contextmanager
+    def sending(self, weight: float):
+        """Compte `weight` comme en vol pendant l'envoi d'une requête (voir `update_used`)"""
+        with self._condition:
+            self._sending += weight
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._sending -= weight
+
+    def update_used(self, used: float, weight: float = 0):
+        """
+        Recale les jetons sur le poids déjà consommé selon le serveur
+
+        Les autres requêtes en vol ont déjà pris leurs jetons mais le serveur
+        ne les a peut-être pas encore comptées : leur poids reste déduit.
+
+        Args:
+            used: Poids utilisé sur la période en cours (toutes sources confondues)
+            weight: Poids de la requête dont la réponse porte `used` (déjà compté)
+        """
+        with self._condition:
+            self._refill(time.monotonic())
+            pending = max(0.0, self._sending - weight)
+            self._tokens = max(0.0, min(self.capacity, self.capacity - used - pending))
+
+    def update_from_headers(self, headers, header: str = BINANCE_USED_WEIGHT_HEADER,
+                            weight: float = 0):
+        """Recale les jetons depuis l'en-tête de poids utilisé d'une réponse HTTP"""
+        if not headers:
+            return
+        value = headers.get(header)
+        if value is None:
+            # Les en-têtes aiohttp/requests sont insensibles à la casse, pas un dict simple
+            value = {k.lower(): v for k, v in dict(headers).items()}.get(header.lower())
+        if value is not None:
+            self.update_used(float(value), weight)
+
+    def backoff(self, seconds: float):
+        """Suspend toutes les requêtes pendant `seconds` secondes"""
+        with self._condition:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._condition.notify_all()
+
+    def retry_delay(self, hint: float, attempt: int) -> float:
+        """Délai avant la tentative `attempt` (Retry-After du serveur ou backoff exponentiel)"""
+        if hint > 0:
+            # Délai imposé par le serveur (ban 418 compris) : toujours respecté en entier
+            return hint
+        return min(self.max_backoff, self.base_backoff * 2 ** attempt)
+
+    def call(self, function: Callable, key: Optional[Hashable] = None, weight: float = 1,
+             priority: int = PRIORITY_NORMAL,
+             retry_after: Optional[Callable[[Exception], Optional[float]]] = None):
+        """
+        Exécute une requête en respectant la limite de débit
+
+        Args:
+            function: Appel réseau sans argument
+            key: Identifiant de la requête ; les appels simultanés de même clé
+                partagent le même résultat (None = pas de fusion)
+            weight: Poids de la requête
+            priority: PRIORITY_HIGH, PRIORITY_NORMAL ou PRIORITY_LOW
+            retry_after: Analyse une exception : None si ce n'est pas une
+                limite de débit, sinon le délai indiqué par le serveur (0 si inconnu)
+
+        Returns:
+            Le résultat de `function`
+        """
+        if key is None:
+            return self._call_with_retries(function, weight, priority, retry_after)
+
+        with self._condition:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = Future()
+                self._inflight[key] = flight
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return flight.result()
+
+        try:
+            result = self._call_with_retries(function, weight, priority, retry_after)
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._condition:
+                self._inflight.pop(key, None)
+
+    def _call_with_retries(self, function: Callable, weight: float, priority: int,
+                           retry_after: Optional[Callable[[Exception], Optional[float]]]):
+        attempt = 0
+        while True:
+            self.acquire(weight, priority)
+            try:
+                with self.sending(weight):
+                    return function()
+            except Exception as e:
+                hint = retry_after(e) if retry_after is not None else None
+                if hint is None or attempt >= self.max_retries:
+                    raise
+                self.throttled += 1
+                self.backoff(self.retry_delay(hint, attempt))
+                attempt += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Statistiques d'utilisation"""
+        return {
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'throttled': self.throttled,
+            'wait_time': round(self.wait_time, 3),
+            'tokens': round(self.tokens, 1),
+        }
+
+
+def binance_retry_after(error: Exception) -> Optional[float]:
+    """Délai imposé par Binance pour une erreur 429 (trop de requêtes) ou 418 (IP bannie)"""
+    status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+    if status not in (418, 429):
+        return None
+    headers = (getattr(error, 'headers', None)
+               or getattr(getattr(error, 'response', None), 'headers', None) or {})
+    value = headers.get('Retry-After') or headers.get('retry-after')
+    return float(value) if value else 0.0
+
+
+def twelvedata_retry_after(error: Exception) -> Optional[float]:
+    """Délai jusqu'à la minute suivante quand les crédits Twelve Data sont épuisés"""
+    message = str(error).lower()
+    if getattr(error, 'status', None) != 429 and 'api credits' not in message:
+        return None
+    # Les crédits sont remis à zéro au début de chaque minute
+    return 60 - time.time() % 60 + 1
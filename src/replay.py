@@ -0,0 +1,283 @@
+"""
+Module d'enregistrement et de rejeu des réponses des API de marché
+
+`RecordingClient` enveloppe le client Binance ou Twelve Data d'un fetcher et
+écrit chaque réponse brute (bougies, tickers, quotes), horodatée, dans un
+journal binaire compressé. `ReplaySession` relit ce journal et fournit un
+client de remplacement qui renvoie les mêmes réponses dans le même ordre,
+sans réseau, en temps réel (1x), N fois plus vite ou à vitesse maximale.
+
+Le journal est une suite d'enregistrements pickle dans un flux gzip : à ne
+rejouer que depuis une source de confiance (ses propres enregistrements).
+"""
+import gzip
+import pickle
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+# Méthodes des clients dont la réponse est enregistrée
+BINANCE_METHODS = ('get_klines', 'get_symbol_ticker')
+# Méthodes Twelve Data : la requête HTTP part dans as_pandas / as_json
+TWELVEDATA_METHODS = ('time_series', 'quote')
+BUILDER_METHODS = ('as_pandas', 'as_json')
+
+Params = Tuple[Tuple[str, object], ...]
+
+
+def _params_key(params: Dict) -> Params:
+    return tuple(sorted(params.items()))
+
+
+class ReplayError(Exception):
+    """Erreur enregistrée pendant la capture, relevée à l'identique au rejeu"""
+
+    def __init__(self, message: str, error_type: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.error_type = error_type
+        self.status_code = status_code
+
+
+class ReplayExhausted(Exception):
+    """Plus aucune réponse enregistrée pour cette requête"""
+
+
+class MarketRecorder:
+    """Écrit les réponses horodatées dans le journal binaire (thread-safe)"""
+
+    def __init__(self, path: str):
+        """
+        Ouvre le journal en ajout
+
+        Args:
+            path: Chemin du fichier (compressé gzip)
+        """
+        self.path = path
+        self.records = 0
+        self._file = gzip.open(path, 'ab')
+        self._lock = threading.Lock()
+
+    def record(self, method: str, params: Dict, result=None, error: Optional[Exception] = None):
+        """Enregistre une réponse ou une erreur"""
+        if error is not None:
+            status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+            payload = ('error', (str(error), type(error).__name__, status))
+        else:
+            payload = ('ok', result)
+        record = (time.time(), method, _params_key(params)) + payload
+        with self._lock:
+            pickle.dump(record, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_records(path: str) -> Iterator[tuple]:
+    """Parcourt les enregistrements (timestamp, méthode, paramètres, statut, contenu)"""
+    with gzip.open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+class _RecordingBuilder:
+    """Requête Twelve Data différée : la réponse est enregistrée à son exécution"""
+
+    def __init__(self, builder, method: str, params: Dict, recorder: MarketRecorder):
+        self._builder = builder
+        self._method = method
+        self._params = params
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attribute = getattr(self._builder, name)
+        if name not in BUILDER_METHODS:
+            return attribute
+
+        def call(*args, **kwargs):
+            method = f"{self._method}.{name}"
+            try:
+                result = attribute(*args, **kwargs)
+            except Exception as e:
+                self._recorder.record(method, self._params, error=e)
+                raise
+            self._recorder.record(method, self._params, result)
+            return result
+        return call
+
+
+class RecordingClient:
+    """Enveloppe un client Binance ou Twelve Data et enregistre ses réponses"""
+
+    def __init__(self, client, recorder: MarketRecorder):
+        self._client = client
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name in TWELVEDATA_METHODS:
+            return lambda **params: _RecordingBuilder(attribute(**params), name, params, self._recorder)
+        if name not in BINANCE_METHODS:
+            # Attributs non enregistrés (ex: `response` pour les en-têtes de poids)
+            return attribute
+
+        def call(**params):
+            try:
+                result = attribute(**params)
+            except Exception as e:
+                self._recorder.record(name, params, error=e)
+                raise
+            self._recorder.record(name, params, result)
+            return result
+        return call
+
+
+def record_fetcher(fetcher, recorder: MarketRecorder):
+    """Enregistre toutes les réponses d'un DataFetcher ou TwelveDataFetcher"""
+    fetcher.client = RecordingClient(fetcher.client, recorder)
+    return fetcher
+
+
+class ReplayClock:
+    """
+    Horloge virtuelle du rejeu
+
+    Elle part de l'heure du premier enregistrement, avance avec les attentes
+    de la boucle (`sleep`) et se recale sur l'heure de chaque réponse rejouée.
+    """
+
+    def __init__(self, start: float, speed: float = 1.0):
+        """
+        Args:
+            start: Heure de départ (epoch en secondes)
+            speed: 1 = temps réel, N = N fois plus vite, 0 = vitesse maximale
+        """
+        self.speed = speed
+        self._now = start
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        with self._lock:
+            return self._now
+
+    def now(self) -> datetime:
+        """Équivalent de `datetime.now()` dans le temps rejoué"""
+        return datetime.fromtimestamp(self.time())
+
+    def advance_to(self, timestamp: float):
+        with self._lock:
+            self._now = max(self._now, timestamp)
+
+    def sleep(self, seconds: float):
+        """Attend `seconds` secondes de temps rejoué"""
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+        with self._lock:
+            self._now += seconds
+
+
+class _ReplayBuilder:
+    def __init__(self, session: 'ReplaySession', method: str, params: Dict):
+        self._session = session
+        self._method = method
+        self._params = params
+
+    def as_pandas(self):
+        return self._session.next_response(f"{self._method}.as_pandas", self._params)
+
+    def as_json(self):
+        return self._session.next_response(f"{self._method}.as_json", self._params)
+
+
+class ReplayClient:
+    """Client de remplacement (Binance ou Twelve Data) alimenté par le journal"""
+
+    # Pas d'en-têtes HTTP au rejeu : le limiteur de débit n'est pas recalé
+    response = None
+
+    def __init__(self, session: 'ReplaySession'):
+        self._session = session
+
+    def __getattr__(self, name):
+        if name in BINANCE_METHODS:
+            return lambda **params: self._session.next_response(name, params)
+        if name in TWELVEDATA_METHODS:
+            return lambda **params: _ReplayBuilder(self._session, name, params)
+        raise AttributeError(name)
+
+
+class ReplaySession:
+    """Réponses enregistrées, rejouées dans l'ordre pour chaque requête identique"""
+
+    def __init__(self, path: str, speed: float = 1.0):
+        """
+        Charge le journal
+
+        Args:
+            path: Journal écrit par `MarketRecorder`
+            speed: 1 = temps réel, N = N fois plus vite, 0 = vitesse maximale
+        """
+        self.path = path
+        self._records = list(read_records(path))
+        self._used = [False] * len(self._records)
+        # Index des enregistrements par requête exacte, et repli par (méthode,
+        # symbole, intervalle) quand les paramètres de temps diffèrent
+        self._exact: Dict[Tuple[str, Params], Deque[int]] = {}
+        self._loose: Dict[Tuple[str, object, object], Deque[int]] = {}
+        for index, (_, method, params, _, _) in enumerate(self._records):
+            self._exact.setdefault((method, params), deque()).append(index)
+            self._loose.setdefault(self._loose_key(method, dict(params)), deque()).append(index)
+        self._lock = threading.Lock()
+        self.replayed = 0
+        self.exhausted = False
+
+        start = self._records[0][0] if self._records else time.time()
+        self.clock = ReplayClock(start, speed)
+
+    @staticmethod
+    def _loose_key(method: str, params: Dict) -> Tuple[str, object, object]:
+        return method, params.get('symbol'), params.get('interval')
+
+    @property
+    def total(self) -> int:
+        return len(self._records)
+
+    def client(self) -> ReplayClient:
+        """Client à passer à DataFetcher / TwelveDataFetcher (`client=`)"""
+        return ReplayClient(self)
+
+    def _pop(self, queue: Optional[Deque[int]]) -> Optional[int]:
+        while queue:
+            index = queue.popleft()
+            if not self._used[index]:
+                return index
+        return None
+
+    def next_response(self, method: str, params: Dict):
+        """Réponse suivante pour cette requête (ou erreur enregistrée)"""
+        with self._lock:
+            index = self._pop(self._exact.get((method, _params_key(params))))
+            if index is None:
+                index = self._pop(self._loose.get(self._loose_key(method, params)))
+            if index is None:
+                self.exhausted = True
+                raise ReplayExhausted(f"Aucune réponse enregistrée pour {method} {params}")
+            self._used[index] = True
+            self.replayed += 1
+
+        timestamp, _, _, status, payload = self._records[index]
+        self.clock.advance_to(timestamp)
+        if status == 'error':
+            raise ReplayError(*payload)
+        return payload
+
+    @property
+    def finished(self) -> bool:
+        """True quand toutes les réponses ont été rejouées (ou qu'une requête n'a plus de réponse)"""
+        return self.exhausted or self.replayed >= self.total
@@ -0,0 +1,117 @@
+"""
+Module de construction des unités de temps supérieures à partir d'un seul flux
+
+Une seule série de bougies de base (ex: 1m) est consommée ; les bougies 5m,
+15m, 1h, 4h... sont construites en mémoire au fil des mises à jour, y compris
+les mises à jour successives de la bougie de base encore ouverte. Toutes les
+unités de temps restent ainsi alignées sur le même tick.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.intervals import interval_start, interval_to_milliseconds
+
+
+class Bar:
+    """Bougie OHLC d'une unité de temps (ouverte ou clôturée)"""
+
+    __slots__ = ('open_time', 'open', 'high', 'low', 'close')
+
+    def __init__(self, open_time: int, open: float, high: float, low: float, close: float):
+        self.open_time = open_time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+
+    def __repr__(self) -> str:
+        return (f"Bar({self.open_time}, o={self.open}, h={self.high}, "
+                f"l={self.low}, c={self.close})")
+
+
+class _Bucket:
+    """Bougie en construction : ouverture et extrêmes des bougies de base déjà clôturées"""
+
+    __slots__ = ('open_time', 'open', 'high', 'low')
+
+    def __init__(self, open_time: int, open: float):
+        self.open_time = open_time
+        self.open = open
+        self.high = float('-inf')
+        self.low = float('inf')
+
+
+class TimeframeResampler:
+    """Construit incrémentalement les bougies de plusieurs unités de temps depuis la plus fine"""
+
+    def __init__(self, base_interval: str, intervals: Iterable[str]):
+        """
+        Initialise le rééchantillonnage
+
+        Args:
+            base_interval: Intervalle des bougies consommées (ex: '1m')
+            intervals: Intervalles à construire, multiples de `base_interval`
+                (l'intervalle de base peut en faire partie)
+        """
+        base_ms = interval_to_milliseconds(base_interval)
+        self.base_interval = base_interval
+        self.intervals = sorted(set(intervals) | {base_interval}, key=interval_to_milliseconds)
+        for interval in self.intervals:
+            if interval_to_milliseconds(interval) % base_ms:
+                raise ValueError(f"{interval} n'est pas un multiple de {base_interval}")
+
+        self.last_open_time: Optional[int] = None
+        self._current: Optional[Tuple[float, float]] = None
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def update(self, open_time: int, open: float, high: float, low: float,
+               close: float) -> List[Tuple[str, Bar]]:
+        """
+        Intègre une bougie de base (nouvelle ou mise à jour de la bougie ouverte)
+
+        Args:
+            open_time: Heure d'ouverture de la bougie de base en millisecondes
+            open, high, low, close: Prix de la bougie de base
+
+        Returns:
+            Liste de (intervalle, bougie courante) pour chaque unité de temps,
+            vide si la bougie est plus ancienne que la dernière reçue
+        """
+        if self.last_open_time is not None and open_time < self.last_open_time:
+            return []
+
+        if self.last_open_time is not None and open_time > self.last_open_time:
+            # La bougie de base précédente est clôturée : ses extrêmes sont acquis
+            previous_high, previous_low = self._current
+            for bucket in self._buckets.values():
+                bucket.high = max(bucket.high, previous_high)
+                bucket.low = min(bucket.low, previous_low)
+
+        self.last_open_time = open_time
+        self._current = (high, low)
+
+        bars = []
+        for interval in self.intervals:
+            start = interval_start(open_time, interval)
+            bucket = self._buckets.get(interval)
+            if bucket is None or bucket.open_time != start:
+                bucket = self._buckets[interval] = _Bucket(start, open)
+            bars.append((interval, Bar(
+                start, bucket.open, max(bucket.high, high), min(bucket.low, low), close
+            )))
+        return bars
+
+    def update_price(self, price: float) -> List[Tuple[str, Bar]]:
+        """
+        Intègre un nouveau prix échangé dans la bougie de base encore ouverte
+
+        Returns:
+            Liste de (intervalle, bougie courante), vide avant la première bougie
+        """
+        if self.last_open_time is None:
+            return []
+        high, low = self._current
+        return self.update(self.last_open_time, price, max(high, price), min(low, price), price)
+
+    def span(self, interval: str) -> int:
+        """Nombre de bougies de base dans une bougie `interval`"""
+        return interval_to_milliseconds(interval) // interval_to_milliseconds(self.base_interval)
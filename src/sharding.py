@@ -0,0 +1,269 @@
+"""
+Module de déploiement multi-processus (un worker par cœur)
+
+Les symboles sont répartis entre les workers par hachage cohérent : ajouter
+ou retirer un worker ne déplace qu'environ 1/N des symboles, les autres
+gardent leur cache et leur état. Toutes les surveillances d'un symbole sont
+dans le même worker, qui calcule ses bandes dans son propre interpréteur
+(pas de GIL partagé).
+
+Les alertes remontent par une file locale vers un unique `AlertDispatcher`
+dans le processus superviseur : journal et notifications restent centralisés,
+et une alerte déjà envoyée par un autre worker (ou par l'instance précédente
+d'un worker redémarré) pendant le cooldown est écartée.
+"""
+import bisect
+import hashlib
+import multiprocessing
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from src.alert_journal import AlertJournal
+from src.alert_manager import DEFAULT_COOLDOWN_SECONDS
+
+# Points par worker sur l'anneau : plus il y en a, plus la répartition est régulière
+DEFAULT_REPLICAS = 100
+
+
+def _hash(key: str) -> int:
+    """Hachage stable entre processus et exécutions (contrairement à `hash`)"""
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Anneau de hachage cohérent : associe chaque clé (symbole) à un nœud (worker)"""
+
+    def __init__(self, nodes: Iterable[Hashable] = (), replicas: int = DEFAULT_REPLICAS):
+        """
+        Construit l'anneau
+
+        Args:
+            nodes: Nœuds initiaux
+            replicas: Nombre de points virtuels par nœud
+        """
+        self.replicas = replicas
+        self.nodes: List[Hashable] = []
+        self._points: List[int] = []
+        self._owners: List[Hashable] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: Hashable):
+        """Ajoute un nœud (seules les clés qui lui reviennent changent de nœud)"""
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: Hashable):
+        """Retire un nœud (ses clés passent aux nœuds suivants sur l'anneau)"""
+        self.nodes.remove(node)
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def node_for(self, key: str) -> Hashable:
+        """Nœud responsable de `key`"""
+        if not self._points:
+            raise LookupError("Anneau vide")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+    def partition(self, keys: Iterable[str]) -> Dict[Hashable, List[str]]:
+        """Répartit les clés : {nœud: [clés]} (tous les nœuds présents, même vides)"""
+        shards: Dict[Hashable, List[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            shards[self.node_for(key)].append(key)
+        return shards
+
+
+class ShardAlertSender:
+    """Côté worker : remplace le NotificationManager et envoie les alertes au superviseur"""
+
+    def __init__(self, alert_queue, worker_id: str):
+        self.alert_queue = alert_queue
+        self.worker_id = worker_id
+
+    def send_alert(self, alert: Dict):
+        self.alert_queue.put((self.worker_id, alert))
+
+    def flush(self):
+        pass
+
+    def close(self, timeout: Optional[float] = None):
+        pass
+
+
+class AlertDispatcher:
+    """Côté superviseur : reçoit les alertes de tous les workers et les notifie une seule fois"""
+
+    def __init__(self, notification_manager, alert_queue,
+                 cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
+                 journal: Optional[AlertJournal] = None):
+        """
+        Initialise le répartiteur
+
+        Args:
+            notification_manager: NotificationManager partagé par tous les workers
+            alert_queue: File où les workers déposent (worker_id, alerte)
+            cooldown_seconds: Délai pendant lequel une même alerte (symbole,
+                intervalle, type) venant d'un autre worker est écartée
+            journal: Journal persistant où chaque alerte retenue est écrite
+        """
+        self.notification_manager = notification_manager
+        self.alert_queue = alert_queue
+        self.cooldown_seconds = cooldown_seconds
+        self.journal = journal
+        self.dispatched = 0
+        self.duplicates = 0
+        # (symbole, intervalle, type) -> (worker, heure de la dernière alerte)
+        self._last: Dict[Tuple, Tuple[str, datetime]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def dispatch(self, worker_id: str, alert: Dict) -> bool:
+        """
+        Notifie une alerte sauf si un autre worker vient d'envoyer la même
+
+        Le cooldown de chaque surveillance est déjà appliqué dans son worker :
+        les alertes successives d'un même worker sont toujours transmises.
+
+        Returns:
+            True si l'alerte a été transmise
+        """
+        key = (alert.get('symbol'), alert.get('interval'), alert['type'])
+        timestamp = datetime.fromisoformat(alert['timestamp'])
+        previous = self._last.get(key)
+        if previous is not None and previous[0] != worker_id:
+            if (timestamp - previous[1]).total_seconds() < self.cooldown_seconds:
+                self.duplicates += 1
+                return False
+
+        self._last[key] = (worker_id, timestamp)
+        self.dispatched += 1
+        if self.journal is not None:
+            self.journal.append(alert)
+        self.notification_manager.send_alert(alert)
+        return True
+
+    def start(self):
+        """Traite la file dans un thread dédié"""
+        self._thread = threading.Thread(target=self._run, name='alert-dispatcher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            message = self.alert_queue.get()
+            if message is None:
+                return
+            try:
+                self.dispatch(*message)
+            except Exception as e:
+                print(f"⚠️ Alerte non transmise: {e}")
+
+    def stop(self, timeout: Optional[float] = 10.0):
+        """Transmet les alertes encore en file puis arrête le thread"""
+        if self._thread is None:
+            return
+        self.alert_queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+class ShardSupervisor:
+    """Lance un worker par shard, redémarre ceux qui s'arrêtent et centralise les alertes"""
+
+    def __init__(self, symbols: Sequence[str], workers: int, target: Callable,
+                 args: tuple = (), notification_manager=None,
+                 journal: Optional[AlertJournal] = None,
+                 replicas: int = DEFAULT_REPLICAS,
+                 cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS):
+        """
+        Initialise le superviseur
+
+        Args:
+            symbols: Symboles de la watchlist
+            workers: Nombre de processus
+            target: Fonction du worker, appelée comme
+                target(symboles, ShardAlertSender, *args) ; doit être
+                importable (processus lancés en mode 'spawn')
+            args: Arguments supplémentaires de `target` (picklables)
+            notification_manager: Destination des alertes de tous les workers
+            journal: Journal des alertes (écrit uniquement par le superviseur)
+            replicas: Points virtuels par worker sur l'anneau
+            cooldown_seconds: Fenêtre de dédoublonnage entre workers
+        """
+        self.target = target
+        self.args = args
+        self.ring = HashRing(range(max(1, workers)), replicas)
+        self.assignments = self.ring.partition(symbols)
+        self.restarts = 0
+
+        self._context = multiprocessing.get_context('spawn')
+        self.alert_queue = self._context.Queue()
+        self.dispatcher = AlertDispatcher(notification_manager, self.alert_queue,
+                                          cooldown_seconds, journal)
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._generations: Dict[int, int] = {}
+
+    def _spawn(self, shard: int):
+        generation = self._generations.get(shard, -1) + 1
+        self._generations[shard] = generation
+        sender = ShardAlertSender(self.alert_queue, f"{shard}:{generation}")
+        process = self._context.Process(
+            target=self.target,
+            args=(self.assignments[shard], sender) + tuple(self.args),
+            name=f"shard-{shard}",
+            daemon=True
+        )
+        process.start()
+        self._processes[shard] = process
+
+    def start(self):
+        """Démarre le répartiteur et un processus par shard non vide"""
+        self.dispatcher.start()
+        for shard, symbols in self.assignments.items():
+            if symbols:
+                self._spawn(shard)
+
+    def check(self) -> int:
+        """
+        Redémarre les workers arrêtés (même shard, nouvelle génération)
+
+        Returns:
+            Nombre de workers redémarrés
+        """
+        restarted = 0
+        for shard, process in list(self._processes.items()):
+            if not process.is_alive():
+                print(f"⚠️ Worker {shard} arrêté (code {process.exitcode}), redémarrage")
+                self._spawn(shard)
+                restarted += 1
+        self.restarts += restarted
+        return restarted
+
+    def run(self, check_interval: float = 5.0):
+        """Surveille les workers jusqu'à l'interruption (Ctrl+C)"""
+        self.start()
+        try:
+            while True:
+                time.sleep(check_interval)
+                self.check()
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 5.0):
+        """Arrête les workers puis transmet les dernières alertes"""
+        deadline = time.monotonic() + timeout
+        for process in self._processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+        self._processes.clear()
+        self.dispatcher.stop()
@@ -0,0 +1,146 @@
+"""
+Module de recherche de paramètres (grid search) en parallèle
+
+Évalue une grille (period, multiplier, proximity_percent, cooldown) sur
+plusieurs symboles avec un ProcessPoolExecutor. Les tableaux de bougies sont
+écrits une seule fois sur disque et ouverts en memmap par chaque worker :
+ils sont partagés via le cache de pages du système au lieu d'être picklés
+vers chaque processus.
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import apply_cooldown, proximity_masks
+from src.bollinger_bands import bollinger_arrays
+
+# Tableaux (open_times, close) ouverts en memmap dans chaque worker
+_ARRAYS: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _init_worker(paths: Dict[str, Tuple[str, str]]):
+    """Ouvre les tableaux partagés (sans copie) au démarrage du worker"""
+    _ARRAYS.clear()
+    for symbol, (times_path, close_path) in paths.items():
+        _ARRAYS[symbol] = (
+            np.load(times_path, mmap_mode='r'),
+            np.load(close_path, mmap_mode='r')
+        )
+
+
+def _forward_returns(close: np.ndarray, horizon: int) -> np.ndarray:
+    """Rendement en % entre chaque bougie et `horizon` bougies plus tard"""
+    result = np.full(len(close), np.nan)
+    if horizon < len(close):
+        result[:-horizon] = (close[horizon:] / close[:-horizon] - 1) * 100
+    return result
+
+
+def _mean(values: np.ndarray) -> float:
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if len(values) else np.nan
+
+
+def evaluate_group(symbol: str, period: int, multiplier: float,
+                   proximities: Sequence[float], cooldowns: Sequence[float],
+                   horizons: Sequence[int]) -> List[Dict]:
+    """
+    Évalue toutes les combinaisons (proximité, cooldown) pour un (symbole, period, multiplier)
+
+    Les bandes, distances et rendements sont calculés une seule fois par groupe.
+
+    Returns:
+        Une ligne de résultats par combinaison
+    """
+    open_times, close = _ARRAYS[symbol]
+    close = np.asarray(close)
+    open_times = np.asarray(open_times)
+
+    upper, _, lower = bollinger_arrays(close, period, multiplier)
+    _, _, distance_upper, distance_lower = proximity_masks(close, upper, lower, 0.0)
+    forward = {horizon: _forward_returns(close, horizon) for horizon in horizons}
+
+    rows = []
+    for proximity in proximities:
+        with np.errstate(invalid='ignore'):
+            near_upper = distance_upper <= proximity
+            near_lower = distance_lower <= proximity
+
+        for cooldown in cooldowns:
+            upper_indices = apply_cooldown(open_times, near_upper, cooldown * 1000)
+            lower_indices = apply_cooldown(open_times, near_lower, cooldown * 1000)
+            row = {
+                'symbol': symbol,
+                'period': period,
+                'multiplier': multiplier,
+                'proximity_percent': proximity,
+                'cooldown': cooldown,
+                'upper_alerts': len(upper_indices),
+                'lower_alerts': len(lower_indices),
+            }
+            for horizon in horizons:
+                upper_returns = forward[horizon][upper_indices]
+                lower_returns = forward[horizon][lower_indices]
+                row[f'upper_mean_{horizon}'] = _mean(upper_returns)
+                row[f'lower_mean_{horizon}'] = _mean(lower_returns)
+                # Retour vers la moyenne : baisse après la bande haute, hausse après la basse
+                row[f'reversion_{horizon}'] = _mean(np.concatenate((-upper_returns, lower_returns)))
+            rows.append(row)
+    return rows
+
+
+def _evaluate_task(task: Tuple) -> List[Dict]:
+    return evaluate_group(*task)
+
+
+def run_sweep(candles: Dict[str, Tuple[np.ndarray, np.ndarray]], periods: Sequence[int],
+              multipliers: Sequence[float], proximities: Sequence[float],
+              cooldowns: Sequence[float], horizons: Sequence[int] = (5,),
+              workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Évalue toute la grille de paramètres sur tous les symboles
+
+    Args:
+        candles: Dict {symbole: (open_times en ms, close)}
+        periods: Périodes à tester
+        multipliers: Multiplicateurs à tester
+        proximities: Seuils de proximité (%) à tester
+        cooldowns: Cooldowns (secondes) à tester
+        horizons: Horizons (en bougies) des rendements après alerte
+        workers: Nombre de processus (1 = dans le processus courant)
+
+    Returns:
+        DataFrame avec une ligne par (symbole, combinaison)
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [
+        (symbol, period, multiplier, tuple(proximities), tuple(cooldowns), tuple(horizons))
+        for symbol in candles
+        for period in periods
+        for multiplier in multipliers
+    ]
+
+    with tempfile.TemporaryDirectory(prefix="sweep-") as directory:
+        paths = {}
+        for index, (symbol, (open_times, close)) in enumerate(candles.items()):
+            times_path = os.path.join(directory, f"{index}_open_time.npy")
+            close_path = os.path.join(directory, f"{index}_close.npy")
+            np.save(times_path, np.asarray(open_times, dtype=np.int64))
+            np.save(close_path, np.asarray(close, dtype=np.float64))
+            paths[symbol] = (times_path, close_path)
+
+        if workers == 1:
+            _init_worker(paths)
+            results = [_evaluate_task(task) for task in tasks]
+            _ARRAYS.clear()
+        else:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(paths,)) as executor:
+                results = list(executor.map(_evaluate_task, tasks, chunksize=chunksize))
+
+    return pd.DataFrame([row for rows in results for row in rows])
@@ -1,26 +1,89 @@
 """
 Module pour récupérer les données depuis Twelve Data API (Forex/Gold)
 """
+import numpy as np
 import pandas as pd
 from twelvedata import TDClient
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+from src.candle_cache import CandleCache, dataframe_to_rows
+from src.intervals import timestamps_to_milliseconds
+from src.rate_limiter import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    RateLimiter,
+    twelvedata_retry_after
+)
+
+
+# Correspondance des intervalles Binance vers Twelve Data
+INTERVAL_MAP = {
+    '1m': '1min',
+    '5m': '5min',
+    '15m': '15min',
+    '30m': '30min',
+    '1h': '1h',
+    '4h': '4h',
+    '1d': '1day'
+}
+
+
+def values_to_dataframe(values: list) -> pd.DataFrame:
+    """
+    Convertit la liste `values` brute de /time_series en DataFrame
+
+    Args:
+        values: Chandeliers Twelve Data (du plus récent au plus ancien)
+
+    Returns:
+        DataFrame avec les données OHLCV, du plus ancien au plus récent
+    """
+    df = pd.DataFrame(values[::-1])
+    df = df.rename(columns={'datetime': 'timestamp'})
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+    # S'assurer que les colonnes sont en float
+    for column in ('open', 'high', 'low', 'close', 'volume'):
+        if column in df:
+            df[column] = df[column].astype(float)
+
+    return df
 
 
 class TwelveDataFetcher:
     """Récupère les données Forex/Gold depuis Twelve Data"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    SOURCE = 'twelvedata'
+
+    # Nombre maximum de bougies par requête Twelve Data
+    MAX_OUTPUTSIZE = 5000
+    PAGE_SIZE = MAX_OUTPUTSIZE
+
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[CandleCache] = None,
+                 client=None, rate_limiter: Optional[RateLimiter] = None):
         """
         Initialise le client Twelve Data
 
         Args:
             api_key: Clé API Twelve Data (requis - gratuit sur twelvedata.com)
+            cache: Cache local des bougies (seules les nouvelles bougies sont demandées)
+            client: Client déjà construit (remplace le client par défaut)
+            rate_limiter: Limiteur de crédits par minute partagé (None = pas de limitation)
         """
         if not api_key or api_key == "":
             # Utiliser une clé démo pour les tests
             api_key = "demo"
-        self.client = TDClient(apikey=api_key)
+        self.client = client if client is not None else TDClient(apikey=api_key)
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+
+    def _request(self, function, key: tuple, credits: int, priority: int = PRIORITY_NORMAL):
+        """Exécute un appel (1 crédit par symbole) en passant par le limiteur de crédits"""
+        if self.rate_limiter is None:
+            return function()
+        return self.rate_limiter.call(function, key=key, weight=credits, priority=priority,
+                                      retry_after=twelvedata_retry_after)
 
     def get_historical_data(self, symbol: str, interval: str, outputsize: int = 100) -> pd.DataFrame:
         """
@@ -34,28 +97,24 @@ class TwelveDataFetcher:
         Returns:
             DataFrame avec les données OHLCV
         """
-        # Convertir le format Binance vers Twelve Data
-        interval_map = {
-            '1m': '1min',
-            '5m': '5min',
-            '15m': '15min',
-            '30m': '30min',
-            '1h': '1h',
-            '4h': '4h',
-            '1d': '1day'
-        }
-
-        td_interval = interval_map.get(interval, interval)
+        if self.cache is not None:
+            return self._get_cached_data(symbol, interval, outputsize)
+        return self._fetch_data(symbol, interval, outputsize=outputsize)
 
-        # Récupération des données
-        ts = self.client.time_series(
-            symbol=symbol,
-            interval=td_interval,
-            outputsize=outputsize
+    def _fetch_data(self, symbol: str, interval: str, priority: int = PRIORITY_NORMAL,
+                    **params) -> pd.DataFrame:
+        """Appelle /time_series et normalise le DataFrame"""
+        # Convertir le format Binance vers Twelve Data
+        td_interval = INTERVAL_MAP.get(interval, interval)
+
+        # Récupération des données (la requête HTTP part dans as_pandas)
+        df = self._request(
+            lambda: self.client.time_series(symbol=symbol, interval=td_interval, **params).as_pandas(),
+            key=('time_series', symbol, td_interval) + tuple(sorted(params.items())),
+            credits=1,
+            priority=priority
         )
 
-        df = ts.as_pandas()
-
         # Renommer les colonnes pour correspondre au format attendu
         df = df.rename(columns={
             'open': 'open',
@@ -77,6 +136,52 @@ class TwelveDataFetcher:
 
         return df
 
+    def get_kline_range(self, symbol: str, interval: str, start: int, end: int) -> Dict[str, np.ndarray]:
+        """
+        Récupère une page de bougies entre deux heures d'ouverture (téléchargement d'historique)
+
+        Args:
+            symbol: Symbole (ex: XAU/USD)
+            interval: Intervalle au format Binance
+            start: Première heure d'ouverture en ms (incluse)
+            end: Dernière heure d'ouverture en ms, au plus PAGE_SIZE bougies après `start`
+
+        Returns:
+            Dict {champ: tableau} (open_time, open, high, low, close, volume)
+        """
+        df = self._fetch_data(
+            symbol,
+            interval,
+            PRIORITY_LOW,
+            start_date=pd.Timestamp(start, unit='ms').strftime('%Y-%m-%d %H:%M:%S'),
+            end_date=pd.Timestamp(end, unit='ms').strftime('%Y-%m-%d %H:%M:%S'),
+            outputsize=self.PAGE_SIZE
+        )
+        arrays = {'open_time': np.array(timestamps_to_milliseconds(df['timestamp']), dtype=np.int64)}
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            # Pas de volume sur le Forex
+            values = df[column] if column in df else np.zeros(len(df))
+            arrays[column] = np.asarray(values, dtype=np.float64)
+        return arrays
+
+    def _get_cached_data(self, symbol: str, interval: str, outputsize: int) -> pd.DataFrame:
+        """Complète le cache avec les bougies manquantes puis lit les `outputsize` dernières"""
+        if not self.cache.is_fresh(self.SOURCE, symbol, interval):
+            start = self.cache.delta_start(self.SOURCE, symbol, interval, outputsize)
+            if start is None:
+                df = self._fetch_data(symbol, interval, PRIORITY_LOW, outputsize=outputsize)
+            else:
+                # start_date est inclusif : la dernière bougie stockée est rafraîchie
+                df = self._fetch_data(
+                    symbol,
+                    interval,
+                    start_date=pd.Timestamp(start, unit='ms').strftime('%Y-%m-%d %H:%M:%S'),
+                    outputsize=self.MAX_OUTPUTSIZE
+                )
+            self.cache.upsert(self.SOURCE, symbol, interval, dataframe_to_rows(df))
+
+        return self.cache.load_dataframe(self.SOURCE, symbol, interval, outputsize)
+
     def get_current_price(self, symbol: str) -> float:
         """
         Récupère le prix actuel
@@ -87,10 +192,40 @@ class TwelveDataFetcher:
         Returns:
             Prix actuel
         """
-        quote = self.client.quote(symbol=symbol)
-        data = quote.as_json()
+        data = self._request(
+            lambda: self.client.quote(symbol=symbol).as_json(),
+            key=('quote', symbol),
+            credits=1,
+            priority=PRIORITY_HIGH
+        )
         return float(data['close'])
 
+    def get_current_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Récupère le prix actuel de plusieurs symboles en une seule requête batch
+
+        Args:
+            symbols: Liste de symboles (ex: ["XAU/USD", "EUR/USD"])
+
+        Returns:
+            Dict {symbole: prix}
+        """
+        if len(symbols) == 1:
+            return {symbols[0]: self.get_current_price(symbols[0])}
+
+        batch = ",".join(symbols)
+        data = self._request(
+            lambda: self.client.quote(symbol=batch).as_json(),
+            key=('quote', batch),
+            credits=len(symbols),
+            priority=PRIORITY_HIGH
+        )
+        return {
+            symbol: float(quote['close'])
+            for symbol, quote in data.items()
+            if isinstance(quote, dict) and 'close' in quote
+        }
+
     def get_latest_close_prices(self, symbol: str, interval: str, outputsize: int = 100) -> pd.Series:
         """
         Récupère uniquement les prix de clôture
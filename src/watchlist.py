@@ -0,0 +1,756 @@
+"""
+Module de surveillance multi-symboles (watchlist)
+"""
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.alert_journal import AlertJournal
+from src.alert_manager import DEFAULT_COOLDOWN_SECONDS, AlertManager
+from src.bollinger_bands import BollingerBands
+from src.indicators import Condition, IndicatorPipeline, build_filters
+from src.intervals import interval_to_milliseconds, timestamps_to_milliseconds
+from src.metrics import NULL_METRICS
+from src.resampler import Bar, TimeframeResampler
+
+# Champs récupérés pour une paire surveillée directement / pour l'intervalle de base
+CLOSE_FIELDS = ('open_time', 'close')
+OHLC_FIELDS = ('open_time', 'open', 'high', 'low', 'close')
+
+# Nombre maximum de bougies de base demandées en une fois en mode rééchantillonné
+MAX_RESAMPLE_FETCH = 1000
+
+# Mode événementiel : le polling accélère quand le prix est à moins de
+# ELASTIC_FACTOR x proximity_percent d'une bande (intervalle minimum sur le seuil)
+ELASTIC_FACTOR = 5.0
+
+
+class Subscription:
+    """Une surveillance (symbole, intervalle, paramètres BB) avec son propre état d'alerte"""
+
+    def __init__(self, symbol: str, interval: str, period: int = 20,
+                 multiplier: float = 2.0, proximity_percent: float = 0.5,
+                 journal: Optional[AlertJournal] = None,
+                 indicators: Optional[IndicatorPipeline] = None,
+                 filters: Optional[Dict[str, Condition]] = None,
+                 rule: Optional[str] = None, cooldown_store=None,
+                 cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
+                 hysteresis: Optional[float] = None, intrabar: bool = False):
+        """
+        Initialise la surveillance
+
+        Args:
+            symbol: Symbole à surveiller
+            interval: Intervalle des bougies (1m, 5m, 15m, 1h, 4h, 1d)
+            period: Période des Bandes de Bollinger
+            multiplier: Multiplicateur de l'écart-type
+            proximity_percent: Seuil de proximité en %
+            journal: Journal persistant des alertes (partagé par la watchlist)
+            indicators: Pipeline d'indicateurs alimenté avec les mêmes bougies
+            filters: Conditions du pipeline requises par type d'alerte
+                ('upper' / 'lower'), ex: {'upper': pipeline.rsi(14) > 70}
+            rule: Nom de la règle dans la clé de cooldown (défaut : "bb20x2"
+                d'après période et multiplicateur)
+            cooldown_store: État des cooldowns partagé (SQLiteCooldownStore)
+            cooldown_seconds: Délai minimum entre deux alertes d'une bande
+            hysteresis: Après une alerte, la bande n'est réarmée qu'une fois le
+                prix à plus de proximity_percent + hysteresis % (None = désactivé)
+            intrabar: Détecter aussi, avec le plus haut / plus bas des bougies
+                reçues, une zone de proximité atteinte entre deux vérifications
+        """
+        self.symbol = symbol
+        self.interval = interval
+        self.period = period
+        self.multiplier = multiplier
+        self.proximity_percent = proximity_percent
+
+        if indicators is not None:
+            # Moyenne / variance glissantes calculées une seule fois, par le pipeline
+            self.bands = BollingerBands(period, multiplier,
+                                        window=indicators.rolling_stats(period).window)
+        else:
+            self.bands = BollingerBands(period, multiplier)
+        self.rule = rule or f"bb{period}x{multiplier:g}"
+        self.alert_manager = AlertManager(
+            symbol=symbol, interval=interval, journal=journal, store=cooldown_store,
+            rule=self.rule, cooldown_seconds=cooldown_seconds,
+            rearm_distance=proximity_percent + hysteresis if hysteresis is not None else None
+        )
+        self.indicators = indicators
+        self.filters = filters
+        self.last_open_time = None
+        self.last_proximity: Optional[Dict] = None
+
+        # Mode intrabar : extrêmes de la bougie ouverte déjà vérifiés, et
+        # extrêmes nouveaux depuis la dernière évaluation
+        self.intrabar = intrabar
+        self._open_high: Optional[float] = None
+        self._open_low: Optional[float] = None
+        self._pending_high: Optional[float] = None
+        self._pending_low: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return (f"Subscription({self.symbol!r}, {self.interval!r}, "
+                f"period={self.period}, multiplier={self.multiplier})")
+
+    @property
+    def history_size(self) -> int:
+        """Nombre de bougies à récupérer pour initialiser les bandes"""
+        return self.period + 50
+
+    def ingest_candles(self, open_times: Sequence, closes: Sequence[float],
+                       highs: Optional[Sequence[float]] = None,
+                       lows: Optional[Sequence[float]] = None) -> Tuple[float, float, float]:
+        """
+        Intègre les dernières bougies récupérées dans l'état streaming des bandes
+
+        Seules les bougies nouvelles ou modifiées depuis l'appel précédent sont
+        traitées : la bougie ouverte est mise à jour avec `replace_last` et les
+        nouvelles bougies sont ajoutées avec `update`.
+
+        Args:
+            open_times: Heures d'ouverture des bougies (de la plus ancienne à la plus récente)
+            closes: Prix de clôture correspondants
+            highs, lows: Plus hauts / plus bas (pour les indicateurs qui en ont besoin)
+
+        Returns:
+            Tuple (upper_band, basis, lower_band)
+        """
+        if not len(closes):
+            return self.bands.current_bands()
+
+        start = self._find_last_open_time(open_times)
+        if start is None:
+            # Premier appel ou trou plus grand que l'historique récupéré
+            if self.indicators is not None:
+                self.indicators.seed(closes, highs, lows)
+                result = self.bands.refresh()
+            else:
+                result = self.bands.seed(closes)
+            if highs is not None and lows is not None:
+                # L'historique ne déclenche pas d'alerte intrabar
+                self._open_high, self._open_low = highs[-1], lows[-1]
+        else:
+            if highs is not None and lows is not None:
+                for index in range(start, len(closes)):
+                    self._note_extremes(highs[index], lows[index], same_candle=index == start)
+            # Clôture définitive de la bougie précédemment ouverte
+            result = self._push(*self._candle(start, closes, highs, lows), new=False)
+            for index in range(start + 1, len(closes)):
+                result = self._push(*self._candle(index, closes, highs, lows), new=True)
+
+        self.last_open_time = open_times[-1]
+        return result
+
+    def _push(self, close: float, high: Optional[float], low: Optional[float],
+              new: bool) -> Tuple[float, float, float]:
+        """Nouvelle bougie (`new`) ou mise à jour de la bougie ouverte, bandes et indicateurs"""
+        if self.indicators is None:
+            return self.bands.update(close) if new else self.bands.replace_last(close)
+        if new:
+            self.indicators.update(close, high, low)
+        else:
+            self.indicators.replace_last(close, high, low)
+        return self.bands.refresh()
+
+    @staticmethod
+    def _candle(index: int, closes, highs, lows) -> Tuple[float, Optional[float], Optional[float]]:
+        return (closes[index],
+                highs[index] if highs is not None else None,
+                lows[index] if lows is not None else None)
+
+    def apply_candle(self, open_time: int, close: float, high: Optional[float] = None,
+                     low: Optional[float] = None) -> Optional[Tuple[float, float, float]]:
+        """
+        Applique la mise à jour d'une seule bougie (flux temps réel)
+
+        Args:
+            open_time: Heure d'ouverture de la bougie en millisecondes
+            close: Dernier prix de la bougie
+            high, low: Plus haut / plus bas de la bougie (indicateurs)
+
+        Returns:
+            Tuple (upper_band, basis, lower_band), ou None si des bougies
+            manquent et qu'un rattrapage REST est nécessaire
+        """
+        if self.last_open_time is None:
+            return None
+        if open_time == self.last_open_time:
+            self._note_extremes(high, low, same_candle=True)
+            return self._push(close, high, low, new=False)
+        if open_time < self.last_open_time:
+            # Message en retard sur une bougie déjà clôturée
+            return self.bands.current_bands()
+        if open_time - self.last_open_time > interval_to_milliseconds(self.interval):
+            return None
+
+        self.last_open_time = open_time
+        self._note_extremes(high, low, same_candle=False)
+        return self._push(close, high, low, new=True)
+
+    def _note_extremes(self, high: Optional[float], low: Optional[float], same_candle: bool):
+        """
+        Retient le plus haut / plus bas atteints depuis la dernière évaluation
+
+        Pour la bougie déjà vue (`same_candle`), seuls les extrêmes qui
+        dépassent ceux de la vérification précédente sont nouveaux.
+        """
+        if not self.intrabar or high is None or low is None:
+            return
+        if same_candle and self._open_high is not None:
+            new_high = high if high > self._open_high else None
+            new_low = low if low < self._open_low else None
+            self._open_high = max(self._open_high, high)
+            self._open_low = min(self._open_low, low)
+        else:
+            new_high, new_low = high, low
+            self._open_high, self._open_low = high, low
+
+        if new_high is not None and (self._pending_high is None or new_high > self._pending_high):
+            self._pending_high = new_high
+        if new_low is not None and (self._pending_low is None or new_low < self._pending_low):
+            self._pending_low = new_low
+
+    def _apply_touches(self, proximity_data: Dict, upper: float, lower: float,
+                       high: Optional[float], low: Optional[float]):
+        """Marque les bandes dont la zone a été atteinte par une mèche depuis la dernière évaluation"""
+        ratio = self.proximity_percent / 100
+        if high is not None and not proximity_data['near_upper'] and high >= upper * (1 - ratio):
+            proximity_data.update(near_upper=True, touched_upper=True, intrabar_high=high)
+        if low is not None and not proximity_data['near_lower'] and low <= lower * (1 + ratio):
+            proximity_data.update(near_lower=True, touched_lower=True, intrabar_low=low)
+
+    def _find_last_open_time(self, open_times: Sequence) -> Optional[int]:
+        """Position de la dernière bougie déjà intégrée (recherche depuis la fin)"""
+        if self.last_open_time is None:
+            return None
+        for index in range(len(open_times) - 1, -1, -1):
+            if open_times[index] == self.last_open_time:
+                return index
+            if open_times[index] < self.last_open_time:
+                break
+        return None
+
+    def evaluate(self, current_price: float, screen: bool = False,
+                 screen_factor: float = 1.0) -> Tuple[Optional[Dict], List[Dict]]:
+        """
+        Vérifie la proximité du prix aux bandes et déclenche les alertes
+
+        Args:
+            current_price: Prix actuel
+            screen: Écarter d'abord le prix avec les prix de déclenchement
+                précalculés (`BollingerBands.may_be_near`) ; le détail de
+                proximité n'est alors construit que près d'une bande
+            screen_factor: Élargit la zone laissée passer par le filtre
+                (multiplie le seuil de proximité)
+
+        Returns:
+            Tuple (proximity_data, alertes déclenchées), proximity_data
+            valant None si le prix a été écarté par le filtre
+        """
+        high, low = self._pending_high, self._pending_low
+        self._pending_high = self._pending_low = None
+
+        if screen and high is None and low is None:
+            # Avec hystérésis, le filtre laisse passer la zone de réarmement
+            threshold = self.alert_manager.rearm_distance
+            if threshold is None:
+                threshold = self.proximity_percent
+            if not self.bands.may_be_near(current_price, threshold * screen_factor):
+                self.alert_manager.update_hysteresis(None)
+                self.last_proximity = None
+                return None, []
+
+        upper, _, lower = self.bands.current_bands()
+        proximity_data = self.bands.check_proximity(
+            current_price, upper, lower, self.proximity_percent
+        )
+        if high is not None or low is not None:
+            self._apply_touches(proximity_data, upper, lower, high, low)
+        alerts = self.alert_manager.check_and_alert(proximity_data, self.filters)
+        self.last_proximity = proximity_data
+        return proximity_data, alerts
+
+
+def load_subscriptions(config: dict, journal: Optional[AlertJournal] = None,
+                       cooldown_store=None) -> List[Subscription]:
+    """
+    Construit les surveillances depuis la section `watchlist` de la configuration
+
+    Sans section `watchlist`, le symbole unique de `trading` est utilisé. Les
+    cooldowns viennent de la section `cooldown` (défaut, par règle, hystérésis).
+    Les conditions d'indicateurs viennent de `filters` (ou de la clé `filters`
+    d'une entrée) : chaque surveillance concernée reçoit son pipeline.
+
+    Args:
+        config: Configuration chargée
+        journal: Journal persistant des alertes partagé par toutes les surveillances
+        cooldown_store: État des cooldowns partagé (None = en mémoire, par surveillance)
+
+    Returns:
+        Liste des surveillances
+    """
+    bb_config = config['bollinger_bands']
+    trading_config = config['trading']
+    cooldown_config = config.get('cooldown') or {}
+    rule_cooldowns = cooldown_config.get('rules') or {}
+
+    entries = (config.get('watchlist') or {}).get('subscriptions')
+    if not entries:
+        entries = [{'symbol': trading_config['symbol']}]
+
+    subscriptions = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'symbol': entry}
+        period = entry.get('period', bb_config['period'])
+        multiplier = entry.get('multiplier', bb_config['multiplier'])
+        filters_config = entry.get('filters', config.get('filters'))
+        pipeline, filters = None, None
+        if filters_config:
+            pipeline = IndicatorPipeline()
+            filters = build_filters(pipeline, filters_config, period, multiplier)
+        subscription = Subscription(
+            entry['symbol'],
+            entry.get('interval', trading_config['interval']),
+            period,
+            multiplier,
+            entry.get('proximity_percent', bb_config['proximity_percent']),
+            journal=journal,
+            indicators=pipeline,
+            filters=filters,
+            rule=entry.get('rule'),
+            cooldown_store=cooldown_store,
+            cooldown_seconds=cooldown_config.get('seconds', DEFAULT_COOLDOWN_SECONDS),
+            hysteresis=entry.get('hysteresis', cooldown_config.get('hysteresis')),
+            intrabar=entry.get('intrabar', trading_config.get('intrabar', False))
+        )
+        if subscription.rule in rule_cooldowns:
+            subscription.alert_manager.cooldown_seconds = rule_cooldowns[subscription.rule]
+        subscriptions.append(subscription)
+    return subscriptions
+
+
+def merge_alert_history(subscriptions: List[Subscription]) -> List[Dict]:
+    """Historique fusionné de plusieurs surveillances, trié par date"""
+    history = []
+    for subscription in subscriptions:
+        history.extend(subscription.alert_manager.alert_history)
+    return sorted(history, key=lambda alert: alert['timestamp'])
+
+
+def save_alert_history(subscriptions: List[Subscription], filepath: str):
+    """Sauvegarde l'historique fusionné de plusieurs surveillances dans un fichier"""
+    with open(filepath, 'w') as f:
+        json.dump(merge_alert_history(subscriptions), f, indent=2)
+
+
+class WatchlistScheduler:
+    """Exécute toutes les surveillances d'une watchlist dans un seul processus"""
+
+    def __init__(self, data_fetcher, subscriptions: List[Subscription],
+                 data_source: str = 'binance', max_concurrent_fetches: int = 4,
+                 resample: bool = False, metrics=None, event_driven: bool = False,
+                 candle_grace: float = 1.0):
+        """
+        Initialise le planificateur
+
+        Args:
+            data_fetcher: Fetcher partagé par toutes les surveillances (synchrone,
+                ou asynchrone comme AsyncBinanceFetcher / AsyncTwelveDataFetcher)
+            subscriptions: Surveillances à exécuter
+            data_source: "binance" ou "twelvedata"
+            max_concurrent_fetches: Nombre maximum de requêtes simultanées
+            resample: Pour un symbole surveillé sur plusieurs intervalles, ne
+                récupérer que le plus fin et construire les autres en mémoire
+                (après un premier chargement de leur historique)
+            metrics: Registre `Metrics` (durée de chaque étape par symbole,
+                erreurs de récupération) ; None = pas de mesure
+            event_driven: Ne redemander les bougies qu'après la clôture de la
+                bougie en cours (entre-temps le prix courant met à jour la
+                bougie ouverte), ne réévaluer que si le prix ou les bougies
+                ont changé, et calculer l'attente suivante avec `next_delay`
+            candle_grace: Secondes attendues après une clôture avant de
+                demander la nouvelle bougie (mode événementiel)
+        """
+        self.data_fetcher = data_fetcher
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.subscriptions = subscriptions
+        self.data_source = data_source.lower()
+        self.max_concurrent_fetches = max(1, max_concurrent_fetches)
+        self.event_driven = event_driven
+        self.candle_grace = candle_grace
+        # Source de l'heure courante en secondes (horloge virtuelle au rejeu)
+        self.clock = time.time
+        self._last_prices: Dict[str, float] = {}
+        # Plus haut / plus bas de la bougie ouverte de chaque paire (mode événementiel)
+        self._open_extremes: Dict[Tuple[str, str], Optional[List[float]]] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_fetches,
+            thread_name_prefix="watchlist-fetch"
+        )
+
+        # Regroupement par (symbole, intervalle) : une seule requête de bougies
+        # même si plusieurs paramètres BB sont surveillés sur la même paire
+        self._groups: Dict[Tuple[str, str], List[Subscription]] = {}
+        for subscription in subscriptions:
+            key = (subscription.symbol, subscription.interval)
+            self._groups.setdefault(key, []).append(subscription)
+        self._symbols = list(dict.fromkeys(s.symbol for s in subscriptions))
+
+        # Rééchantillonnage : {symbole: resampler} et paires construites en mémoire
+        self._resamplers: Dict[str, TimeframeResampler] = {}
+        self._derived: Dict[Tuple[str, str], str] = {}
+        if resample:
+            self._setup_resamplers()
+
+        # Fetcher asyncio : les requêtes tournent dans une boucle dédiée
+        # pour conserver la même session (connexions keep-alive) entre les cycles
+        self._async_loop = None
+        if asyncio.iscoroutinefunction(getattr(data_fetcher, 'get_current_prices', None)):
+            from src.async_fetchers import BackgroundLoop
+            self._async_loop = BackgroundLoop()
+
+    def _setup_resamplers(self):
+        """Associe à chaque symbole multi-intervalles un resampler depuis son intervalle le plus fin"""
+        intervals_by_symbol: Dict[str, List[str]] = {}
+        for symbol, interval in self._groups:
+            intervals_by_symbol.setdefault(symbol, []).append(interval)
+
+        for symbol, intervals in intervals_by_symbol.items():
+            base = min(intervals, key=interval_to_milliseconds)
+            base_ms = interval_to_milliseconds(base)
+            derived = [i for i in intervals
+                       if i != base and interval_to_milliseconds(i) % base_ms == 0]
+            if not derived:
+                continue
+            self._resamplers[symbol] = TimeframeResampler(base, derived)
+            for interval in derived:
+                self._derived[(symbol, interval)] = symbol
+
+    def _fetch_candles(self, symbol: str, interval: str, size: int,
+                       fields: Sequence[str] = CLOSE_FIELDS) -> Dict[str, list]:
+        """Récupère les dernières bougies d'une paire (heures d'ouverture en ms et prix)"""
+        if self.data_source == 'twelvedata':
+            df = self.data_fetcher.get_historical_data(symbol, interval, outputsize=size)
+            return self._dataframe_to_lists(df, fields)
+
+        arrays = self.data_fetcher.get_kline_arrays(symbol, interval, limit=size, fields=fields)
+        return {field: arrays[field].tolist() for field in fields}
+
+    @staticmethod
+    def _dataframe_to_lists(df, fields: Sequence[str]) -> Dict[str, list]:
+        candles = {field: df[field].tolist() for field in fields if field != 'open_time'}
+        candles['open_time'] = timestamps_to_milliseconds(df['timestamp'])
+        return candles
+
+    def _fetch_size(self, key: Tuple[str, str]) -> int:
+        return max(s.history_size for s in self._groups[key])
+
+    def _candle_due(self, interval: str, last_open_time: Optional[int], now_ms: float) -> bool:
+        """True si la bougie suivante a pu s'ouvrir depuis la dernière récupération"""
+        if not self.event_driven or last_open_time is None:
+            return True
+        return now_ms >= last_open_time + interval_to_milliseconds(interval) + self.candle_grace * 1000
+
+    def _plan(self) -> Dict[Tuple[str, str], Tuple[int, Sequence[str]]]:
+        """
+        Paires à récupérer pendant ce cycle
+
+        Returns:
+            Dict {(symbole, intervalle): (nombre de bougies, champs)}
+        """
+        now_ms = self.clock() * 1000
+        plan = {}
+        for key, group in self._groups.items():
+            if key in self._derived and all(s.last_open_time is not None for s in group):
+                # Construite en mémoire depuis l'intervalle de base
+                continue
+            if any(s.last_open_time is not None for s in group) and not any(
+                    self._candle_due(key[1], s.last_open_time, now_ms) for s in group):
+                # Bougie en cours encore ouverte : mise à jour par le prix courant
+                continue
+            with_ohlc = any(s.indicators is not None or s.intrabar for s in group)
+            plan[key] = (self._fetch_size(key), OHLC_FIELDS if with_ohlc else CLOSE_FIELDS)
+
+        for symbol, resampler in self._resamplers.items():
+            key = (symbol, resampler.base_interval)
+            if key not in plan and not self._candle_due(
+                    resampler.base_interval, resampler.last_open_time, now_ms):
+                continue
+            if resampler.last_open_time is None:
+                # Premier cycle : de quoi reconstituer entièrement la bougie la plus longue
+                size = max(resampler.span(interval) for interval in resampler.intervals) + 1
+            else:
+                elapsed = now_ms - resampler.last_open_time
+                size = int(elapsed // interval_to_milliseconds(resampler.base_interval)) + 2
+            size = min(max(size, plan.get(key, (0,))[0]), MAX_RESAMPLE_FETCH)
+            plan[key] = (size, OHLC_FIELDS)
+        return plan
+
+    def _timed(self, function, stage: str, **labels):
+        """Enveloppe `function` pour mesurer sa durée dans `stage_seconds`"""
+        def call(*args):
+            with self.metrics.timer('stage_seconds', stage=stage, **labels):
+                return function(*args)
+        return call
+
+    def _fetch_all(self, plan):
+        """Récupère prix et bougies via le pool de threads"""
+        prices_future = self._executor.submit(
+            self._timed(self.data_fetcher.get_current_prices, 'tickers'), self._symbols
+        )
+        candle_futures = {
+            key: self._executor.submit(
+                self._timed(self._fetch_candles, 'klines', symbol=key[0], interval=key[1]),
+                key[0], key[1], size, fields
+            )
+            for key, (size, fields) in plan.items()
+        }
+
+        candles = {}
+        for key, future in candle_futures.items():
+            try:
+                candles[key] = future.result()
+            except Exception as e:
+                candles[key] = e
+
+        try:
+            return prices_future.result(), candles
+        except Exception as e:
+            return e, candles
+
+    async def _fetch_all_async(self, plan):
+        """Récupère prix et bougies en parallèle dans la boucle asyncio"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+
+        async def limited(coroutine, stage, **labels):
+            async with semaphore:
+                with self.metrics.timer('stage_seconds', stage=stage, **labels):
+                    return await coroutine
+
+        async def fetch_candles(key, size, fields):
+            if hasattr(self.data_fetcher, 'get_kline_arrays'):
+                arrays = await self.data_fetcher.get_kline_arrays(
+                    key[0], key[1], limit=size, fields=fields
+                )
+                return {field: arrays[field].tolist() for field in fields}
+            df = await self.data_fetcher.get_candles(key[0], key[1], size)
+            return self._dataframe_to_lists(df, fields)
+
+        keys = list(plan)
+        results = await asyncio.gather(
+            limited(self.data_fetcher.get_current_prices(self._symbols), 'tickers'),
+            *(limited(fetch_candles(key, *plan[key]), 'klines', symbol=key[0], interval=key[1])
+              for key in keys),
+            return_exceptions=True
+        )
+        return results[0], dict(zip(keys, results[1:]))
+
+    def _resample(self, candles: Dict) -> Dict[Tuple[str, str], List[Bar]]:
+        """
+        Alimente les resamplers avec les bougies de base reçues
+
+        Returns:
+            Dict {(symbole, intervalle dérivé): [bougies dans l'ordre]}
+        """
+        updates = {}
+        for symbol, resampler in self._resamplers.items():
+            base = candles.get((symbol, resampler.base_interval))
+            if base is None or isinstance(base, Exception):
+                continue
+
+            bars: Dict[str, Dict[int, Bar]] = {}
+            for open_time, o, h, l, c in zip(base['open_time'], base['open'], base['high'],
+                                             base['low'], base['close']):
+                for interval, bar in resampler.update(open_time, o, h, l, c):
+                    # Seul le dernier état de chaque bougie dérivée compte
+                    bars.setdefault(interval, {})[bar.open_time] = bar
+
+            for interval, by_time in bars.items():
+                if (symbol, interval) in self._derived:
+                    updates[(symbol, interval)] = [by_time[t] for t in sorted(by_time)]
+        return updates
+
+    def _ingest(self, subscription: Subscription, key, candles: Dict, source, derived: Dict):
+        if key in candles:
+            subscription.ingest_candles(
+                source['open_time'], source['close'], source.get('high'), source.get('low')
+            )
+        else:
+            self._apply_derived(subscription, derived.get(key, []))
+
+    def _apply_tick(self, key: Tuple[str, str], subscription: Subscription, price: float):
+        """Met à jour la bougie ouverte avec le prix courant (pas de nouvelle requête de bougies)"""
+        extremes = self._open_extremes.get(key)
+        high, low = (None, None) if extremes is None else extremes
+        subscription.apply_candle(subscription.last_open_time, price, high, low)
+
+    def _track_open_candle(self, key: Tuple[str, str], source: Optional[Dict], price: Optional[float]):
+        """Plus haut / plus bas de la bougie ouverte, étendus par les prix courants"""
+        if source is not None:
+            highs, lows = source.get('high'), source.get('low')
+            self._open_extremes[key] = [highs[-1], lows[-1]] if highs and lows else None
+        extremes = self._open_extremes.get(key)
+        if extremes is not None and price is not None:
+            extremes[0] = max(extremes[0], price)
+            extremes[1] = min(extremes[1], price)
+
+    def _tick_resamplers(self, candles: Dict, prices: Dict[str, float], updated: Dict):
+        """Applique le prix courant aux resamplers dont la bougie de base n'a pas été redemandée"""
+        for symbol, resampler in self._resamplers.items():
+            if (symbol, resampler.base_interval) in candles or symbol not in prices:
+                continue
+            if prices[symbol] == self._last_prices.get(symbol):
+                continue
+            for interval, bar in resampler.update_price(prices[symbol]):
+                if (symbol, interval) in self._derived:
+                    updated[(symbol, interval)] = [bar]
+
+    def next_delay(self, max_interval: float, min_interval: float = 1.0) -> float:
+        """
+        Attente avant le prochain cycle en mode événementiel
+
+        L'attente raccourcit à mesure que le prix s'approche d'une bande
+        (`min_interval` au seuil de proximité, `max_interval` au-delà de
+        ELASTIC_FACTOR fois ce seuil) et ne dépasse jamais la prochaine
+        clôture de bougie, pour la récupérer dès qu'elle est disponible.
+
+        Args:
+            max_interval: Attente en marché calme (check_interval)
+            min_interval: Attente minimum près d'une bande
+
+        Returns:
+            Secondes à attendre
+        """
+        delay = max_interval
+        for subscription in self.subscriptions:
+            proximity = subscription.last_proximity
+            if proximity is None:
+                continue
+            distance = min(proximity['distance_upper_pct'], proximity['distance_lower_pct'])
+            if distance != distance:
+                # Bandes pas encore calculables (NaN)
+                continue
+            threshold = subscription.proximity_percent
+            tension = (distance - threshold) / (threshold * (ELASTIC_FACTOR - 1))
+            tension = min(max(tension, 0.0), 1.0)
+            delay = min(delay, min_interval + (max_interval - min_interval) * tension)
+
+        now = self.clock()
+        for (symbol, interval), group in self._groups.items():
+            if (symbol, interval) in self._derived:
+                continue
+            for subscription in group:
+                if subscription.last_open_time is None:
+                    continue
+                close = ((subscription.last_open_time + interval_to_milliseconds(interval)) / 1000
+                         + self.candle_grace)
+                delay = min(delay, max(close - now, min(min_interval, 0.1)))
+        return delay
+
+    def _apply_derived(self, subscription: Subscription, bars: List[Bar]):
+        for bar in bars:
+            if subscription.apply_candle(bar.open_time, bar.close, bar.high, bar.low) is None:
+                # Trou dans les bougies de base : historique rechargé au prochain cycle
+                subscription.last_open_time = None
+                return
+
+    def run_once(self) -> List[Dict]:
+        """
+        Exécute un cycle de surveillance pour toute la watchlist
+
+        Returns:
+            Liste de résultats {'subscription', 'proximity', 'price', 'alerts', 'error'},
+            'proximity' valant None pour un prix écarté loin des bandes
+        """
+        plan = self._plan()
+        if self._async_loop is not None:
+            prices, candles = self._async_loop.run(self._fetch_all_async(plan))
+        else:
+            prices, candles = self._fetch_all(plan)
+
+        prices_error = prices if isinstance(prices, Exception) else None
+        if prices_error is not None:
+            prices = {}
+            self.metrics.inc('fetch_errors_total', stage='tickers')
+        for (symbol, interval), result in candles.items():
+            if isinstance(result, Exception):
+                self.metrics.inc('fetch_errors_total', stage='klines', symbol=symbol, interval=interval)
+        derived = self._resample(candles)
+        self._tick_resamplers(candles, prices, derived)
+
+        results = []
+        for key, group in self._groups.items():
+            price = prices.get(key[0])
+            fetched = key in candles
+            source = candles.get(key)
+            if key in self._derived:
+                # Paire construite en mémoire : erreur éventuelle de l'intervalle de base
+                resampler = self._resamplers[self._derived[key]]
+                base = candles.get((key[0], resampler.base_interval))
+                if base is not None and not fetched:
+                    source = base
+            candles_error = source if isinstance(source, Exception) else None
+            if candles_error is None and key not in self._derived:
+                self._track_open_candle(key, source, price)
+            price_changed = price is not None and price != self._last_prices.get(key[0])
+
+            for subscription in group:
+                result = {
+                    'subscription': subscription,
+                    'proximity': subscription.last_proximity,
+                    'price': price,
+                    'alerts': [],
+                    'error': candles_error,
+                    'changed': True
+                }
+                if candles_error is None:
+                    labels = {'symbol': subscription.symbol, 'interval': subscription.interval}
+                    try:
+                        if not (fetched or key in derived or price_changed) and self.event_driven:
+                            # Ni nouveau prix ni nouvelle bougie : rien à recalculer
+                            result['changed'] = False
+                            results.append(result)
+                            continue
+                        with self.metrics.timer('stage_seconds', stage='calculate', **labels):
+                            if fetched or key in self._derived:
+                                self._ingest(subscription, key, candles, source, derived)
+                            elif price is not None:
+                                self._apply_tick(key, subscription, price)
+                        if price is None:
+                            raise prices_error or KeyError(
+                                f"Prix indisponible pour {subscription.symbol}"
+                            )
+                        with self.metrics.timer('stage_seconds', stage='check_proximity', **labels):
+                            # Prix loin des bandes : écarté sans calculer la proximité.
+                            # En mode événementiel, la zone laissée passer couvre celle
+                            # où `next_delay` raccourcit l'attente
+                            result['proximity'], result['alerts'] = subscription.evaluate(
+                                price, screen=True,
+                                screen_factor=ELASTIC_FACTOR if self.event_driven else 1.0
+                            )
+                    except Exception as e:
+                        result['error'] = e
+                results.append(result)
+
+        self._last_prices.update(prices)
+        return results
+
+    def alert_history(self) -> List[Dict]:
+        """Historique fusionné de toutes les surveillances, trié par date"""
+        return merge_alert_history(self.subscriptions)
+
+    def save_history(self, filepath: str):
+        """Sauvegarde l'historique fusionné dans un fichier"""
+        save_alert_history(self.subscriptions, filepath)
+
+    def close(self):
+        """Libère les threads de récupération et la session asynchrone"""
+        self._executor.shutdown(wait=False)
+        if self._async_loop is not None:
+            self._async_loop.run(self.data_fetcher.close())
+            self._async_loop.close()
+            self._async_loop = None
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Recherche des meilleurs paramètres Bollinger Bands sur données historiques
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config_loader import ConfigLoader
+from src.intervals import timestamps_to_milliseconds
+from src.sweep import run_sweep
+
+
+def load_candles(args, config: dict) -> dict:
+    """
+    Charge les bougies de chaque symbole (fichiers CSV, archive memmap ou cache local)
+
+    Returns:
+        Dict {symbole: (open_times en ms, close)}
+    """
+    candles = {}
+    if args.csv:
+        for path in args.csv:
+            df = pd.read_csv(path)
+            if 'open_time' in df:
+                open_times = df['open_time'].to_numpy(dtype=np.int64)
+            else:
+                open_times = np.array(timestamps_to_milliseconds(pd.to_datetime(df['timestamp'])),
+                                      dtype=np.int64)
+            symbol = os.path.splitext(os.path.basename(path))[0]
+            candles[symbol] = (open_times, df['close'].to_numpy(dtype=np.float64))
+        return candles
+
+    if args.archive:
+        from src.candle_archive import CandleArchive
+        archive = CandleArchive((config.get('archive') or {}).get('path', 'data/archive'))
+        for symbol in args.symbols:
+            arrays = archive.open(args.source, symbol, args.interval, fields=('open_time', 'close'))
+            if len(arrays['close']):
+                candles[symbol] = (arrays['open_time'], arrays['close'])
+            else:
+                print(f"⚠️ Aucune bougie archivée pour {symbol} {args.interval}")
+        return candles
+
+    from src.candle_cache import CandleCache
+    cache_config = config.get('cache') or {}
+    cache = CandleCache(cache_config.get('path', 'data/candles.db'))
+    try:
+        for symbol in args.symbols:
+            arrays = cache.load_arrays(args.source, symbol, args.interval)
+            if len(arrays['close']):
+                candles[symbol] = (arrays['open_time'], arrays['close'])
+            else:
+                print(f"⚠️ Aucune bougie en cache pour {symbol} {args.interval}")
+    finally:
+        cache.close()
+    return candles
+
+
+def parse_args(config: dict) -> argparse.Namespace:
+    trading_config = config.get('trading', {})
+
+    parser = argparse.ArgumentParser(description="Grid search des paramètres Bollinger Bands")
+    parser.add_argument('--symbols', nargs='+', default=[trading_config.get('symbol')])
+    parser.add_argument('--interval', default=trading_config.get('interval', '1h'))
+    parser.add_argument('--source', default=trading_config.get('data_source', 'binance'))
+    parser.add_argument('--csv', nargs='+', help="Fichiers CSV (un par symbole, nommés SYMBOLE.csv)")
+    parser.add_argument('--archive', action='store_true', help="Lit les bougies dans l'archive (archive.py)")
+    parser.add_argument('--periods', type=int, nargs='+', default=[10, 14, 20, 30, 50])
+    parser.add_argument('--multipliers', type=float, nargs='+', default=[1.5, 2.0, 2.5, 3.0])
+    parser.add_argument('--proximities', type=float, nargs='+', default=[0.05, 0.1, 0.2, 0.5, 1.0])
+    parser.add_argument('--cooldowns', type=float, nargs='+', default=[300, 900, 3600])
+    parser.add_argument('--horizons', type=int, nargs='+', default=[5, 20])
+    parser.add_argument('--workers', type=int, default=None, help="Nombre de processus (défaut: nb de cœurs)")
+    parser.add_argument('--top', type=int, default=20, help="Nombre de combinaisons affichées")
+    parser.add_argument('--sort', default=None, help="Colonne de tri (défaut: reversion du 1er horizon)")
+    parser.add_argument('--output', help="Export CSV de tous les résultats")
+    return parser.parse_args()
+
+
+def main():
+    """Fonction principale"""
+    try:
+        config = ConfigLoader().load()
+    except FileNotFoundError:
+        config = {}
+    args = parse_args(config)
+
+    candles = load_candles(args, config)
+    if not candles:
+        print("❌ Aucune donnée historique disponible")
+        sys.exit(1)
+
+    combinations = (len(args.periods) * len(args.multipliers)
+                    * len(args.proximities) * len(args.cooldowns))
+    print(f"📊 {len(candles)} symbole(s), {sum(len(c) for _, c in candles.values())} bougies")
+    print(f"🧮 {combinations} combinaisons par symbole")
+
+    start = time.perf_counter()
+    results = run_sweep(
+        candles,
+        args.periods,
+        args.multipliers,
+        args.proximities,
+        args.cooldowns,
+        args.horizons,
+        workers=args.workers
+    )
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  {len(results)} évaluations en {elapsed:.2f}s\n")
+
+    sort_column = args.sort or f"reversion_{args.horizons[0]}"
+    best = results.sort_values(sort_column, ascending=False).head(args.top)
+    print(best.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\n💾 Résultats exportés dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests du journal persistant des alertes"""
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.alert_journal import AlertJournal
+from src.alert_manager import AlertManager
+
+PROXIMITY = {
+    'near_upper': True, 'near_lower': False,
+    'distance_upper_pct': 0.05, 'distance_lower_pct': 4.1,
+    'current_price': 100.0, 'upper_band': 100.05, 'lower_band': 96.0,
+}
+
+
+def _alert(symbol: str, when: datetime, alert_type: str = 'upper') -> dict:
+    return {
+        'timestamp': when.isoformat(), 'symbol': symbol, 'interval': '1h',
+        'type': alert_type, 'message': 'alerte', 'price': 100.0,
+        'band_value': 100.05, 'distance_pct': 0.05, 'details': PROXIMITY,
+    }
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = AlertJournal(str(tmp_path / "alerts.db"), batch_size=1000, flush_interval=0.05)
+    yield journal
+    journal.close()
+
+
+def test_alerts_reach_disk_without_explicit_save(journal):
+    manager = AlertManager('BTCUSDT', '1h', journal=journal)
+    alert = manager.check_and_alert(PROXIMITY)[0]
+
+    # Commit différé par le timer, sans flush ni close
+    time.sleep(0.2)
+    reader = AlertJournal(journal.path)
+    stored = list(reader.query(symbol='BTCUSDT', with_details=True))
+    reader.close()
+
+    assert len(stored) == 1
+    assert stored[0]['message'] == alert['message']
+    assert stored[0]['details'] == PROXIMITY
+
+
+def test_memory_tail_is_bounded_and_reloaded_from_journal(journal):
+    manager = AlertManager('ETHUSDT', '1h', journal=journal, history_size=5)
+    start = datetime(2024, 1, 1)
+    for i in range(20):
+        alert = _alert('ETHUSDT', start + timedelta(minutes=i))
+        manager.alert_history.append(alert)
+        journal.append(alert)
+    journal.append(_alert('BTCUSDT', start))
+
+    assert len(manager.alert_history) == 5
+    assert len(manager.get_alert_history(3)) == 3
+
+    restarted = AlertManager('ETHUSDT', '1h', journal=journal, history_size=5)
+    restarted.load_history()
+    assert [a['timestamp'] for a in restarted.alert_history] == \
+        [(start + timedelta(minutes=i)).isoformat() for i in range(15, 20)]
+
+
+def test_queries_by_symbol_and_time_range(journal):
+    start = datetime(2024, 1, 1)
+    for i in range(50_000):
+        journal.append(_alert(f"SYM{i % 50}", start + timedelta(minutes=i),
+                              'upper' if i % 2 else 'lower'))
+
+    begin = time.perf_counter()
+    window = list(journal.query(symbol='SYM7', start=start + timedelta(days=10),
+                                end=start + timedelta(days=11)))
+    elapsed = time.perf_counter() - begin
+
+    assert len(window) == sum(1 for i in range(14400, 15840) if i % 50 == 7)
+    assert all(a['symbol'] == 'SYM7' for a in window)
+    assert journal.count(symbol='SYM7', alert_type='upper') == 1000
+    assert elapsed < 0.2
+
+
+def test_symbol_queries_use_an_index_with_or_without_interval(journal):
+    for interval in (None, '1h'):
+        where, params = journal._where('SYM7', interval, None, 0.0, 1.0)
+        plan = " ".join(row[-1] for row in journal._conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM alerts{where} ORDER BY ts", params))
+        index = 'alerts_symbol_ts' if interval else 'alerts_symbol_only_ts'
+        assert f"USING INDEX {index} (symbol=? AND" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+def test_load_history_streams_jsonl(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    start = datetime(2024, 1, 1)
+    with open(path, 'w') as f:
+        for i in range(100):
+            f.write(json.dumps(_alert('BTCUSDT', start + timedelta(hours=i))) + "\n")
+
+    manager = AlertManager('BTCUSDT', '1h', history_size=10)
+    manager.load_history(str(path))
+    assert len(manager.alert_history) == 10
+    assert manager.alert_history[-1]['timestamp'] == (start + timedelta(hours=99)).isoformat()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Tests des fetchers asyncio contre un serveur HTTP local (réponses Binance / Twelve Data)"""
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+from src.async_fetchers import (
+    AsyncBinanceFetcher,
+    AsyncFetcherError,
+    AsyncTwelveDataFetcher
+)
+from src.rate_limiter import RateLimiter
+from src.watchlist import Subscription, WatchlistScheduler
+
+DELAY = 0.2
+HOUR_MS = 3_600_000
+
+
+def _klines(limit: int):
+    start = 1_700_000_000_000
+    return [
+        [start + i * HOUR_MS, "100.0", "101.0", "99.0", f"{100 + i % 7}.5", "10.0",
+         start + (i + 1) * HOUR_MS - 1, "1000.0", 42, "5.0", "500.0", "0"]
+        for i in range(limit)
+    ]
+
+
+def _values(outputsize: int):
+    # Twelve Data renvoie du plus récent au plus ancien
+    return [
+        {"datetime": f"2024-01-{1 + i // 24:02d} {i % 24:02d}:00:00",
+         "open": "2000.0", "high": "2010.0", "low": "1990.0", "close": f"{2000 + i % 5}.0"}
+        for i in reversed(range(outputsize))
+    ]
+
+
+class StubServer:
+    """Serveur local qui imite les endpoints utilisés et compte les connexions"""
+
+    def __init__(self):
+        self.requests = []
+        self.connections = set()
+        self.app = web.Application()
+        self.app.router.add_get('/api/v3/klines', self.klines)
+        self.app.router.add_get('/api/v3/ticker/price', self.ticker)
+        self.app.router.add_get('/time_series', self.time_series)
+        self.app.router.add_get('/quote', self.quote)
+
+    async def start(self) -> str:
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _record(self, request):
+        self.requests.append((request.path, dict(request.query)))
+        self.connections.add(request.transport.get_extra_info('peername'))
+        await asyncio.sleep(DELAY)
+
+    async def klines(self, request):
+        await self._record(request)
+        if request.query['symbol'] == 'BAD':
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        return web.json_response(_klines(int(request.query['limit'])))
+
+    async def ticker(self, request):
+        await self._record(request)
+        if 'symbol' in request.query:
+            return web.json_response({"symbol": request.query['symbol'], "price": "103.25"},
+                                     headers={'X-MBX-USED-WEIGHT-1M': '5000'})
+        return web.json_response([
+            {"symbol": "BTCUSDT", "price": "103.25"},
+            {"symbol": "ETHUSDT", "price": "2.5"},
+            {"symbol": "BNBUSDT", "price": "300.0"}
+        ])
+
+    async def time_series(self, request):
+        await self._record(request)
+        if request.query['symbol'] == 'BAD':
+            return web.json_response({"code": 400, "message": "symbol invalid", "status": "error"})
+        values = _values(int(request.query['outputsize']))
+        return web.json_response({"meta": {"symbol": request.query['symbol']},
+                                  "values": values, "status": "ok"})
+
+    async def quote(self, request):
+        await self._record(request)
+        symbols = request.query['symbol'].split(',')
+        if len(symbols) == 1:
+            return web.json_response({"symbol": symbols[0], "close": "2003.5"})
+        return web.json_response({s: {"symbol": s, "close": "2003.5"} for s in symbols})
+
+
+def _run(scenario):
+    async def wrapper():
+        server = StubServer()
+        base_url = await server.start()
+        try:
+            return await scenario(server, base_url)
+        finally:
+            await server.stop()
+    return asyncio.run(wrapper())
+
+
+def test_binance_snapshot_runs_klines_and_ticker_concurrently():
+    async def scenario(server, base_url):
+        async with AsyncBinanceFetcher(base_url=base_url) as fetcher:
+            start = time.perf_counter()
+            df, price = await fetcher.get_snapshot('BTCUSDT', '1h', 70)
+            elapsed = time.perf_counter() - start
+
+        assert len(df) == 70
+        assert df['close'].dtype == float
+        assert df['close'].iloc[0] == 100.5
+        assert price == 103.25
+        assert elapsed < DELAY * 1.8
+
+    _run(scenario)
+
+
+def test_twelvedata_snapshot_and_order():
+    async def scenario(server, base_url):
+        async with AsyncTwelveDataFetcher("key", base_url=base_url) as fetcher:
+            df, price = await fetcher.get_snapshot('XAU/USD', '1h', 30)
+
+        assert df['timestamp'].is_monotonic_increasing
+        assert df['close'].iloc[-1] == 2004.0
+        assert price == 2003.5
+        assert server.requests[0][1]['interval'] == '1h'
+        assert all(query['apikey'] == 'key' for _, query in server.requests)
+
+    _run(scenario)
+
+
+def test_many_symbols_run_concurrently_on_pooled_connections():
+    async def scenario(server, base_url):
+        symbols = [f"SYM{i}USDT" for i in range(20)]
+        async with AsyncBinanceFetcher(base_url=base_url, max_connections=5) as fetcher:
+            start = time.perf_counter()
+            results = await fetcher.get_snapshots(
+                [(s, '1h', 25) for s in symbols], max_concurrent=20
+            )
+            elapsed = time.perf_counter() - start
+
+        assert all(not isinstance(r, Exception) for r in results)
+        # 40 requêtes sur 5 connexions : 8 vagues au lieu de 40 séquentielles
+        assert elapsed < DELAY * 40 / 2
+        assert len(server.connections) <= 5
+
+    _run(scenario)
+
+
+def test_errors_are_returned_per_symbol():
+    async def scenario(server, base_url):
+        async with AsyncBinanceFetcher(base_url=base_url) as binance, \
+                AsyncTwelveDataFetcher(base_url=base_url) as twelvedata:
+            binance_results = await binance.get_snapshots([('BAD', '1h', 5), ('BTCUSDT', '1h', 5)])
+            td_results = await twelvedata.get_snapshots([('BAD', '1h', 5)])
+
+        assert isinstance(binance_results[0], AsyncFetcherError)
+        assert not isinstance(binance_results[1], Exception)
+        assert isinstance(td_results[0], AsyncFetcherError)
+
+    _run(scenario)
+
+
+def test_watchlist_scheduler_with_async_fetcher():
+    # Le serveur doit tourner dans sa propre boucle pendant que le scheduler
+    # utilise la sienne : on le démarre dans un thread séparé
+    ready = threading.Event()
+    state = {}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        server = StubServer()
+        state['loop'] = loop
+        state['url'] = loop.run_until_complete(server.start())
+        state['server'] = server
+        ready.set()
+        loop.run_forever()
+        loop.run_until_complete(server.stop())
+        loop.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    ready.wait(5)
+
+    subscriptions = [Subscription('BTCUSDT', '1h'), Subscription('ETHUSDT', '1h')]
+    scheduler = WatchlistScheduler(
+        AsyncBinanceFetcher(base_url=state['url']), subscriptions, 'binance'
+    )
+    try:
+        for _ in range(2):
+            results = scheduler.run_once()
+            assert [r['error'] for r in results] == [None, None]
+            assert results[0]['price'] == 103.25
+    finally:
+        scheduler.close()
+        state['loop'].call_soon_threadsafe(state['loop'].stop)
+        thread.join(5)
+
+    # 2 cycles x (1 ticker groupé + 2 klines)
+    assert len(state['server'].requests) == 6
+
+
+def test_rate_limited_requests_are_coalesced_and_synced():
+    async def scenario(server, base_url):
+        limiter = RateLimiter(6000)
+        async with AsyncBinanceFetcher(base_url=base_url, rate_limiter=limiter) as fetcher:
+            prices = await asyncio.gather(*(fetcher.get_current_price('BTCUSDT') for _ in range(5)))
+
+        assert prices == [103.25] * 5
+        assert len(server.requests) == 1
+        assert limiter.coalesced == 4
+        # Poids renvoyé par le serveur : 6000 - 5000
+        assert 1000 <= limiter.tokens < 1100
+
+    _run(scenario)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Tests du rattrapage de l'historique par pages parallèles (trous, doublons, reprise)"""
+import threading
+import time
+
+import numpy as np
+
+from src.backfill import backfill, split_range
+from src.candle_archive import CandleArchive
+from src.data_fetcher import DataFetcher
+from src.rate_limiter import RateLimiter
+
+MINUTE_MS = 60_000
+
+
+class FakeBinanceClient:
+    """Client Binance en mémoire, avec une panne de l'exchange et des pages qui débordent"""
+
+    def __init__(self, first: int, count: int, outage=(), failing=()):
+        self.open_times = [first + i * MINUTE_MS for i in range(count)
+                           if first + i * MINUTE_MS not in set(outage)]
+        self.failing = set(failing)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def get_klines(self, symbol, interval, limit, startTime, endTime):
+        with self._lock:
+            self.calls.append(startTime)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.01)
+            if startTime in self.failing:
+                raise ConnectionError("connexion interrompue")
+            # Une bougie avant la page : doublon avec la page précédente
+            return [[t, str(t % 89), str(t % 89 + 1), str(t % 89 - 1), str(t % 89), "1",
+                     t + MINUTE_MS - 1, "0", 1, "0", "0", "0"]
+                    for t in self.open_times if startTime - MINUTE_MS <= t <= endTime][:limit]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _history(count: int) -> int:
+    now = int(time.time() * 1000)
+    return now - now % MINUTE_MS - (count + 10) * MINUTE_MS
+
+
+def test_split_range_covers_range_without_overlap():
+    pages = split_range(0, 999 * MINUTE_MS, MINUTE_MS, 300)
+    assert [start // MINUTE_MS for start, _ in pages] == [0, 300, 600, 900]
+    assert pages[-1][1] == 999 * MINUTE_MS
+    assert all(end + 1 == start for (_, end), (start, _) in zip(pages, pages[1:]))
+
+
+def test_parallel_backfill_reports_outage_and_failed_page(tmp_path):
+    first = _history(1000)
+    outage = [first + i * MINUTE_MS for i in range(420, 450)]
+    client = FakeBinanceClient(first, 1000, outage=outage, failing=[first + 600 * MINUTE_MS])
+    fetcher = DataFetcher(client=client, rate_limiter=RateLimiter(6000))
+    archive = CandleArchive(str(tmp_path))
+
+    report = backfill(fetcher, archive, 'BTCUSDT', '1m', first, first + 999 * MINUTE_MS,
+                      workers=4, page_size=100, retries=0)
+    assert report['pages'] == 10 and client.max_active > 1
+    assert report['received'] == 1000 - 30 - 100
+    assert [(start - first) // MINUTE_MS for start, _, _ in report['failed']] == [600]
+    assert report['gaps'] == [(outage[0], outage[-1]),
+                              (first + 600 * MINUTE_MS, first + 699 * MINUTE_MS)]
+
+    times = archive.open('binance', 'BTCUSDT', '1m')['open_time']
+    assert len(times) == 870 and np.all(np.diff(times) > 0)
+
+    # Relance : seuls les trous sont redemandés
+    client.failing.clear()
+    client.calls.clear()
+    report = backfill(fetcher, archive, 'BTCUSDT', '1m', first, first + 999 * MINUTE_MS,
+                      workers=4, page_size=100)
+    assert sorted((start - first) // MINUTE_MS for start in client.calls) == [420, 600]
+    assert report['gaps'] == [(outage[0], outage[-1])]
+    assert archive.count('binance', 'BTCUSDT', '1m') == 970
+
+
+def test_backfill_before_archived_series_merges_in_one_rewrite(tmp_path):
+    first = _history(2000)
+    client = FakeBinanceClient(first, 2000)
+    fetcher = DataFetcher(client=client)
+    archive = CandleArchive(str(tmp_path))
+
+    backfill(fetcher, archive, 'BTCUSDT', '1m', first + 1500 * MINUTE_MS,
+             first + 1999 * MINUTE_MS, page_size=250)
+    report = backfill(fetcher, archive, 'BTCUSDT', '1m', first, first + 1999 * MINUTE_MS,
+                      workers=3, page_size=250)
+    assert report['pages'] == 6 and report['gaps'] == []
+
+    arrays = archive.open('binance', 'BTCUSDT', '1m')
+    assert np.array_equal(arrays['open_time'], first + MINUTE_MS * np.arange(2000))
+    assert np.array_equal(arrays['close'], (arrays['open_time'] % 89).astype(float))
+    # La série temporaire du rattrapage a été supprimée
+    assert [s['symbol'] for s in archive.series()] == ['BTCUSDT']
+
+
+def test_sequential_backfill_pages_history_and_resumes_after_last_candle(tmp_path):
+    first = _history(1000)
+    client = FakeBinanceClient(first, 1010)
+    fetcher = DataFetcher(client=client)
+    archive = CandleArchive(str(tmp_path))
+
+    report = backfill(fetcher, archive, 'BTCUSDT', '1m', first, first + 999 * MINUTE_MS,
+                      workers=1, page_size=300)
+    assert report['received'] == 1000 and report['gaps'] == []
+    assert [(start - first) // MINUTE_MS for start in client.calls] == [0, 300, 600, 900]
+
+    # Reprise après la dernière bougie archivée, jusqu'à la dernière bougie clôturée
+    client.calls.clear()
+    backfill(fetcher, archive, 'BTCUSDT', '1m', first, workers=1, page_size=300)
+    assert client.calls[0] == first + 1000 * MINUTE_MS
+    times = archive.open('binance', 'BTCUSDT', '1m')['open_time']
+    assert times[-1] + MINUTE_MS <= time.time() * 1000
+    assert np.all(np.diff(times) == MINUTE_MS)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Tests du backtest vectorisé (parité avec la logique de surveillance en direct)"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import apply_cooldown, run_backtest
+from src.bollinger_bands import BollingerBands, bollinger_arrays
+
+MINUTE_MS = 60_000
+
+
+def _candles(n: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 30, n))
+    open_times = 1_600_000_000_000 + np.arange(n, dtype=np.int64) * MINUTE_MS
+    return open_times, close
+
+
+def test_bollinger_arrays_match_pandas():
+    _, close = _candles(50_000)
+    upper, basis, lower = bollinger_arrays(close, 20, 2.0)
+    expected = BollingerBands(20, 2.0).calculate(pd.Series(close))
+
+    for actual, reference in zip((upper, basis, lower), expected):
+        np.testing.assert_allclose(actual, reference.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_backtest_matches_live_loop():
+    """Même alertes que BollingerBands.check_proximity + cooldown AlertManager, bougie par bougie"""
+    open_times, close = _candles(3000)
+    period, multiplier, proximity, cooldown = 20, 2.0, 0.05, 600
+
+    bb = BollingerBands(period, multiplier)
+    expected = []
+    last_alert = {'upper': None, 'lower': None}
+    for open_time, price in zip(open_times, close):
+        upper, _, lower = bb.update(price)
+        data = bb.check_proximity(price, upper, lower, proximity)
+        for alert_type in ('upper', 'lower'):
+            last = last_alert[alert_type]
+            if data[f'near_{alert_type}'] and (last is None or (open_time - last) / 1000 >= cooldown):
+                last_alert[alert_type] = open_time
+                expected.append((int(open_time), alert_type))
+
+    result = run_backtest(open_times, close, period, multiplier, proximity, cooldown)
+    alerts = result['alerts']
+    actual = list(zip(
+        ((alerts['timestamp'] - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).tolist(),
+        alerts['type']
+    ))
+
+    assert len(expected) > 10
+    assert sorted(actual) == sorted(expected)
+
+
+def test_forward_returns_and_stats():
+    open_times, close = _candles(2000)
+    result = run_backtest(open_times, close, proximity_percent=0.1, cooldown_seconds=0, horizons=(1, 10))
+    alerts = result['alerts']
+
+    index = ((alerts['timestamp'].iloc[0] - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)
+             - open_times[0]) // MINUTE_MS
+    assert alerts['return_1'].iloc[0] == pytest.approx((close[index + 1] / close[index] - 1) * 100)
+
+    stats = result['stats']
+    assert set(stats['horizon']) == {1, 10}
+    upper_count = stats[(stats['type'] == 'upper') & (stats['horizon'] == 1)]['count'].iloc[0]
+    assert upper_count == (alerts['type'] == 'upper').sum()
+
+
+def test_apply_cooldown_jumps_over_suppressed_candidates():
+    times = np.arange(10) * 100
+    mask = np.ones(10, dtype=bool)
+    assert apply_cooldown(times, mask, 250).tolist() == [0, 3, 6, 9]
+    assert apply_cooldown(times, mask, 0).tolist() == list(range(10))
+
+
+def test_one_million_candles_is_fast():
+    open_times, close = _candles(1_000_000)
+    run_backtest(open_times[:1000], close[:1000])
+
+    start = time.perf_counter()
+    run_backtest(open_times, close)
+    assert time.perf_counter() - start < 2.0
+
+
+def test_sweep_matches_single_backtest():
+    from src.sweep import run_sweep
+
+    candles = {'AAA': _candles(5000, seed=1), 'BBB': _candles(5000, seed=2)}
+    results = run_sweep(candles, periods=[14, 20], multipliers=[2.0], proximities=[0.05, 0.1],
+                        cooldowns=[0, 600], horizons=[5], workers=2)
+    assert len(results) == 2 * 2 * 1 * 2 * 2
+
+    row = results[(results['symbol'] == 'BBB') & (results['period'] == 20)
+                  & (results['proximity_percent'] == 0.1) & (results['cooldown'] == 600)].iloc[0]
+    alerts = run_backtest(*candles['BBB'], period=20, multiplier=2.0, proximity_percent=0.1,
+                          cooldown_seconds=600, horizons=(5,))['alerts']
+    upper = alerts[alerts['type'] == 'upper']
+
+    assert row['upper_alerts'] == len(upper)
+    assert row['lower_alerts'] == len(alerts) - len(upper)
+    assert row['upper_mean_5'] == pytest.approx(upper['return_5'].mean())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Tests du flux WebSocket Binance contre un serveur WebSocket local"""
+import asyncio
+import json
+
+import aiohttp
+import numpy as np
+import pandas as pd
+import pytest
+from websockets.asyncio.server import serve
+
+from src.async_fetchers import AsyncFetcherError
+from src.binance_stream import BinanceStreamSource
+from src.metrics import Metrics
+from src.watchlist import Subscription
+
+HOUR_MS = 3_600_000
+START_MS = 1_700_000_000_000
+
+
+class FakeRestFetcher:
+    """Historique REST en mémoire (même interface que AsyncBinanceFetcher.get_candles)"""
+
+    def __init__(self, closes):
+        self.closes = list(closes)
+        self.calls = 0
+
+    def open_time(self, index: int) -> int:
+        return START_MS + index * HOUR_MS
+
+    async def get_candles(self, symbol, interval, size):
+        self.calls += 1
+        closes = self.closes[-size:]
+        first = len(self.closes) - len(closes)
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime([self.open_time(first + i) for i in range(len(closes))], unit='ms'),
+            'close': closes
+        })
+
+
+def _kline(open_time: int, close: float, closed: bool = False,
+           high: float = None, low: float = None) -> str:
+    return json.dumps({
+        "stream": "btcusdt@kline_1h",
+        "data": {"e": "kline", "s": "BTCUSDT",
+                 "k": {"t": open_time, "i": "1h", "s": "BTCUSDT", "c": str(close),
+                       "h": str(close if high is None else high),
+                       "l": str(close if low is None else low), "x": closed}}
+    })
+
+
+def _book_ticker(bid: float, ask: float) -> str:
+    return json.dumps({
+        "stream": "btcusdt@bookTicker",
+        "data": {"u": 1, "s": "BTCUSDT", "b": str(bid), "B": "1", "a": str(ask), "A": "1"}
+    })
+
+
+def _expected_bands(closes, period=20, multiplier=2.0):
+    series = pd.Series(closes[-period:])
+    basis = series.mean()
+    std = series.std()
+    return basis + multiplier * std, basis, basis - multiplier * std
+
+
+def test_stream_seeds_updates_and_reconnects_with_backfill():
+    rng = np.random.default_rng(1)
+    rest = FakeRestFetcher(60000 + np.cumsum(rng.normal(0, 100, 80)))
+    events = []
+    paths = []
+
+    async def scenario():
+        connection_count = 0
+
+        async def handler(ws):
+            nonlocal connection_count
+            connection_count += 1
+            paths.append(ws.request.path)
+            last = len(rest.closes) - 1
+            if connection_count == 1:
+                # Mise à jour de la bougie ouverte puis nouvelle bougie
+                await ws.send(_kline(rest.open_time(last), 60500.0))
+                rest.closes[-1] = 60500.0
+                await ws.send(_kline(rest.open_time(last + 1), 60600.0))
+                rest.closes.append(60600.0)
+                await ws.send(_book_ticker(60590.0, 60610.0))
+                # Le marché avance pendant la coupure : 3 bougies manquées
+                rest.closes.extend([60700.0, 60800.0, 60900.0])
+                await ws.close()
+            else:
+                await ws.send(_kline(rest.open_time(last), 61000.0))
+                rest.closes[-1] = 61000.0
+                await asyncio.sleep(0.05)
+                await source.stop()
+                await ws.wait_closed()
+
+        async with serve(handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            source = BinanceStreamSource(
+                [Subscription('BTCUSDT', '1h')], rest,
+                on_event=lambda *args: events.append(args),
+                ws_url=f"ws://127.0.0.1:{port}", reconnect_delay=0.01
+            )
+            await asyncio.wait_for(source.run(), timeout=10)
+            return source
+
+    source = asyncio.run(scenario())
+    subscription = source.subscriptions[0]
+
+    assert paths[0] == "/stream?streams=btcusdt@kline_1h/btcusdt@bookTicker"
+    assert source.reconnects == 1
+    # Historique initial + rattrapage après reconnexion
+    assert rest.calls == 2
+    assert len(events) == 4
+    assert events[2][1]['current_price'] == 60600.0
+
+    for actual, expected in zip(subscription.bands.current_bands(), _expected_bands(rest.closes)):
+        assert actual == pytest.approx(expected, rel=1e-9)
+    assert subscription.last_open_time == rest.open_time(len(rest.closes) - 1)
+
+
+class FlakyRestFetcher(FakeRestFetcher):
+    """Historique REST dont certains appels échouent (limite de débit, coupure réseau)"""
+
+    def __init__(self, closes, failures):
+        super().__init__(closes)
+        self.failures = failures
+
+    async def get_candles(self, symbol, interval, size):
+        error = self.failures.pop(self.calls + 1, None)
+        if error is not None:
+            self.calls += 1
+            raise error
+        return await super().get_candles(symbol, interval, size)
+
+
+def test_failed_initial_and_reconnect_backfills_are_retried():
+    rng = np.random.default_rng(2)
+    rest = FlakyRestFetcher(60000 + np.cumsum(rng.normal(0, 100, 80)), failures={
+        1: AsyncFetcherError("Too many requests", status=429),
+        3: aiohttp.ClientConnectionError("Connection reset by peer"),
+    })
+    events = []
+    connections = []
+    metrics = Metrics()
+
+    async def scenario():
+        async def handler(ws):
+            connections.append(rest.calls)
+            if len(connections) == 1:
+                await ws.close()
+            elif len(connections) == 2:
+                # Le rattrapage du client échoue : il ferme la connexion
+                await ws.wait_closed()
+            else:
+                await ws.send(_kline(rest.open_time(len(rest.closes) - 1), 61000.0))
+                await asyncio.sleep(0.05)
+                await source.stop()
+                await ws.wait_closed()
+
+        async with serve(handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            source = BinanceStreamSource(
+                [Subscription('BTCUSDT', '1h')], rest,
+                on_event=lambda *args: events.append(args),
+                ws_url=f"ws://127.0.0.1:{port}", reconnect_delay=0.01, metrics=metrics
+            )
+            await asyncio.wait_for(source.run(), timeout=10)
+            return source
+
+    source = asyncio.run(scenario())
+
+    # 429 sur l'historique initial, coupure réseau pendant le premier rattrapage
+    assert rest.calls == 4 and rest.failures == {}
+    assert connections == [2, 2, 3]
+    assert source.reconnects == 3
+    assert len(events) == 1 and events[0][1]['current_price'] == 61000.0
+    # La fermeture propre de la première connexion n'est pas une erreur
+    assert metrics.counter_value('fetch_errors_total', stage='stream') == 2
+    labels = {'symbol': 'BTCUSDT', 'interval': '1h'}
+    assert metrics.histogram_count('stage_seconds', stage='calculate', **labels) == 1
+    assert metrics.histogram_count('stage_seconds', stage='check_proximity', **labels) == 1
+
+
+def test_bad_messages_and_failing_callback_do_not_end_the_stream():
+    rng = np.random.default_rng(3)
+    rest = FakeRestFetcher(60000 + np.cumsum(rng.normal(0, 100, 80)))
+    events = []
+
+    def on_event(subscription, proximity_data, alerts):
+        events.append(proximity_data)
+        if len(events) == 1:
+            raise RuntimeError("notifier indisponible")
+
+    async def scenario():
+        async def handler(ws):
+            last = rest.open_time(len(rest.closes) - 1)
+            await ws.send("pas du json")
+            await ws.send(json.dumps({"data": {"e": "kline", "k": {"s": "BTCUSDT", "i": "1h"}}}))
+            await ws.send(_kline(last, 60100.0))
+            await ws.send(_kline(last, 60200.0))
+            await asyncio.sleep(0.05)
+            await source.stop()
+            await ws.wait_closed()
+
+        async with serve(handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            source = BinanceStreamSource(
+                [Subscription('BTCUSDT', '1h')], rest, on_event=on_event,
+                ws_url=f"ws://127.0.0.1:{port}", reconnect_delay=0.01, book_ticker=False
+            )
+            await asyncio.wait_for(source.run(), timeout=10)
+            return source
+
+    source = asyncio.run(scenario())
+    assert source.reconnects == 0
+    # JSON invalide, kline incomplète, notifier en erreur : messages ignorés, flux conservé
+    assert source.message_errors == 3
+    assert len(events) == 2 and source.last_prices['BTCUSDT'] == 60200.0
+
+
+def test_gap_in_stream_triggers_rest_backfill():
+    rng = np.random.default_rng(2)
+    rest = FakeRestFetcher(100 + np.cumsum(rng.normal(0, 1, 80)))
+    source = BinanceStreamSource([Subscription('BTCUSDT', '1h')], rest)
+
+    async def scenario():
+        await source.backfill()
+        # Deux bougies sautées : le flux ne peut pas être appliqué tel quel
+        rest.closes.extend([101.0, 102.0, 103.0])
+        await source.handle_message(json.loads(_kline(rest.open_time(len(rest.closes) - 1), 103.5)))
+
+    asyncio.run(scenario())
+    rest.closes[-1] = 103.5
+
+    assert rest.calls == 2
+    for actual, expected in zip(source.subscriptions[0].bands.current_bands(),
+                                _expected_bands(rest.closes)):
+        assert actual == pytest.approx(expected, rel=1e-9)
+
+
+def test_book_ticker_triggers_alert_near_band():
+    rest = FakeRestFetcher([100.0, 101.0] * 40)
+    alerts = []
+    source = BinanceStreamSource(
+        [Subscription('BTCUSDT', '1h', proximity_percent=0.5)], rest,
+        on_event=lambda subscription, proximity, new_alerts: alerts.extend(new_alerts)
+    )
+
+    async def scenario():
+        await source.backfill()
+        upper = source.subscriptions[0].bands.current_bands()[0]
+        await source.handle_message(json.loads(_book_ticker(upper - 0.01, upper + 0.01)))
+
+    asyncio.run(scenario())
+
+    assert [alert['type'] for alert in alerts] == ['upper']
+    assert alerts[0]['symbol'] == 'BTCUSDT'
+
+
+class FakeArrayRestFetcher(FakeRestFetcher):
+    """Historique REST en tableaux avec plus hauts / plus bas (comme AsyncBinanceFetcher)"""
+
+    async def get_kline_arrays(self, symbol, interval, limit=100, fields=('open_time', 'close')):
+        self.calls += 1
+        closes = np.array(self.closes[-limit:])
+        first = len(self.closes) - len(closes)
+        arrays = {'open_time': np.array([self.open_time(first + i) for i in range(len(closes))]),
+                  'close': closes, 'high': closes + 0.1, 'low': closes - 0.1}
+        return {field: arrays[field] for field in fields}
+
+
+def test_stream_kline_wick_touching_band_triggers_intrabar_alert():
+    rest = FakeArrayRestFetcher(100 + 2 * np.sin(np.arange(80) / 3))
+    alerts = []
+    subscription = Subscription('BTCUSDT', '1h', proximity_percent=0.5, intrabar=True)
+    source = BinanceStreamSource(
+        [subscription], rest,
+        on_event=lambda subscription, proximity, new_alerts: alerts.extend(new_alerts)
+    )
+
+    async def scenario():
+        await source.backfill()
+        upper, basis, _ = subscription.bands.current_bands()
+        # La mèche a touché la bande haute, la clôture est revenue au milieu
+        last = rest.open_time(len(rest.closes) - 1)
+        await source.handle_message(json.loads(_kline(last, basis, high=upper * 1.001, low=basis - 0.1)))
+
+    asyncio.run(scenario())
+
+    assert [alert['type'] for alert in alerts] == ['upper']
+    assert alerts[0]['details']['intrabar_high'] > alerts[0]['price']
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Tests du mode streaming des Bandes de Bollinger (parité avec pandas)"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bollinger_bands import BollingerBands, RollingWindow, bollinger_batch
+
+
+def _random_walk(n: int, start: float = 60000.0, seed: int = 42) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return start + np.cumsum(rng.normal(0, start * 0.002, n))
+
+
+def _assert_close(actual, expected):
+    for a, e in zip(actual, expected):
+        if math.isnan(e):
+            assert math.isnan(a)
+        else:
+            assert a == pytest.approx(e, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("period,multiplier", [(20, 2.0), (5, 1.5), (50, 2.5)])
+def test_update_matches_pandas(period, multiplier):
+    prices = _random_walk(3000)
+    bb = BollingerBands(period, multiplier)
+    upper, basis, lower = bb.calculate(pd.Series(prices))
+
+    for i, price in enumerate(prices):
+        result = bb.update(price)
+        _assert_close(result, (upper.iloc[i], basis.iloc[i], lower.iloc[i]))
+
+
+def test_replace_last_matches_pandas():
+    """Simule des ticks sur la bougie ouverte avant sa clôture"""
+    rng = np.random.default_rng(7)
+    closes = _random_walk(500)
+    bb = BollingerBands(20, 2.0)
+    bb.seed(closes[:100])
+    history = list(closes[:100])
+
+    for close in closes[100:]:
+        bb.update(close)
+        history.append(close)
+        for _ in range(3):
+            tick = close + rng.normal(0, 50)
+            history[-1] = tick
+            result = bb.replace_last(tick)
+
+        upper, basis, lower = bb.calculate(pd.Series(history))
+        _assert_close(result, (upper.iloc[-1], basis.iloc[-1], lower.iloc[-1]))
+
+
+def test_seed_uses_last_period_prices():
+    prices = _random_walk(200)
+    bb = BollingerBands(20, 2.0)
+    upper, basis, lower = bb.calculate(pd.Series(prices))
+
+    _assert_close(bb.seed(prices), (upper.iloc[-1], basis.iloc[-1], lower.iloc[-1]))
+    assert bb.is_ready
+
+
+def test_not_ready_returns_nan():
+    bb = BollingerBands(20, 2.0)
+    for price in _random_walk(19):
+        assert all(math.isnan(v) for v in bb.update(price))
+    assert not bb.is_ready
+
+
+def test_trigger_prices_never_skip_a_near_band_tick():
+    rng = np.random.default_rng(3)
+    bb = BollingerBands(20, 2.0)
+    bb.seed(_random_walk(100))
+
+    for close in _random_walk(200, seed=5):
+        upper, _, lower = bb.replace_last(close)
+        # Ticks autour des deux bandes, dont les seuils exacts
+        ticks = np.concatenate([rng.uniform(lower * 0.98, upper * 1.02, 50),
+                                [upper * 0.995, upper * 1.005, lower * 0.995, lower * 1.005]])
+        for tick in ticks:
+            data = bb.check_proximity(tick, upper, lower, 0.5)
+            if data['near_upper'] or data['near_lower']:
+                assert bb.may_be_near(tick, 0.5)
+
+    # Prix au milieu des bandes : écarté sans calcul complet
+    upper, basis, lower = bb.current_bands()
+    assert not bb.may_be_near(basis, 0.5)
+    assert bb.trigger_prices(0.5) == pytest.approx((lower * 1.005, upper * 0.995))
+
+
+def test_rolling_window_stays_accurate_over_long_runs():
+    """Le recalcul périodique évite la dérive numérique"""
+    prices = _random_walk(20000, start=30000.0)
+    window = RollingWindow(20)
+    for price in prices:
+        window.append(price)
+        window.replace_last(price + 0.5)
+
+    expected = pd.Series(window.values())
+    assert window.mean == pytest.approx(expected.mean(), rel=1e-12)
+    assert window.std == pytest.approx(expected.std(), rel=1e-9)
+
+
+def test_batch_matches_calculate_per_symbol():
+    matrix = np.stack([_random_walk(1500, seed=seed) for seed in range(4)])
+    bands = bollinger_batch(matrix, periods=(5, 20, 50), multipliers=(1.5, 2.0), chunk_size=256)
+    assert len(bands) == 6
+
+    for (period, multiplier), (upper, basis, lower) in bands.items():
+        for row, prices in enumerate(matrix):
+            expected = BollingerBands(period, multiplier).calculate(pd.Series(prices))
+            for actual, reference in zip((upper, basis, lower), expected):
+                np.testing.assert_allclose(actual[row], reference.to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_batch_ragged_inputs_are_aligned_on_last_candle():
+    series = [_random_walk(n, seed=n) for n in (300, 25, 120)]
+    upper, basis, lower = bollinger_batch(series, periods=(20,), multipliers=(2.0,))[(20, 2.0)]
+    assert upper.shape == (3, 300)
+
+    for row, prices in enumerate(series):
+        expected = BollingerBands(20, 2.0).calculate(pd.Series(prices))
+        np.testing.assert_allclose(basis[row, -len(prices):], expected[1].to_numpy(), rtol=1e-9)
+        np.testing.assert_allclose(upper[row, -len(prices):], expected[0].to_numpy(), rtol=1e-9)
+        assert np.isnan(basis[row, :300 - len(prices) + 19]).all()
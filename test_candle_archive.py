@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Tests de l'archive historique en colonnes memmap"""
+import os
+
+import numpy as np
+
+from src.bollinger_bands import bollinger_arrays
+from src.candle_archive import CandleArchive
+
+MINUTE_MS = 60_000
+
+
+def _candles(first: int, count: int, offset: float = 0.0) -> dict:
+    open_time = first + MINUTE_MS * np.arange(count, dtype=np.int64)
+    close = 100 + np.sin(open_time / MINUTE_MS / 7) + offset
+    return {'open_time': open_time, 'open': close, 'high': close + 1, 'low': close - 1,
+            'close': close, 'volume': np.ones(count)}
+
+
+def test_append_merges_overlaps_and_opens_zero_copy_ranges(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    assert archive.open('binance', 'BTCUSDT', '1m')['close'].shape == (0,)
+
+    archive.append('binance', 'BTCUSDT', '1m', _candles(0, 500))
+    # Page qui recouvre la fin (bougie remplacée), puis page arrivée en désordre
+    archive.append('binance', 'BTCUSDT', '1m', _candles(450 * MINUTE_MS, 100, offset=1.0))
+    later = _candles(600 * MINUTE_MS, 50)
+    archive.append('binance', 'BTCUSDT', '1m', {k: v[::-1] for k, v in later.items()})
+    assert archive.append('binance', 'BTCUSDT', '1m', _candles(550 * MINUTE_MS, 50)) == 650
+
+    # Nouvelle instance : seul l'index est relu
+    archive = CandleArchive(str(tmp_path))
+    arrays = archive.open('binance', 'BTCUSDT', '1m')
+    assert np.array_equal(arrays['open_time'], np.arange(650) * MINUTE_MS)
+    assert arrays['close'][449] == _candles(0, 500)['close'][449]
+    assert arrays['close'][450] == _candles(450 * MINUTE_MS, 1, offset=1.0)['close'][0]
+    assert archive.info('binance', 'BTCUSDT', '1m')['last_open_time'] == 649 * MINUTE_MS
+
+    window = archive.open('binance', 'BTCUSDT', '1m', fields=('close',),
+                          start=100 * MINUTE_MS, end=199 * MINUTE_MS + 1)
+    assert isinstance(window['close'], np.memmap) and len(window['close']) == 100
+
+    # Bandes d'une plage : identiques au calcul sur toute la série, dès la première bougie
+    open_time, upper, basis, lower = archive.bands('binance', 'BTCUSDT', '1m', period=20,
+                                                   start=100 * MINUTE_MS, end=199 * MINUTE_MS)
+    full_upper, _, full_lower = bollinger_arrays(np.asarray(arrays['close']), 20)
+    assert open_time[0] == 100 * MINUTE_MS
+    assert np.allclose(upper, full_upper[100:200]) and np.allclose(lower, full_lower[100:200])
+
+
+
+def test_overlapping_append_leaves_open_readers_on_old_version(tmp_path):
+    archive = CandleArchive(str(tmp_path))
+    archive.append('binance', 'BTCUSDT', '1m', _candles(0, 500))
+    before = archive.open('binance', 'BTCUSDT', '1m')
+    old_close = np.array(before['close'])
+
+    # Page qui recouvre la fin : colonnes remplacées, pas réécrites en place
+    archive.append('binance', 'BTCUSDT', '1m', _candles(450 * MINUTE_MS, 100, offset=1.0))
+    assert np.array_equal(before['close'], old_close)
+    assert np.array_equal(before['open_time'], np.arange(500) * MINUTE_MS)
+
+    after = archive.open('binance', 'BTCUSDT', '1m')
+    assert len(after['close']) == 550 and after['close'][450] == old_close[450] + 1.0
+    assert not any(name.endswith('.tmp') for name in os.listdir(tmp_path / 'binance' / 'BTCUSDT' / '1m'))
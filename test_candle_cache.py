@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Tests du cache local des bougies et de la récupération incrémentale"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.candle_cache import CandleCache
+from src.data_fetcher import DataFetcher, klines_to_arrays, klines_to_dataframe
+
+MINUTE_MS = 60_000
+
+
+class FakeBinanceClient:
+    """Client Binance en mémoire : une bougie par `step_ms` jusqu'à `now`"""
+
+    def __init__(self, now_ms: int, count: int, step_ms: int = MINUTE_MS):
+        self.step_ms = step_ms
+        self.now_ms = now_ms - now_ms % step_ms
+        self.count = count
+        self.calls = []
+
+    def _kline(self, open_time: int):
+        close = 100 + (open_time // self.step_ms) % 13
+        return [open_time, str(close), str(close + 1), str(close - 1), str(close),
+                "5", open_time + self.step_ms - 1, "0", 1, "0", "0", "0"]
+
+    def get_klines(self, symbol, interval, limit, startTime=None):
+        self.calls.append({'limit': limit, 'startTime': startTime})
+        first = self.now_ms - (self.count - 1) * self.step_ms
+        if startTime is not None:
+            first = max(first, startTime)
+        open_times = range(first, self.now_ms + 1, self.step_ms)
+        if startTime is None:
+            open_times = open_times[-limit:]
+        return [self._kline(t) for t in open_times[:limit]]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CandleCache(str(tmp_path / "candles.db"))
+    yield cache
+    cache.close()
+
+
+def test_only_newer_candles_are_requested(cache):
+    client = FakeBinanceClient(int(time.time() * 1000), count=5000)
+    fetcher = DataFetcher(cache=cache, client=client)
+
+    first = fetcher.get_historical_klines('BTCUSDT', '1m', limit=70)
+    assert client.calls[-1] == {'limit': 70, 'startTime': None}
+
+    # Trois nouvelles bougies : seule la dernière bougie stockée et les suivantes sont demandées
+    client.now_ms += 3 * MINUTE_MS
+    second = fetcher.get_historical_klines('BTCUSDT', '1m', limit=70)
+    last_stored = client.now_ms - 3 * MINUTE_MS
+    assert client.calls[-1]['startTime'] == last_stored
+
+    assert len(second) == 70
+    assert second['timestamp'].is_monotonic_increasing
+    assert second['timestamp'].iloc[-1] - first['timestamp'].iloc[-1] == pd.Timedelta(minutes=3)
+    expected = fetcher.client._kline(client.now_ms)
+    assert second['close'].iloc[-1] == float(expected[4])
+
+
+def test_cache_survives_restart(tmp_path):
+    path = str(tmp_path / "candles.db")
+    client = FakeBinanceClient(int(time.time() * 1000), count=500)
+
+    cache = CandleCache(path)
+    DataFetcher(cache=cache, client=client).get_historical_klines('ETHUSDT', '1m', limit=100)
+    cache.close()
+
+    cache = CandleCache(path)
+    restarted = FakeBinanceClient(client.now_ms, count=500)
+    df = DataFetcher(cache=cache, client=restarted).get_historical_klines('ETHUSDT', '1m', limit=100)
+    cache.close()
+
+    assert restarted.calls[0]['startTime'] == client.now_ms
+    assert len(df) == 100
+
+
+def test_stale_cache_triggers_full_fetch(cache, monkeypatch):
+    client = FakeBinanceClient(int(time.time() * 1000), count=5000)
+    fetcher = DataFetcher(cache=cache, client=client)
+    fetcher.get_historical_klines('BTCUSDT', '1m', limit=50)
+
+    # 200 minutes plus tard : le cache ne contient plus aucune des 50 dernières bougies
+    client.now_ms += 200 * MINUTE_MS
+    monkeypatch.setattr(time, 'time', lambda: client.now_ms / 1000 + 1)
+    df = fetcher.get_historical_klines('BTCUSDT', '1m', limit=50)
+
+    assert client.calls[-1] == {'limit': 50, 'startTime': None}
+    assert df['timestamp'].diff().dropna().nunique() == 1
+
+
+def test_open_candle_ttl_skips_requests(tmp_path):
+    cache = CandleCache(str(tmp_path / "candles.db"), open_candle_ttl=30)
+    client = FakeBinanceClient(int(time.time() * 1000), count=500, step_ms=86_400_000)
+    fetcher = DataFetcher(cache=cache, client=client)
+
+    for _ in range(5):
+        fetcher.get_historical_klines('BTCUSDT', '1d', limit=60)
+
+    assert len(client.calls) == 1
+    cache.close()
+
+
+def test_kline_arrays_match_dataframe(cache):
+    client = FakeBinanceClient(int(time.time() * 1000), count=500)
+    klines = client.get_klines('BTCUSDT', '1m', limit=200)
+    df = klines_to_dataframe(klines)
+
+    arrays = klines_to_arrays(klines, fields=('open_time', 'high', 'close'))
+    assert set(arrays) == {'open_time', 'high', 'close'}
+    assert arrays['open_time'].dtype == np.int64
+    np.testing.assert_array_equal(arrays['close'], df['close'].to_numpy())
+    np.testing.assert_array_equal(arrays['high'], df['high'].to_numpy())
+
+    # Même résultat avec et sans cache
+    direct = DataFetcher(client=client).get_kline_arrays('BTCUSDT', '1m', limit=200)
+    cached = DataFetcher(cache=cache, client=client).get_kline_arrays('BTCUSDT', '1m', limit=200)
+    for field in ('open_time', 'close'):
+        np.testing.assert_array_equal(direct[field], arrays[field])
+        np.testing.assert_array_equal(cached[field], arrays[field])
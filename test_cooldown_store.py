@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Tests de l'état des cooldowns (partagé entre processus, par règle, hystérésis)"""
+import multiprocessing
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.alert_manager import AlertManager
+from src.cooldown_store import SQLiteCooldownStore
+from src.watchlist import Subscription, load_subscriptions
+
+START = datetime(2024, 1, 1)
+
+
+def _proximity(distance_upper: float, threshold: float = 0.5) -> dict:
+    return {
+        'near_upper': distance_upper <= threshold, 'near_lower': False,
+        'distance_upper_pct': distance_upper, 'distance_lower_pct': 5.0,
+        'current_price': 100.0, 'upper_band': 100.5, 'lower_band': 95.0,
+    }
+
+
+class Clock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+
+def _acquire_once(path, results):
+    store = SQLiteCooldownStore(path)
+    results.put(store.acquire(('BTCUSDT', '1h', 'upper', 'bb20x2'), START.timestamp(), 300))
+    store.close()
+
+
+def test_shared_store_blocks_duplicates_across_processes_and_restarts(tmp_path):
+    path = str(tmp_path / "cooldowns.db")
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [context.Process(target=_acquire_once, args=(path, results)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+    assert sorted(results.get(timeout=5) for _ in processes) == [False, False, False, True]
+
+    # Redémarrage : nouveau gestionnaire, même fichier, cooldown toujours actif
+    clock = Clock()
+    manager = AlertManager('BTCUSDT', '1h', store=SQLiteCooldownStore(path), rule='bb20x2')
+    manager.clock = clock
+    clock.now = START + timedelta(seconds=200)
+    assert manager.check_and_alert(_proximity(0.1)) == []
+    assert manager.last_alert_upper == START
+    clock.now = START + timedelta(seconds=301)
+    assert len(manager.check_and_alert(_proximity(0.1))) == 1
+    manager.store.close()
+
+
+def test_hysteresis_rearms_only_after_price_leaves_zone():
+    clock = Clock()
+    manager = AlertManager('BTCUSDT', '1h', cooldown_seconds=0, rearm_distance=1.0)
+    manager.clock = clock
+
+    assert len(manager.check_and_alert(_proximity(0.2))) == 1
+    # Le prix oscille autour du seuil sans quitter la zone de réarmement
+    for distance in (0.6, 0.3, 0.9, 0.1):
+        clock.now += timedelta(minutes=1)
+        assert manager.check_and_alert(_proximity(distance)) == []
+
+    clock.now += timedelta(minutes=1)
+    manager.check_and_alert(_proximity(1.5))
+    assert len(manager.check_and_alert(_proximity(0.2))) == 1
+
+
+def test_per_rule_cooldowns_and_screened_ticks_rearm(tmp_path):
+    config = {
+        'bollinger_bands': {'period': 20, 'multiplier': 2.0, 'proximity_percent': 0.5},
+        'trading': {'symbol': 'BTCUSDT', 'interval': '1h'},
+        'watchlist': {'subscriptions': ['BTCUSDT', {'symbol': 'ETHUSDT', 'rule': 'slow'}]},
+        'cooldown': {'seconds': 60, 'rules': {'slow': 3600}, 'hysteresis': 0.5},
+    }
+    store = SQLiteCooldownStore(str(tmp_path / "cooldowns.db"))
+    btc, eth = load_subscriptions(config, cooldown_store=store)
+    assert (btc.rule, btc.alert_manager.cooldown_seconds) == ('bb20x2', 60)
+    assert (eth.rule, eth.alert_manager.cooldown_seconds) == ('slow', 3600)
+    assert btc.alert_manager.rearm_distance == 1.0
+
+    closes = 100 + 5 * np.sin(np.arange(40) / 3)
+    btc.ingest_candles(list(range(40)), list(closes))
+    btc.alert_manager.cooldown_seconds = 0
+    upper, basis, _ = btc.bands.current_bands()
+
+    _, alerts = btc.evaluate(upper, screen=True)
+    assert [a['type'] for a in alerts] == ['upper']
+    assert btc.evaluate(upper * 0.995, screen=True)[1] == []
+    # Prix au milieu des bandes : écarté par le filtre rapide, bande réarmée
+    assert btc.evaluate(basis, screen=True) == (None, [])
+    assert store.is_armed(btc.alert_manager.key('upper'))
+    assert len(btc.evaluate(upper, screen=True)[1]) == 1
+    store.close()
+
+
+def test_subscription_defaults_keep_independent_in_memory_cooldowns():
+    first, second = Subscription('BTCUSDT', '1h'), Subscription('BTCUSDT', '1h', period=50)
+    assert first.alert_manager.store is not second.alert_manager.store
+    assert first.rule != second.rule
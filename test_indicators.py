@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Tests du pipeline d'indicateurs"""
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+from src.indicators import IndicatorPipeline, near
+from src.watchlist import Subscription, load_subscriptions
+
+
+def _candles(count: int = 300, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    return close + rng.random(count), close - rng.random(count), close
+
+
+def test_streaming_indicators_match_reference_with_open_candle_updates():
+    high, low, close = _candles()
+    pipeline = IndicatorPipeline()
+    rsi, atr, bb = pipeline.rsi(14), pipeline.atr(14), pipeline.bollinger(20, 2.0)
+
+    values = {'rsi': [], 'atr': [], 'upper': []}
+    for h, l, c in zip(high, low, close):
+        # Bougie ouverte à un autre prix, puis clôture définitive
+        pipeline.update(c * 0.97, h, l)
+        pipeline.replace_last(c, h, l)
+        values['rsi'].append(rsi.value)
+        values['atr'].append(atr.value)
+        values['upper'].append(bb.value[0])
+
+    series = {name: pd.Series(v) for name, v in zip(('high', 'low', 'close'), (high, low, close))}
+    expected_rsi = ta.momentum.RSIIndicator(series['close'], 14).rsi()
+    expected_atr = ta.volatility.AverageTrueRange(
+        series['high'], series['low'], series['close'], 14
+    ).average_true_range()
+    expected_upper = series['close'].rolling(20).mean() + 2 * series['close'].rolling(20).std()
+
+    assert values['rsi'][14:] == pytest.approx(expected_rsi[14:].tolist())
+    assert values['atr'][13:] == pytest.approx(expected_atr[13:].tolist())
+    assert values['upper'][19:] == pytest.approx(expected_upper[19:].tolist())
+
+
+def test_intermediate_nodes_are_shared():
+    pipeline = IndicatorPipeline()
+    bb = pipeline.bollinger(20, 2.0)
+    kc = pipeline.keltner(20, 1.5, atr_period=14)
+    pipeline.atr(14)
+    pipeline.rsi(14)
+    pipeline.squeeze(bb, kc)
+    assert pipeline.bollinger(20, 2.0) is bb
+    assert bb.stats is kc.stats
+    # Canal de même période et multiplicateur mais autre ATR : nœud distinct
+    assert pipeline.keltner(20, 1.5, atr_period=10) is not kc
+    # close/high/low, clôture précédente, stats 20, true range, ATR 14, BB, KC, RSI,
+    # puis ATR 10 et son canal
+    assert len(pipeline) == 12
+
+    high, low, close = _candles(60)
+    pipeline.seed(close, high, low)
+    upper, basis, lower = kc.value
+    assert basis == pytest.approx(close[-20:].mean())
+    assert upper - basis == pytest.approx(1.5 * pipeline.atr(14).value)
+
+
+def test_subscription_alert_requires_combined_condition():
+    pipeline = IndicatorPipeline()
+    bb = pipeline.bollinger(20, 2.0)
+    rsi = pipeline.rsi(14)
+    subscription = Subscription(
+        'BTCUSDT', '1h', period=20, proximity_percent=1.0, indicators=pipeline,
+        filters={'upper': near(pipeline.close, bb.upper, 1.0) & (rsi > 70)}
+    )
+
+    # Tendance haussière régulière : RSI à 100, prix sur la bande haute
+    closes = list(np.linspace(100, 130, 60))
+    subscription.ingest_candles(list(range(60)), closes)
+    _, alerts = subscription.evaluate(closes[-1])
+    assert [a['type'] for a in alerts] == ['upper']
+
+    # Même prix proche de la bande, mais RSI qui retombe après une chute
+    subscription.alert_manager.last_alert_upper = None
+    pipeline.seed(closes[:40] + list(np.linspace(110, 100, 20)))
+    assert rsi.value < 70
+    _, alerts = subscription.evaluate(closes[-1])
+    assert alerts == []
+
+
+def test_configured_filters_share_rolling_stats_with_subscription_bands():
+    config = {
+        'bollinger_bands': {'period': 20, 'multiplier': 2.0, 'proximity_percent': 1.0},
+        'trading': {'symbol': 'BTCUSDT', 'interval': '1h'},
+        'filters': {'upper': [{'indicator': 'rsi', 'period': 14, 'above': 70},
+                              {'indicator': 'percent_b', 'above': 0.5}]},
+        'watchlist': {'subscriptions': ['BTCUSDT', {'symbol': 'ETHUSDT', 'filters': {}}]},
+    }
+    btc, eth = load_subscriptions(config)
+    assert eth.indicators is None and eth.filters is None
+    # Une seule moyenne / variance glissante : celle du pipeline
+    assert btc.bands._window is btc.indicators.rolling_stats(20).window
+
+    closes = list(np.linspace(100, 130, 60))
+    btc.ingest_candles(list(range(60)), closes)
+    expected = pd.Series(closes[-20:])
+    assert btc.bands.current_bands()[1] == pytest.approx(expected.mean())
+    assert [a['type'] for a in btc.evaluate(closes[-1])[1]] == ['upper']
+
+    # Chute récente : RSI sous 70, l'alerte haute est filtrée
+    btc.alert_manager.last_alert_upper = None
+    falling = closes[:40] + list(np.linspace(110, 100, 20))
+    btc.ingest_candles(list(range(100, 160)), falling)
+    upper = btc.bands.current_bands()[0]
+    assert btc.evaluate(upper)[1] == []
+
+    with pytest.raises(ValueError):
+        load_subscriptions({**config, 'filters': {'upper': [{'indicator': 'macd', 'above': 0}]}})
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Tests des métriques internes et de l'endpoint /metrics"""
+import urllib.request
+
+import numpy as np
+import pytest
+
+from src.metrics import NULL_METRICS, Metrics, MetricsServer
+from src.watchlist import Subscription, WatchlistScheduler
+
+
+def test_render_prometheus_text():
+    metrics = Metrics()
+    metrics.describe('stage_seconds', "Durée des étapes")
+    for value in (0.002, 0.02, 3.0):
+        metrics.observe('stage_seconds', value, stage='klines', symbol='BTCUSDT')
+    metrics.inc('fetch_errors_total', stage='tickers')
+    metrics.register_callback('notifier_queue_depth', 'gauge', lambda: {(('notifier', 'Console'),): 4})
+
+    text = metrics.render()
+    assert '# HELP bollinger_stage_seconds Durée des étapes' in text
+    assert '# TYPE bollinger_stage_seconds histogram' in text
+    assert 'bollinger_stage_seconds_bucket{stage="klines",symbol="BTCUSDT",le="0.005"} 1' in text
+    assert 'bollinger_stage_seconds_bucket{stage="klines",symbol="BTCUSDT",le="+Inf"} 3' in text
+    assert 'bollinger_stage_seconds_count{stage="klines",symbol="BTCUSDT"} 3' in text
+    assert 'bollinger_fetch_errors_total{stage="tickers"} 1.0' in text
+    assert 'bollinger_notifier_queue_depth{notifier="Console"} 4.0' in text
+    assert 'stage_seconds klines BTCUSDT: n=3' in metrics.summary()
+
+
+def test_metrics_endpoint():
+    metrics = Metrics()
+    metrics.inc('fetch_errors_total', stage='klines')
+    server = MetricsServer(metrics, port=0)
+    try:
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            body = response.read().decode()
+        assert 'bollinger_fetch_errors_total{stage="klines"} 1.0' in body
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(server.url.replace('/metrics', '/'), timeout=5)
+    finally:
+        server.close()
+
+
+class FakeFetcher:
+    def get_current_prices(self, symbols):
+        return {symbol: 100.0 for symbol in symbols}
+
+    def get_kline_arrays(self, symbol, interval, limit=100, fields=('open_time', 'close')):
+        if symbol == 'BAD':
+            raise ConnectionError("timeout")
+        return {'open_time': np.arange(limit, dtype=np.int64),
+                'close': np.linspace(90, 110, limit)}
+
+
+def test_scheduler_records_stage_timings_and_errors():
+    metrics = Metrics()
+    subscriptions = [Subscription('BTCUSDT', '1h'), Subscription('BAD', '1h')]
+    scheduler = WatchlistScheduler(FakeFetcher(), subscriptions, metrics=metrics)
+    try:
+        scheduler.run_once()
+        scheduler.run_once()
+    finally:
+        scheduler.close()
+
+    labels = {'symbol': 'BTCUSDT', 'interval': '1h'}
+    assert metrics.histogram_count('stage_seconds', stage='tickers') == 2
+    for stage in ('klines', 'calculate', 'check_proximity'):
+        assert metrics.histogram_count('stage_seconds', stage=stage, **labels) == 2
+    assert metrics.counter_value('fetch_errors_total', stage='klines', symbol='BAD', interval='1h') == 2
+
+
+class EventDrivenScheduler:
+    """Scheduler événementiel qui programme une attente courte, puis s'arrête"""
+
+    event_driven = True
+
+    def __init__(self, cycles: int):
+        self.cycles = cycles
+
+    def run_once(self):
+        if not self.cycles:
+            raise KeyboardInterrupt
+        self.cycles -= 1
+        return []
+
+    def next_delay(self, max_interval, min_interval):
+        return 0.02
+
+
+def test_loop_lag_is_measured_against_scheduled_delay():
+    from main import run_polling
+
+    metrics = Metrics()
+    with pytest.raises(KeyboardInterrupt):
+        run_polling(EventDrivenScheduler(3), None, check_interval=60, metrics=metrics)
+    # Mesuré contre check_interval, le retard serait d'environ -60 s
+    assert 0 <= metrics.gauge_value('loop_lag_last_seconds') < 0.5
+    assert metrics.histogram_count('loop_lag_seconds') == 3
+
+
+def test_null_metrics_is_inert():
+    with NULL_METRICS.timer('stage_seconds', stage='klines'):
+        pass
+    NULL_METRICS.inc('fetch_errors_total')
+    assert NULL_METRICS.render() == ""
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Tests de l'envoi des notifications en arrière-plan"""
+import smtplib
+import threading
+import time
+
+from src.notifiers import EmailNotifier, NotificationManager, TelegramNotifier
+
+
+def _alert(index: int = 0) -> dict:
+    return {
+        'type': 'upper',
+        'message': f"🔴 Alerte {index}",
+        'price': 100.0 + index,
+        'band_value': 101.0,
+        'distance_pct': 0.1,
+        'timestamp': '2024-01-01T12:00:00',
+        'symbol': 'BTCUSDT',
+    }
+
+
+class RecordingNotifier:
+    """Notifier lent qui enregistre les messages reçus"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.messages = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def send(self, alert):
+        self.release.wait()
+        time.sleep(self.delay)
+        self.messages.append([alert])
+
+    def send_batch(self, alerts):
+        self.release.wait()
+        time.sleep(self.delay)
+        self.messages.append(list(alerts))
+
+
+def test_slow_notifier_does_not_block_and_burst_is_coalesced():
+    notifier = RecordingNotifier(delay=0.5)
+    manager = NotificationManager(batch_window=0.1)
+    manager.add_notifier(notifier)
+
+    start = time.perf_counter()
+    for i in range(5):
+        manager.send_alert(_alert(i))
+    assert time.perf_counter() - start < 0.05
+
+    manager.flush()
+    assert len(notifier.messages) == 1
+    assert [a['price'] for a in notifier.messages[0]] == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert manager.stats()['RecordingNotifier']['sent'] == 5
+    manager.close()
+
+
+def test_bounded_queue_drops_and_counts_overflow():
+    notifier = RecordingNotifier()
+    notifier.release.clear()
+    manager = NotificationManager(queue_size=3, batch_window=0.0)
+    manager.add_notifier(notifier)
+
+    manager.send_alert(_alert(0))
+    time.sleep(0.05)  # Le worker bloque sur la première alerte
+    for i in range(1, 8):
+        manager.send_alert(_alert(i))
+
+    assert manager.stats()['RecordingNotifier']['dropped'] == 4
+    notifier.release.set()
+    manager.close()
+    assert sum(len(m) for m in notifier.messages) == 4
+
+
+class FakeSMTP:
+    """Serveur SMTP en mémoire qui compte les connexions"""
+
+    connections = 0
+    sent = []
+    fail_next = False
+
+    def __init__(self, host, port, timeout=None):
+        FakeSMTP.connections += 1
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, message):
+        if FakeSMTP.fail_next:
+            FakeSMTP.fail_next = False
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        FakeSMTP.sent.append(message['Subject'])
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_email_reuses_connection_and_reconnects(monkeypatch):
+    monkeypatch.setattr(smtplib, 'SMTP', FakeSMTP)
+    FakeSMTP.connections, FakeSMTP.sent = 0, []
+    notifier = EmailNotifier('smtp.local', 587, 'a@b.c', 'secret', 'd@e.f')
+
+    notifier.send(_alert(0))
+    notifier.send(_alert(1))
+    assert FakeSMTP.connections == 1
+
+    FakeSMTP.fail_next = True
+    notifier.send_batch([_alert(2), _alert(3)])
+    assert FakeSMTP.connections == 2
+    assert FakeSMTP.sent[-1] == "Trading Alert - 2 alertes"
+    assert len(FakeSMTP.sent) == 3
+    notifier.close()
+
+
+class FakeSession:
+    """Session HTTP qui enregistre les messages Telegram, ou échoue"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.texts = []
+
+    def post(self, url, json=None, timeout=None):
+        if self.fail:
+            raise ConnectionError("api.telegram.org injoignable")
+        self.texts.append(json['text'])
+        return self
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_telegram_batch_is_split_under_message_limit():
+    notifier = TelegramNotifier('token', 'chat')
+    notifier.session = FakeSession()
+
+    notifier.send_batch([_alert(i) for i in range(60)])
+    texts = notifier.session.texts
+    assert len(texts) > 1
+    assert all(len(text) <= TelegramNotifier.MAX_MESSAGE_LENGTH for text in texts)
+    assert texts[0].startswith("🚨 60 alertes")
+    assert sum(text.count("🔴 Alerte") for text in texts) == 60
+
+
+def test_delivery_failures_are_counted_by_worker(monkeypatch):
+    notifier = TelegramNotifier('token', 'chat')
+    notifier.session = FakeSession(fail=True)
+    manager = NotificationManager(batch_window=0.0)
+    manager.add_notifier(notifier)
+
+    manager.send_alert(_alert(0))
+    manager.flush()
+    assert manager.stats()['TelegramNotifier']['errors'] == 1
+    assert manager.stats()['TelegramNotifier']['sent'] == 0
+    manager.close()
+
+
+def test_oversized_telegram_alert_is_split_between_lines():
+    notifier = TelegramNotifier('token', 'chat')
+    notifier.session = FakeSession()
+    long_alert = dict(_alert(0), message="\n".join(f"<b>ligne {i}</b>" for i in range(600)))
+
+    notifier.send_batch([_alert(1), long_alert])
+    texts = notifier.session.texts
+    assert len(texts) > 1
+    assert all(len(text) <= TelegramNotifier.MAX_MESSAGE_LENGTH for text in texts)
+    # Aucune balise coupée : chaque ligne de l'alerte arrive entière
+    lines = [line for text in texts for line in text.splitlines() if line.startswith("<b>")]
+    assert lines == [f"<b>ligne {i}</b>" for i in range(600)]
+
+
+def test_failed_send_is_logged_once(capsys):
+    notifier = TelegramNotifier('token', 'chat')
+    notifier.session = FakeSession(fail=True)
+    manager = NotificationManager(batch_window=0.0)
+    manager.add_notifier(notifier)
+    manager.send_alert(_alert(0))
+    manager.flush()
+    manager.close()
+    assert capsys.readouterr().out.count("injoignable") == 1
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Tests du registre de plugins (imports à la demande)"""
+import subprocess
+import sys
+
+import pytest
+
+from src import plugins
+
+
+def test_main_does_not_import_unselected_plugins():
+    code = ("import sys, main; "
+            "print(','.join(m for m in ('binance', 'twelvedata', 'aiohttp', 'requests', 'smtplib', 'pandas') "
+            "if m in sys.modules))")
+    output = subprocess.check_output([sys.executable, '-c', code], text=True)
+    assert output.strip() == ''
+
+
+def test_load_imports_registered_plugin():
+    from src.notifiers import ConsoleNotifier
+    assert plugins.load('notifier', 'console') is ConsoleNotifier
+
+    plugins.register('notifier', 'custom', 'src.notifiers:ConsoleNotifier')
+    try:
+        assert plugins.load('notifier', 'custom') is ConsoleNotifier
+    finally:
+        del plugins.NOTIFIERS['custom']
+
+    with pytest.raises(ValueError, match="inconnu"):
+        plugins.load('fetcher', 'kraken')
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Tests du limiteur de débit partagé par les fetchers"""
+import threading
+import time
+
+import pytest
+
+from src.data_fetcher import DataFetcher
+from src.rate_limiter import PRIORITY_HIGH, PRIORITY_LOW, RateLimiter
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeAPIError(Exception):
+    """Même attributs que binance.exceptions.BinanceAPIException"""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse({'Retry-After': retry_after} if retry_after else {})
+
+
+class FakeClient:
+    """Client Binance minimal qui expose les en-têtes de la dernière réponse"""
+
+    def __init__(self, used_weight=0, failures=0, delay=0.0):
+        self.used_weight = used_weight
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.response = None
+
+    def get_symbol_ticker(self, symbol=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise FakeAPIError(429, retry_after='0.05')
+        self.response = FakeResponse({'x-mbx-used-weight-1m': str(self.used_weight)})
+        return {'symbol': symbol, 'price': '100.5'}
+
+
+def test_high_priority_is_served_before_backfill():
+    limiter = RateLimiter(capacity=10, period=1.0, reserve=0.0)
+    limiter.update_used(10)
+    order = []
+
+    def request(name, priority):
+        limiter.acquire(weight=5, priority=priority)
+        order.append(name)
+
+    low = threading.Thread(target=request, args=('backfill', PRIORITY_LOW))
+    low.start()
+    time.sleep(0.05)
+    high = threading.Thread(target=request, args=('ticker', PRIORITY_HIGH))
+    high.start()
+    low.join()
+    high.join()
+
+    assert order == ['ticker', 'backfill']
+
+
+def test_identical_requests_are_coalesced():
+    client = FakeClient(delay=0.1)
+    fetcher = DataFetcher(client=client, rate_limiter=RateLimiter(6000))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetcher.get_current_price('BTCUSDT')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [100.5] * 5
+    assert client.calls == 1
+    assert fetcher.rate_limiter.coalesced == 4
+
+
+def test_used_weight_header_is_applied():
+    limiter = RateLimiter(6000)
+    DataFetcher(client=FakeClient(used_weight=5900), rate_limiter=limiter).get_current_price('BTCUSDT')
+    assert limiter.tokens == pytest.approx(100, abs=1)
+
+
+def test_429_backs_off_and_retries():
+    client = FakeClient(failures=2)
+    limiter = RateLimiter(6000)
+    fetcher = DataFetcher(client=client, rate_limiter=limiter)
+
+    start = time.monotonic()
+    assert fetcher.get_current_price('BTCUSDT') == 100.5
+    assert time.monotonic() - start >= 0.1
+    assert client.calls == 3
+    assert limiter.throttled == 2
+
+
+def test_gives_up_after_max_retries():
+    fetcher = DataFetcher(client=FakeClient(failures=10),
+                          rate_limiter=RateLimiter(6000, max_retries=1))
+    with pytest.raises(FakeAPIError):
+        fetcher.get_current_price('BTCUSDT')
+
+
+class FakeSession:
+    def __init__(self):
+        self.hooks = {'response': []}
+
+
+class SessionClient:
+    """Client qui, comme python-binance, écrase `response` à chaque appel de sa session"""
+
+    def __init__(self):
+        self.session = FakeSession()
+        self.response = None
+        self.barrier = threading.Barrier(2)
+
+    def get_klines(self, symbol, interval, limit):
+        response = FakeResponse({'x-mbx-used-weight-1m': str(limit)})
+        for hook in self.session.hooks['response']:
+            hook(response)
+        self.response = response
+        # L'autre thread écrase `response` avant la lecture des en-têtes
+        self.barrier.wait(5)
+        return []
+
+
+class RecordingLimiter(RateLimiter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.synced = []
+
+    def update_used(self, used, weight=0):
+        self.synced.append(used)
+        super().update_used(used, weight)
+
+
+def test_parallel_calls_sync_on_their_own_response_headers():
+    limiter = RecordingLimiter(6000)
+    fetcher = DataFetcher(client=SessionClient(), rate_limiter=limiter)
+    threads = [threading.Thread(target=fetcher.get_kline_arrays, args=('BTCUSDT', '1m', limit))
+               for limit in (100, 200)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(limiter.synced) == [100, 200]
+
+
+def test_sync_keeps_weight_of_requests_still_in_flight():
+    limiter = RateLimiter(100)
+    with limiter.sending(10):
+        with limiter.sending(5):
+            # Réponse de la requête de poids 5 : celle de poids 10 n'est peut-être pas comptée
+            limiter.update_used(20, weight=5)
+            assert limiter.tokens == pytest.approx(70, abs=0.1)
+    limiter.update_used(20)
+    assert limiter.tokens == pytest.approx(80, abs=0.1)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Tests de l'enregistrement et du rejeu des réponses de marché"""
+import time
+
+import pandas as pd
+import pytest
+
+from src.data_fetcher import DataFetcher
+from src.replay import MarketRecorder, ReplayError, ReplayExhausted, ReplaySession, record_fetcher
+from src.twelve_data_fetcher import TwelveDataFetcher
+from src.watchlist import Subscription, WatchlistScheduler
+
+HOUR_MS = 3_600_000
+
+
+class FakeBinanceClient:
+    """Marché simulé qui avance d'un pas à chaque appel de ticker"""
+
+    def __init__(self):
+        self.step = 0
+
+    def get_klines(self, symbol, interval, limit):
+        if symbol == 'BAD':
+            raise ConnectionError("Connexion refusée")
+        count = 60 + self.step
+        return [[i * HOUR_MS, "0", "0", "0", f"{100 + (i * 7 + self.step) % 13:.2f}", "1"]
+                for i in range(count)][-limit:]
+
+    def get_symbol_ticker(self, symbol=None):
+        self.step += 1
+        prices = {'BTCUSDT': 100 + self.step % 5, 'ETHUSDT': 50 + self.step % 3}
+        if symbol is not None:
+            return {'symbol': symbol, 'price': str(prices[symbol])}
+        return [{'symbol': s, 'price': str(p)} for s, p in prices.items()]
+
+
+def _run(fetcher, cycles):
+    subscriptions = [Subscription('BTCUSDT', '1h', proximity_percent=5),
+                     Subscription('ETHUSDT', '1h'), Subscription('BAD', '1h')]
+    scheduler = WatchlistScheduler(fetcher, subscriptions, max_concurrent_fetches=1)
+    try:
+        return [[(r['proximity'], str(r['error']) if r['error'] else None) for r in scheduler.run_once()]
+                for _ in range(cycles)]
+    finally:
+        scheduler.close()
+
+
+def test_replay_reproduces_recorded_run(tmp_path):
+    path = str(tmp_path / 'market.log.gz')
+    recorder = MarketRecorder(path)
+    recorded = _run(record_fetcher(DataFetcher(client=FakeBinanceClient()), recorder), 4)
+    recorder.close()
+    # 4 cycles x (1 ticker groupé + 3 requêtes de bougies)
+    assert recorder.records == 16
+
+    session = ReplaySession(path, speed=0)
+    replayed = _run(DataFetcher(client=session.client()), 4)
+    assert replayed == recorded
+    assert session.finished
+
+    # L'erreur enregistrée est relevée au rejeu avec le même message
+    assert replayed[0][2] == (None, "Connexion refusée")
+
+    with pytest.raises(ReplayExhausted):
+        session.next_response('get_symbol_ticker', {})
+
+
+class FakeAPIError(Exception):
+    """Même attribut que binance.exceptions.BinanceAPIException"""
+
+    def __init__(self, status_code):
+        super().__init__("APIError(code=-1003): Too many requests")
+        self.status_code = status_code
+
+
+class LimitedBinanceClient(FakeBinanceClient):
+    def get_klines(self, symbol, interval, limit):
+        raise FakeAPIError(429)
+
+
+def test_recorded_error_is_raised_again_on_replay(tmp_path):
+    path = str(tmp_path / 'errors.log.gz')
+    recorder = MarketRecorder(path)
+    fetcher = DataFetcher(client=LimitedBinanceClient())
+    with pytest.raises(FakeAPIError):
+        record_fetcher(fetcher, recorder).get_kline_arrays('BTCUSDT', '1h', limit=10)
+    recorder.close()
+
+    replay = DataFetcher(client=ReplaySession(path, speed=0).client())
+    with pytest.raises(ReplayError) as error:
+        replay.get_kline_arrays('BTCUSDT', '1h', limit=10)
+    # Même message, type et statut : le 429 reste reconnu par le limiteur de débit
+    assert str(error.value) == "APIError(code=-1003): Too many requests"
+    assert error.value.error_type == 'FakeAPIError'
+    assert error.value.status_code == 429
+
+
+class FakeBuilder:
+    def __init__(self, data):
+        self.data = data
+
+    def as_pandas(self):
+        return self.data
+
+    def as_json(self):
+        return self.data
+
+
+class FakeTDClient:
+    def time_series(self, symbol, interval, outputsize):
+        index = pd.Index(pd.date_range('2024-01-01', periods=outputsize, freq='h')[::-1], name='datetime')
+        return FakeBuilder(pd.DataFrame({column: range(outputsize) for column in
+                                         ('open', 'high', 'low', 'close')}, index=index, dtype=float))
+
+    def quote(self, symbol):
+        return FakeBuilder({'close': '2050.5'})
+
+
+def test_twelvedata_record_and_replay(tmp_path):
+    path = str(tmp_path / 'td.log.gz')
+    recorder = MarketRecorder(path)
+    fetcher = record_fetcher(TwelveDataFetcher(client=FakeTDClient()), recorder)
+    expected = fetcher.get_historical_data('XAU/USD', '1h', outputsize=30)
+    price = fetcher.get_current_price('XAU/USD')
+    recorder.close()
+
+    session = ReplaySession(path, speed=0)
+    replay = TwelveDataFetcher(client=session.client())
+    pd.testing.assert_frame_equal(replay.get_historical_data('XAU/USD', '1h', outputsize=30), expected)
+    assert replay.get_current_price('XAU/USD') == price == 2050.5
+
+
+def test_replay_clock_speed(tmp_path):
+    path = str(tmp_path / 'empty.log.gz')
+    MarketRecorder(path).close()
+
+    fast = ReplaySession(path, speed=1000).clock
+    start, virtual = time.perf_counter(), fast.time()
+    fast.sleep(60)
+    assert fast.time() - virtual == 60
+    assert 0.05 <= time.perf_counter() - start < 1
+
+    instant = ReplaySession(path, speed=0).clock
+    start = time.perf_counter()
+    instant.sleep(3600)
+    assert time.perf_counter() - start < 0.05
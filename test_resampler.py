@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Tests du rééchantillonnage multi-unités de temps"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.resampler import TimeframeResampler
+from src.watchlist import Subscription, WatchlistScheduler
+
+MINUTE_MS = 60_000
+
+
+def _minute_candles(count: int, start_ms: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, count))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.3, count))
+    return pd.DataFrame({
+        'open_time': start_ms + np.arange(count, dtype=np.int64) * MINUTE_MS,
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+    })
+
+
+def _resample(df: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    """Référence pandas : agrégation OHLC alignée sur l'epoch"""
+    bucket = df['open_time'] // (minutes * MINUTE_MS) * (minutes * MINUTE_MS)
+    return df.groupby(bucket).agg(
+        open=('open', 'first'), high=('high', 'max'), low=('low', 'min'), close=('close', 'last')
+    ).rename_axis('open_time').reset_index()
+
+
+def test_resampled_bars_match_pandas_aggregation():
+    # Départ au milieu d'une bougie 15m : la première est partielle des deux côtés
+    df = _minute_candles(500, 1_700_000_000_000 + 7 * MINUTE_MS)
+    resampler = TimeframeResampler('1m', ['5m', '15m', '1h'])
+
+    last = {}
+    for row in df.itertuples(index=False):
+        # La bougie ouverte est mise à jour plusieurs fois avant sa clôture
+        resampler.update(row.open_time, row.open, row.open, row.open, row.open)
+        for interval, bar in resampler.update(row.open_time, row.open, row.high, row.low, row.close):
+            last.setdefault(interval, {})[bar.open_time] = bar
+
+    for interval, minutes in (('5m', 5), ('15m', 15), ('1h', 60)):
+        expected = _resample(df, minutes)
+        bars = [last[interval][t] for t in expected['open_time']]
+        assert len(bars) == len(last[interval])
+        for column in ('open', 'high', 'low', 'close'):
+            assert [getattr(bar, column) for bar in bars] == pytest.approx(expected[column].tolist())
+
+
+def test_resampler_rejects_non_multiple_interval():
+    with pytest.raises(ValueError):
+        TimeframeResampler('3m', ['5m'])
+
+
+class FakeFetcher:
+    """Sert les bougies 1m et leurs agrégats (même interface que DataFetcher)"""
+
+    def __init__(self, minutes: pd.DataFrame):
+        self.minutes = minutes
+        self.requests = []
+
+    def get_current_prices(self, symbols):
+        return {symbol: float(self.minutes['close'].iloc[-1]) for symbol in symbols}
+
+    def get_kline_arrays(self, symbol, interval, limit=100, fields=('open_time', 'close')):
+        self.requests.append((interval, limit))
+        df = self.minutes if interval == '1m' else _resample(self.minutes, int(interval[:-1]))
+        df = df.tail(limit)
+        return {field: df[field].to_numpy() for field in fields}
+
+
+def test_scheduler_resample_mode_fetches_base_interval_only():
+    now_ms = int(pd.Timestamp.now(tz='UTC').timestamp() * 1000)
+    start_ms = now_ms // (15 * MINUTE_MS) * (15 * MINUTE_MS) - 400 * MINUTE_MS
+    minutes = _minute_candles(400, start_ms)
+    fetcher = FakeFetcher(minutes.iloc[:380].copy())
+
+    intervals = ('1m', '5m', '15m')
+    subscriptions = [Subscription('BTCUSDT', interval, period=10) for interval in intervals]
+    scheduler = WatchlistScheduler(fetcher, subscriptions, 'binance', resample=True)
+    try:
+        scheduler.run_once()
+        assert sorted(i for i, _ in fetcher.requests) == ['15m', '1m', '5m']
+
+        fetcher.requests.clear()
+        for end in (385, 386, 400):
+            fetcher.minutes = minutes.iloc[:end].copy()
+            # Bougie ouverte : la clôture bouge encore avant le cycle suivant
+            fetcher.minutes.iloc[-1, fetcher.minutes.columns.get_loc('close')] += 0.1
+            results = scheduler.run_once()
+            assert [r['error'] for r in results] == [None] * 3
+        assert [i for i, _ in fetcher.requests] == ['1m'] * 3
+    finally:
+        scheduler.close()
+
+    # Bandes identiques à celles calculées sur les bougies agrégées directement
+    for subscription in subscriptions:
+        direct = Subscription('BTCUSDT', subscription.interval, period=10)
+        arrays = FakeFetcher(fetcher.minutes).get_kline_arrays(
+            'BTCUSDT', subscription.interval, limit=direct.history_size
+        )
+        direct.ingest_candles(arrays['open_time'].tolist(), arrays['close'].tolist())
+        assert subscription.bands.current_bands() == pytest.approx(direct.bands.current_bands())
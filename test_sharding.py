@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Tests du mode multi-processus (hachage cohérent, superviseur, alertes centralisées)"""
+import time
+from datetime import datetime, timedelta
+
+from src.sharding import AlertDispatcher, HashRing, ShardSupervisor
+from src.watchlist import Subscription
+
+SYMBOLS = [f"SYM{i:04d}USDT" for i in range(2000)]
+
+
+class RecordingManager:
+    def __init__(self):
+        self.alerts = []
+
+    def send_alert(self, alert):
+        self.alerts.append(alert)
+
+
+def _alert(symbol, minutes=0, alert_type='upper'):
+    timestamp = datetime(2024, 1, 1) + timedelta(minutes=minutes)
+    return {'timestamp': timestamp.isoformat(), 'symbol': symbol, 'interval': '1h',
+            'type': alert_type, 'message': '', 'price': 1.0, 'band_value': 1.0,
+            'distance_pct': 0.1}
+
+
+def emit_one_alert_per_symbol(symbols, sender, minutes):
+    """Worker de test (importable par les processus 'spawn')"""
+    for symbol in symbols:
+        sender.send_alert(_alert(symbol, minutes))
+
+
+def test_ring_is_balanced_and_adding_a_worker_moves_few_symbols():
+    ring = HashRing(range(4))
+    before = {symbol: ring.node_for(symbol) for symbol in SYMBOLS}
+    sizes = [len(shard) for shard in ring.partition(SYMBOLS).values()]
+    assert min(sizes) > len(SYMBOLS) / 4 * 0.7
+
+    ring.add(4)
+    moved = [s for s in SYMBOLS if ring.node_for(s) != before[s]]
+    # Seuls les symboles repris par le nouveau worker bougent (~1/5)
+    assert all(ring.node_for(s) == 4 for s in moved)
+    assert len(moved) < len(SYMBOLS) * 0.3
+
+    # Même répartition dans un autre processus / une autre exécution
+    assert HashRing(range(4)).partition(SYMBOLS) == HashRing(range(4)).partition(SYMBOLS)
+
+
+def test_dispatcher_drops_duplicates_from_other_workers_within_cooldown():
+    manager = RecordingManager()
+    dispatcher = AlertDispatcher(manager, alert_queue=None, cooldown_seconds=300)
+
+    assert dispatcher.dispatch('0:0', _alert('BTCUSDT'))
+    # Instance redémarrée du worker (nouvelle génération) : doublon écarté
+    assert not dispatcher.dispatch('0:1', _alert('BTCUSDT', minutes=1))
+    # Le worker d'origine garde la main sur son propre cooldown
+    assert dispatcher.dispatch('0:0', _alert('BTCUSDT', minutes=2))
+    # Autre type d'alerte, ou cooldown écoulé : transmise
+    assert dispatcher.dispatch('0:1', _alert('BTCUSDT', minutes=3, alert_type='lower'))
+    assert dispatcher.dispatch('0:1', _alert('BTCUSDT', minutes=10))
+
+    assert len(manager.alerts) == 4
+    assert dispatcher.duplicates == 1
+
+
+def test_supervisor_runs_workers_and_centralizes_alerts():
+    manager = RecordingManager()
+    symbols = SYMBOLS[:40]
+    supervisor = ShardSupervisor(symbols, 3, emit_one_alert_per_symbol, (0,),
+                                 notification_manager=manager, cooldown_seconds=300)
+    assert sorted(s for shard in supervisor.assignments.values() for s in shard) == sorted(symbols)
+
+    supervisor.start()
+    try:
+        deadline = time.monotonic() + 30
+        while len(manager.alerts) < len(symbols) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert sorted(a['symbol'] for a in manager.alerts) == sorted(symbols)
+
+        # Les workers de test se terminent : ils sont relancés, et leurs
+        # alertes répétées pendant le cooldown sont écartées
+        shards = sum(1 for shard in supervisor.assignments.values() if shard)
+        deadline = time.monotonic() + 30
+        while supervisor.restarts < shards and time.monotonic() < deadline:
+            supervisor.check()
+            time.sleep(0.05)
+        deadline = time.monotonic() + 30
+        while supervisor.dispatcher.duplicates < len(symbols) and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        supervisor.stop()
+
+    assert len(manager.alerts) == len(symbols)
+    assert supervisor.dispatcher.duplicates >= len(symbols)
+
+
+def test_run_sharded_uses_configured_cooldown(monkeypatch):
+    import main
+
+    class SpySupervisor(ShardSupervisor):
+        instances = []
+
+        def run(self, check_interval):
+            SpySupervisor.instances.append(self)
+
+    monkeypatch.setattr(main, 'ShardSupervisor', SpySupervisor)
+    subscriptions = [Subscription(symbol, '1h') for symbol in SYMBOLS[:4]]
+    config = {'cooldown': {'seconds': 900, 'rules': {'bb50x2': 600}}}
+    main.run_sharded(config, subscriptions, RecordingManager(), None, 2)
+
+    [supervisor] = SpySupervisor.instances
+    assert supervisor.dispatcher.cooldown_seconds == 600
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""Tests de la watchlist : planificateur multi-symboles, modes événementiel et intrabar"""
+import numpy as np
+import pytest
+
+from src.watchlist import Subscription, WatchlistScheduler, load_subscriptions
+
+MINUTE_MS = 60_000
+START_MS = 1_700_000_000_000 // MINUTE_MS * MINUTE_MS
+
+
+class Market:
+    """Marché simulé : bougies 1m et prix courant pilotés par le test"""
+
+    def __init__(self, closes):
+        self.closes = list(closes)
+        self.now = START_MS / 1000 + (len(self.closes) - 1) * 60 + 10
+        self.kline_requests = 0
+        # Mèches : {index de bougie: (plus haut, plus bas)}
+        self.wicks = {}
+
+    def set_price(self, price: float):
+        self.closes[-1] = price
+
+    def open_candle(self, price: float):
+        self.closes.append(price)
+
+    def wick(self, high: float, low: float):
+        """Plus haut / plus bas de la bougie ouverte (le prix courant peut en être revenu)"""
+        self.wicks[len(self.closes) - 1] = (high, low)
+
+    def get_current_prices(self, symbols):
+        return {symbol: self.closes[-1] for symbol in symbols}
+
+    def get_kline_arrays(self, symbol, interval, limit=100, fields=('open_time', 'close')):
+        self.kline_requests += 1
+        closes = np.array(self.closes[-limit:])
+        first = len(self.closes) - len(closes)
+        open_times = START_MS + np.arange(first, len(self.closes), dtype=np.int64) * MINUTE_MS
+        highs, lows = closes.copy(), closes.copy()
+        for index, (high, low) in self.wicks.items():
+            if index >= first:
+                highs[index - first], lows[index - first] = high, low
+        arrays = {'open_time': open_times, 'close': closes, 'open': closes, 'high': highs, 'low': lows}
+        return {field: arrays[field] for field in fields}
+
+
+class MultiMarket:
+    """Plusieurs symboles ; compte les requêtes de prix et de bougies"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.price_batches = []
+        self.kline_requests = []
+
+    CANDLES = 500
+
+    def closes(self, symbol, limit):
+        """`limit` dernières clôtures d'une série fixe propre au symbole"""
+        offset = sum(map(ord, symbol)) % 7
+        return 100 + 10 * np.sin((np.arange(self.CANDLES - limit, self.CANDLES) + offset) / 3)
+
+    def get_current_prices(self, symbols):
+        self.price_batches.append(list(symbols))
+        return {symbol: float(self.closes(symbol, 80)[-1]) for symbol in symbols}
+
+    def get_current_price(self, symbol):
+        raise AssertionError("prix demandé symbole par symbole")
+
+    def get_kline_arrays(self, symbol, interval, limit=100, fields=('open_time', 'close')):
+        self.kline_requests.append((symbol, interval, limit))
+        if symbol in self.failing:
+            raise ConnectionError(f"{symbol} indisponible")
+        first = self.CANDLES - limit
+        arrays = {'open_time': START_MS + np.arange(first, self.CANDLES, dtype=np.int64) * MINUTE_MS,
+                  'close': self.closes(symbol, limit)}
+        arrays['open'] = arrays['high'] = arrays['low'] = arrays['close']
+        return {field: arrays[field] for field in fields}
+
+
+def test_watchlist_batches_prices_and_shares_candles_per_pair():
+    market = MultiMarket()
+    subscriptions = [Subscription('BTCUSDT', '1m', period=20), Subscription('BTCUSDT', '1m', period=50),
+                     Subscription('ETHUSDT', '1m', period=20)]
+    scheduler = WatchlistScheduler(market, subscriptions)
+    try:
+        for _ in range(2):
+            results = scheduler.run_once()
+            assert [r['error'] for r in results] == [None, None, None]
+    finally:
+        scheduler.close()
+
+    # Un seul appel de prix groupé par cycle, une requête de bougies par paire
+    assert market.price_batches == [['BTCUSDT', 'ETHUSDT']] * 2
+    assert sorted(set(market.kline_requests)) == [
+        ('BTCUSDT', '1m', max(s.history_size for s in subscriptions[:2])),
+        ('ETHUSDT', '1m', subscriptions[2].history_size),
+    ]
+    assert len(market.kline_requests) == 4
+
+    # Chaque surveillance garde ses propres bandes, calculées sur les bougies partagées
+    for subscription in subscriptions:
+        direct = Subscription(subscription.symbol, '1m', period=subscription.bands.period)
+        arrays = market.get_kline_arrays(subscription.symbol, '1m', limit=subscription.history_size)
+        direct.ingest_candles(arrays['open_time'].tolist(), arrays['close'].tolist())
+        assert subscription.bands.current_bands() == pytest.approx(direct.bands.current_bands())
+    assert subscriptions[0].bands.current_bands() != pytest.approx(subscriptions[1].bands.current_bands())
+
+
+def test_failing_symbol_does_not_affect_the_others():
+    market = MultiMarket(failing={'BAD'})
+    subscriptions = [Subscription('BTCUSDT', '1m'), Subscription('BAD', '1m'), Subscription('ETHUSDT', '1m')]
+    scheduler = WatchlistScheduler(market, subscriptions)
+    try:
+        btc, bad, eth = scheduler.run_once()
+    finally:
+        scheduler.close()
+
+    assert isinstance(bad['error'], ConnectionError) and "BAD" in str(bad['error'])
+    assert btc['error'] is None and eth['error'] is None
+    assert btc['price'] == pytest.approx(market.closes('BTCUSDT', 80)[-1])
+    assert subscriptions[0].bands.is_ready and subscriptions[2].bands.is_ready
+
+
+def test_load_subscriptions_from_watchlist_section():
+    config = {
+        'bollinger_bands': {'period': 20, 'multiplier': 2.0, 'proximity_percent': 0.5},
+        'trading': {'symbol': 'BTCUSDT', 'interval': '1h'},
+        'watchlist': {'subscriptions': ['ETHUSDT', {'symbol': 'XAU/USD', 'interval': '4h',
+                                                     'period': 30, 'proximity_percent': 0.3}]},
+    }
+    eth, gold = load_subscriptions(config)
+    assert (eth.symbol, eth.interval, eth.bands.period, eth.proximity_percent) == ('ETHUSDT', '1h', 20, 0.5)
+    assert (gold.symbol, gold.interval, gold.bands.period, gold.proximity_percent) == ('XAU/USD', '4h', 30, 0.3)
+
+    # Sans watchlist : le symbole de `trading`, comme avant
+    del config['watchlist']
+    [single] = load_subscriptions(config)
+    assert (single.symbol, single.interval) == ('BTCUSDT', '1h')
+
+
+def _scheduler(market, **kwargs):
+    subscription = Subscription('BTCUSDT', '1m', period=20, proximity_percent=0.5)
+    scheduler = WatchlistScheduler(market, [subscription], 'binance', event_driven=True,
+                                   candle_grace=1.0, **kwargs)
+    scheduler.clock = lambda: market.now
+    return scheduler, subscription
+
+
+def test_candles_fetched_only_after_close_and_ticks_update_open_candle():
+    market = Market(100 + 20 * np.sin(np.arange(80) / 3))
+    scheduler, subscription = _scheduler(market)
+    try:
+        scheduler.run_once()
+        assert market.kline_requests == 1
+
+        # Même bougie : seul le prix courant est demandé
+        for price in (101.5, 101.7, 101.2):
+            market.set_price(price)
+            market.now += 5
+            [result] = scheduler.run_once()
+            assert result['changed'] and result['error'] is None
+        assert market.kline_requests == 1
+
+        # Prix inchangé : rien n'est recalculé
+        market.now += 5
+        [result] = scheduler.run_once()
+        assert not result['changed']
+
+        # Clôture passée (+ délai de grâce) : la nouvelle bougie est demandée
+        market.open_candle(101.0)
+        market.now += 32
+        scheduler.run_once()
+        assert market.kline_requests == 2
+    finally:
+        scheduler.close()
+
+    direct = Subscription('BTCUSDT', '1m', period=20)
+    arrays = market.get_kline_arrays('BTCUSDT', '1m', limit=70)
+    direct.ingest_candles(arrays['open_time'].tolist(), arrays['close'].tolist())
+    assert subscription.bands.current_bands() == pytest.approx(direct.bands.current_bands())
+
+
+def test_next_delay_shrinks_near_bands_and_stops_at_candle_close():
+    market = Market(100 + 20 * np.sin(np.arange(80) / 3))
+    scheduler, subscription = _scheduler(market)
+    try:
+        scheduler.run_once()
+        upper, _, lower = subscription.bands.current_bands()
+
+        # Prix au milieu des bandes, loin de la clôture : attente maximale
+        market.now = START_MS / 1000 + 79 * 60 + 1
+        subscription.last_proximity = subscription.bands.check_proximity(
+            (upper + lower) / 2, upper, lower, 0.5)
+        assert scheduler.next_delay(max_interval=30, min_interval=1) == 30
+
+        # Prix sur le seuil de proximité : attente minimale
+        subscription.last_proximity = subscription.bands.check_proximity(
+            upper * (1 - 0.004), upper, lower, 0.5)
+        assert scheduler.next_delay(max_interval=30, min_interval=1) == pytest.approx(1)
+
+        # Loin des bandes mais clôture dans 10 s (+ 1 s de grâce)
+        subscription.last_proximity = subscription.bands.check_proximity(
+            (upper + lower) / 2, upper, lower, 0.5)
+        market.now = START_MS / 1000 + 80 * 60 - 10
+        assert scheduler.next_delay(max_interval=30, min_interval=1) == pytest.approx(11)
+    finally:
+        scheduler.close()
+
+
+def test_intrabar_catches_band_touch_between_polls():
+    market = Market(100 + 20 * np.sin(np.arange(80) / 3))
+    market.wick(market.closes[-1], market.closes[-1])
+    subscriptions = [Subscription('BTCUSDT', '1m', period=20, intrabar=intrabar)
+                     for intrabar in (False, True)]
+    scheduler = WatchlistScheduler(market, subscriptions, 'binance')
+    try:
+        scheduler.run_once()
+        upper, basis, lower = subscriptions[1].bands.current_bands()
+
+        # Entre deux vérifications, le prix a touché la bande haute puis est revenu au milieu
+        market.set_price(basis)
+        market.wick(upper * 1.001, basis)
+        polled, intrabar = scheduler.run_once()
+        assert polled['alerts'] == []
+        [alert] = intrabar['alerts']
+        assert alert['type'] == 'upper' and alert['message'].endswith("mèche")
+        assert alert['details']['intrabar_high'] == pytest.approx(upper * 1.001)
+
+        # Même mèche à la vérification suivante : déjà vue, pas de nouvelle détection
+        intrabar_subscription = subscriptions[1]
+        intrabar_subscription.alert_manager.last_alert_upper = None
+        _, intrabar = scheduler.run_once()
+        assert intrabar['alerts'] == []
+    finally:
+        scheduler.close()
+
+
+def _price_below_upper(market, distance_pct: float, period: int = 20) -> float:
+    """Prix de la bougie ouverte à `distance_pct` % sous la bande haute qu'il déplace"""
+    closes = np.array(market.closes[-period:])
+    for _ in range(50):
+        upper = closes.mean() + 2 * closes.std(ddof=1)
+        closes[-1] = upper * (1 - distance_pct / 100)
+    return float(closes[-1])
+
+
+def test_prices_far_from_bands_skip_proximity_calculation():
+    market = Market(100 + 20 * np.sin(np.arange(80) / 3))
+    scheduler, subscription = _scheduler(market)
+    calls = []
+    check_proximity = subscription.bands.check_proximity
+    subscription.bands.check_proximity = lambda *args: calls.append(args) or check_proximity(*args)
+    try:
+        scheduler.run_once()
+        _, basis, _ = subscription.bands.current_bands()
+        calls.clear()
+
+        # Milieu des bandes : écarté par les prix de déclenchement, sans calcul
+        for offset in (0.0, 0.5, -0.5):
+            market.set_price(basis + offset)
+            market.now += 1
+            [result] = scheduler.run_once()
+            assert result['proximity'] is None and result['price'] == basis + offset
+        assert calls == []
+        assert scheduler.next_delay(max_interval=30, min_interval=1) > 1
+
+        # Dans la zone où l'attente raccourcit (2 % < 5 x 0.5 %) : proximité calculée
+        market.set_price(_price_below_upper(market, 2.0))
+        market.now += 1
+        [result] = scheduler.run_once()
+        assert len(calls) == 1 and not result['proximity']['near_upper']
+        assert result['proximity']['distance_upper_pct'] == pytest.approx(2.0, abs=0.01)
+        assert result['alerts'] == []
+
+        # Sur la bande : alerte
+        market.set_price(_price_below_upper(market, 0.1))
+        market.now += 1
+        [result] = scheduler.run_once()
+        assert result['proximity']['near_upper'] and len(result['alerts']) == 1
+    finally:
+        scheduler.close()
+
+
+def test_polling_console_shows_bands_for_screened_prices(capsys):
+    from main import run_polling
+
+    market = MultiMarket()
+    subscription = Subscription('BTCUSDT', '1m', period=20)
+    scheduler = WatchlistScheduler(market, [subscription])
+    try:
+        assert run_polling(scheduler, None, check_interval=60, once=True) == 0
+    finally:
+        scheduler.close()
+
+    # Prix écarté par le filtre : pas de proximité calculée, mais les bandes restent affichées
+    assert subscription.last_proximity is None
+    upper, _, lower = subscription.bands.current_bands()
+    assert f"Haute: {round(upper, 2)} | Basse: {round(lower, 2)}" in capsys.readouterr().out